@@ -1,13 +1,18 @@
+import atexit
 import datetime
 import logging.handlers
 import os
-import tarfile
+import queue
+import subprocess
+import sys
+import tempfile
+import time
 
 import psutil
 import pytz
 
-from .const import bot_version
-from .utils import CommandFormatter, UserChannelFormatter
+from .const import bot_version, log_archive_codec, log_archive_level, log_archive_max_bytes, log_archive_max_count, log_backup_count
+from .utils import BoundedQueueHandler, CommandFormatter, LoggerNameFilter, UserChannelFormatter
 
 NY = pytz.timezone("America/New_York")
 
@@ -17,23 +22,32 @@ command_logger = logging.getLogger("bot_command_log")
 base = os.path.abspath(os.path.join(__file__, "..", "..", "logs"))
 os.makedirs(base, exist_ok=True)
 
+archive_start = time.perf_counter()
+archive_pending = None
 if not os.getenv("NO_DELETE_LOGFILES", ""):
-    backup_path = os.path.join(base, "logs-" + datetime.datetime.now().astimezone(NY).strftime("%Y-%m-%d-%H-%M-%S"))
-    tf = tarfile.open(backup_path + ".tar.bz2", mode="w:bz2")
-    for file in (os.path.join(base, logfile) for logfile in ("bot.log", "commands.log")):
-        if os.path.exists(file):
-            tf.add(file)
-            os.remove(file)
-    if os.path.exists(os.path.join(base, "log.log")):
-        tf.add(os.path.join(base, "log.log"))
-        os.remove(os.path.join(base, "log.log"))
-        open(os.path.join(base, "log.log"), "w").close()
+    # Moving the files is instant, so the bot does not wait on compression. log_archiver.py compresses them in its own process.
+    # mkdtemp adds a unique suffix, so two startups in the same second do not share a directory.
+    archive_pending = tempfile.mkdtemp(prefix="pending-" + datetime.datetime.now().astimezone(NY).strftime("%Y-%m-%d-%H-%M-%S-"), dir=base)
+    for logfile in os.listdir(base):
+        if logfile in ("bot.log", "commands.log", "log.log") or logfile.startswith("bot.log."):
+            os.replace(os.path.join(base, logfile), os.path.join(archive_pending, logfile))
+    open(os.path.join(base, "log.log"), "w").close()
+    with open(os.path.join(base, "archiver.log"), "a") as archiver_log:
+        archiver = subprocess.Popen(
+            [sys.executable, "-I", os.path.join(os.path.dirname(__file__), "log_archiver.py"), base,
+             "--codec", os.getenv("LOG_ARCHIVE_CODEC", log_archive_codec),
+             "--level", os.getenv("LOG_ARCHIVE_LEVEL", str(log_archive_level)),
+             "--max-count", os.getenv("LOG_ARCHIVE_MAX_COUNT", str(log_archive_max_count)),
+             "--max-bytes", os.getenv("LOG_ARCHIVE_MAX_BYTES", str(log_archive_max_bytes))],
+            stdin=subprocess.DEVNULL, stdout=archiver_log, stderr=subprocess.STDOUT, start_new_session=True)
+archive_duration = time.perf_counter() - archive_start
 
 level = os.getenv("LOG_LEVEL", "INFO")
 log_level = getattr(logging, level)
 logger.setLevel(log_level)
 command_logger.setLevel(logging.INFO)
-handler = logging.handlers.RotatingFileHandler(os.path.join(base, "bot.log"), encoding="utf-8", maxBytes=10 * (1024 ** 2))
+handler = logging.handlers.RotatingFileHandler(os.path.join(base, "bot.log"), encoding="utf-8", maxBytes=10 * (1024 ** 2),
+                                               backupCount=log_backup_count)
 handler2 = logging.FileHandler(os.path.join(base, "commands.log"), encoding="utf-8")
 formatter = UserChannelFormatter()
 formatter2 = CommandFormatter()
@@ -41,8 +55,16 @@ handler.setFormatter(formatter)
 handler.setLevel(log_level)
 handler2.setFormatter(formatter2)
 handler2.setLevel(log_level)
-logger.addHandler(handler)
-command_logger.addHandler(handler2)
+handler.addFilter(LoggerNameFilter(command_logger.name, exclude=True))
+handler2.addFilter(LoggerNameFilter(command_logger.name))
+# The file handlers are owned by a listener thread, so logging from the event loop only has to put the record on a queue.
+log_queue = queue.Queue(int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+queue_handler = BoundedQueueHandler(log_queue)
+queue_listener = logging.handlers.QueueListener(log_queue, handler, handler2, respect_handler_level=True)
+queue_listener.start()
+atexit.register(queue_listener.stop)
+logger.addHandler(queue_handler)
+command_logger.addHandler(queue_handler)
 if not os.getenv("NO_DELETE_LOGFILES", ""):
     proc = psutil.Process().parent()
     if proc is None:
@@ -51,6 +73,7 @@ if not os.getenv("NO_DELETE_LOGFILES", ""):
         with proc.oneshot():
             logger.info("Logging system started by %s (PID %s)", proc.name(), proc.pid)
     logger.info("Logging at level %s", level)
+    logger.info("Moved previous logs to %s in %.3f seconds, compressing in process %s", archive_pending, archive_duration, archiver.pid)
 logging.captureWarnings(True)
 
 aiosqlite_logger = logging.getLogger("aiosqlite")
@@ -59,4 +82,4 @@ aiosqlite_logger.addHandler(logging.NullHandler())
 
 discord_logger = logging.getLogger("discord")
 discord_logger.setLevel(logging.WARNING)
-discord_logger.addHandler(handler)
+discord_logger.addHandler(queue_handler)
@@ -11,24 +11,23 @@ import sys
 import time
 import traceback
 import types
-from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple, Type, TypeVar, Union, overload
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Set, Tuple, Type, TypeVar, Union, overload
 
 import aiohttp
-import aiosqlite
 import discord.ext.commands
 import discord.ext.tasks
 import psutil
 import pytz
 import sentry_sdk.integrations.logging
 
-from bot_data import bot_version, command_logger
-from bot_data.const import bad_argument_regex, invalid_spoiler, on_reaction_func_type, option_types, quote, url_regex, warning_on_failure, \
-    warning_on_invalid_spoiler
+from bot_data import archive_duration, bot_version, command_logger
+from bot_data.const import bad_argument_regex, invalid_spoiler, metrics_host, metrics_port, on_reaction_func_type, option_types, quote, url_regex, \
+    warning_on_failure, warning_on_invalid_spoiler
 from bot_data.creds import TOKEN, bot_support_join_leave_channel_id, bot_support_stats_total_commands_channel_id, \
     bot_support_stats_total_messages_sent_channel_id, owner_id, sentry_link
-from bot_data.utils import BoundedList, Embed, HubContext, Mention, ReloadingClient, StopCommand, UserMention, get_context_variables, \
-    get_context_variables_from_traceback, \
-    send_embeds_fields
+from bot_data.utils import BoundedList, BulkJob, CommandRegistry, Database, Embed, HubContext, LogContext, LoopMonitor, Mention, \
+    Metrics, OutboundDispatcher, ReloadingClient, StopCommand, UserMention, builtin_bulk_operations, get_log_context, log_context, \
+    send_embeds_fields, set_log_context
 from bot_data.utils.data import BotBaseDataClass, DiscordDataException
 from bot_data.utils.data.util import remove_prefix
 from bot_data.utils.data.waifu import TooManyAnimeNames, TooManyBrackets, TooManyWaifuNames
@@ -54,6 +53,7 @@ class PokestarBot(discord.ext.commands.Bot):
 
     def __init__(self):
         self.started = datetime.datetime.utcnow()
+        self._command_registry: Optional[CommandRegistry] = None  # Bot.__init__ adds the help command
         intents = discord.Intents.all()
         intents.typing = False
         intents.integrations = False
@@ -67,9 +67,9 @@ class PokestarBot(discord.ext.commands.Bot):
         self.owner_id = owner_id
         self.obj_ids = {}
         self._session: Optional[aiohttp.ClientSession] = None
-        self.conn: Optional[aiosqlite.Connection] = None
+        self.conn: Optional[Database] = None
         self.channel_data = {}
-        self.disabled_commands = {}
+        self.disabled_commands: Dict[int, Set[str]] = {}
         self.channel_queue = asyncio.Queue()
         self.disabled_stat_channels = {}
         self.options = {}
@@ -77,6 +77,8 @@ class PokestarBot(discord.ext.commands.Bot):
         self.commands_processed = 0
         self.events = {}
         self.on_reaction_funcs: Dict[on_reaction_func_type] = {}
+        self.bulk_operations = dict(builtin_bulk_operations)
+        self.bulk_jobs_resumed = False
         self.running_stats_counter = 0
         self.running_stats_lock = asyncio.Lock()
         BotBaseDataClass.bot = self
@@ -87,10 +89,16 @@ class PokestarBot(discord.ext.commands.Bot):
         self.command_lock = asyncio.Lock()
         self.http.send_message = functools.partial(self.send_with_counter, self.http.send_message)
         self.http.send_files = functools.partial(self.send_with_counter, self.http.send_files)
+        self.outbound = OutboundDispatcher(self)
+        self.loop_monitor = LoopMonitor()
+        self.metrics = Metrics()
+        self.metrics.histograms["loop_lag_seconds"] = ("How late the event loop ran a callback scheduled on time.", self.loop_monitor.histogram)
+        self.metrics.instrument_loops(self)
         self.on_ready_wait = asyncio.Lock()
         self.setup_done = asyncio.Event()
         self.bracket_cache = None
         self.hubs = []
+        self.startup_duration: Optional[float] = None
 
         for file in os.listdir(os.path.abspath(os.path.join(__file__, "..", "extensions"))):
             if not file.startswith("_"):
@@ -122,8 +130,28 @@ class PokestarBot(discord.ext.commands.Bot):
         prevents having to fetch multiple copies of the same message, and should significantly speedup reaction events."""
         if hasattr(cog, "on_reaction"):
             self.on_reaction_funcs[cog.qualified_name] = cog.on_reaction
+        self.metrics.instrument_loops(cog)
         return super().add_cog(cog)
 
+    @property
+    def command_registry(self) -> CommandRegistry:
+        if self._command_registry is None:
+            self._command_registry = CommandRegistry(self)
+        return self._command_registry
+
+    def invalidate_command_registry(self):
+        self._command_registry = None
+
+    def add_command(self, command: discord.ext.commands.Command):
+        # Loading, unloading and reloading extensions all go through add_command and remove_command.
+        super().add_command(command)
+        self.invalidate_command_registry()
+
+    def remove_command(self, name: str) -> Optional[discord.ext.commands.Command]:
+        command = super().remove_command(name)
+        self.invalidate_command_registry()
+        return command
+
     async def execute(self, function: Callable[..., _T], *args, **kwargs) -> _T:
         return await self.loop.run_in_executor(None, functools.partial(function, *args, **kwargs))
 
@@ -160,17 +188,18 @@ class PokestarBot(discord.ext.commands.Bot):
             guild = None
         user = self.get_user(guild, payload.user_id)
         emoji = payload.emoji
-        for func in self.on_reaction_funcs.values():
+        for name, func in self.on_reaction_funcs.items():
             try:
-                await func(message, emoji, user)
+                with self.metrics.time("event", f"on_reaction:{name}"):
+                    await func(message, emoji, user)
             except discord.ext.commands.CommandError as exc:
-                ctx = self.get_context_from_traceback(exc.__traceback__)
+                ctx = get_log_context().ctx or self.get_context_from_traceback(exc.__traceback__)
                 if ctx is None:
                     raise
                 else:
                     await self.on_command_error(ctx, exc)
             except Exception as exc:
-                ctx = self.get_context_from_traceback(exc.__traceback__)
+                ctx = get_log_context().ctx or self.get_context_from_traceback(exc.__traceback__)
                 if ctx is None:
                     raise
                 else:
@@ -453,18 +482,27 @@ class PokestarBot(discord.ext.commands.Bot):
             "microsecond": dt_obj.microsecond
         }
 
-    @staticmethod
-    async def send_all(ctx: discord.abc.Messageable, embed_list: List[discord.Embed]) -> List[discord.Message]:
-        return [await ctx.send(embed=item) for item in embed_list]
+    async def run_bulk_job(self, ctx: HubContext, title: str, items: List[Tuple[int, str, Dict[str, Any]]]) -> Tuple[List[int], List[int]]:
+        """Run ``(target_id, operation, kwargs)`` items through a resumable :class:`BulkJob`, returning the succeeded and failed target IDs."""
+        job = BulkJob(self, ctx.guild, ctx.channel, title, items, author_id=ctx.author.id)
+        return await job.run()
+
+    async def send_all(self, ctx: discord.abc.Messageable, embed_list: List[discord.Embed]) -> List[discord.Message]:
+        return await self.outbound.send_all(ctx, embed_list)
 
     def command_disabled(self, ctx: HubContext):
+        """Check if the command or any of its parent groups are disabled for the Guild. This walks up the command's parents, so it costs one set
+        lookup per level no matter how many commands the Guild has disabled."""
         if not hasattr(ctx.guild, "id"):
             return False
-        guild_data = self.disabled_commands.get(getattr(ctx.guild, "id", None), [])
-        cmd_name = getattr(ctx.command, 'qualified_name', '')
-        for name in guild_data:
-            if name.startswith(cmd_name):
+        guild_data = self.disabled_commands.get(ctx.guild.id)
+        if not guild_data:
+            return False
+        command = ctx.command
+        while command is not None:
+            if command.qualified_name in guild_data:
                 return True
+            command = command.parent
         return False
 
     @overload
@@ -536,6 +574,15 @@ class PokestarBot(discord.ext.commands.Bot):
                 """CREATE TABLE IF NOT EXISTS BLACKLISTED_EMOJIS(ID INTEGER PRIMARY KEY AUTOINCREMENT, GUILD_ID BIGINT NOT NULL, EMOJI TEXT NOT 
                 NULL, UNIQUE(GUILD_ID, EMOJI))"""):
             pass
+        async with self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS BULK_JOBS(ID INTEGER PRIMARY KEY AUTOINCREMENT, GUILD_ID BIGINT NOT NULL, CHANNEL_ID BIGINT NOT NULL, 
+                MESSAGE_ID BIGINT, AUTHOR_ID BIGINT NOT NULL, TITLE TEXT NOT NULL, STATUS SMALLINT NOT NULL)"""):
+            pass
+        async with self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS BULK_JOB_ITEMS(ID INTEGER PRIMARY KEY AUTOINCREMENT, JOB_ID INTEGER NOT NULL REFERENCES BULK_JOBS(ID) 
+                ON DELETE CASCADE, TARGET_ID BIGINT NOT NULL, OPERATION TEXT NOT NULL, ARGS TEXT NOT NULL, STATUS SMALLINT NOT NULL, 
+                UNIQUE (JOB_ID, TARGET_ID, OPERATION))"""):
+            pass
 
     @staticmethod
     def check_recursive(func_name: str, command: discord.ext.commands.Command, *checks):
@@ -563,6 +610,18 @@ class PokestarBot(discord.ext.commands.Bot):
             guild_data = self.channel_data.setdefault(guild_id, {})
             guild_data[channel_name] = channel_id
 
+    async def add_channel_mapping(self, guild_id: int, channel_name: str, channel_id: int):
+        """Add a guild-channel mapping. Raises :class:`sqlite3.IntegrityError` if the mapping already exists."""
+        async with self.conn.execute("""INSERT INTO CHANNEL_DATA(GUILD_ID, CHANNEL_NAME, CHANNEL_ID) VALUES (?, ?, ?)""",
+                                     [guild_id, channel_name, channel_id]):
+            pass
+        self.channel_data.setdefault(guild_id, {})[channel_name] = channel_id
+
+    async def remove_channel_mapping(self, guild_id: int, channel_name: str):
+        async with self.conn.execute("""DELETE FROM CHANNEL_DATA WHERE GUILD_ID==? AND CHANNEL_NAME==?""", [guild_id, channel_name]):
+            pass
+        self.channel_data.get(guild_id, {}).pop(channel_name, None)
+
     def get_option(self, guild_id: Optional[int], option: str, *, allow_dm: bool = False):
         assert option in option_types, f"Option {option!r} does not exist currently."
         if not isinstance(guild_id, int) and hasattr(guild_id, "id"):
@@ -582,19 +641,30 @@ class PokestarBot(discord.ext.commands.Bot):
         for guild_id, option, enabled in data:
             guild_data = self.options.setdefault(guild_id, {})
             guild_data[option] = bool(enabled)
-        for guild in self.guilds:
-            guild_id = guild.id
-            guild_data = self.options.setdefault(guild_id, {})
+        await self.seed_default_options(self.guilds)
+
+    async def seed_default_options(self, guilds: List[discord.Guild]):
+        """Fill in the default value of every option that the given Guilds are missing, writing all of the new rows in one batch."""
+        rows = []
+        for guild in guilds:
+            guild_data = self.options.setdefault(guild.id, {})
             for option_name, (long_name, default_value, description) in option_types.items():
                 if option_name not in guild_data:
                     guild_data[option_name] = default_value
-                    async with self.conn.execute("""INSERT INTO OPTIONS(GUILD_ID, OPTION_NAME, ENABLED) VALUES (?, ?, ?)""",
-                                                 [guild_id, option_name, default_value]):
-                        pass
+                    rows.append((guild.id, option_name, default_value))
+        if rows:
+            async with self.conn.executemany("""INSERT OR IGNORE INTO OPTIONS(GUILD_ID, OPTION_NAME, ENABLED) VALUES (?, ?, ?)""", rows):
+                pass
+
+    async def set_option(self, guild_id: int, option_name: str, enabled: bool):
+        async with self.conn.execute("""INSERT INTO OPTIONS(GUILD_ID, OPTION_NAME, ENABLED) VALUES (?, ?, ?) ON CONFLICT(GUILD_ID, OPTION_NAME) 
+        DO UPDATE SET ENABLED=excluded.ENABLED""", [guild_id, option_name, enabled]):
+            pass
+        self.options.setdefault(guild_id, {})[option_name] = enabled
 
     async def on_guild_join(self, guild: discord.Guild):
         await self.wait_until_ready()
-        await self.get_option_mappings()
+        await self.seed_default_options([guild])
         await self.get_guild_stats(guild)
         await self.get_channel(bot_support_join_leave_channel_id).send("Joined Guild `" + guild.name + "`.")
 
@@ -610,7 +680,7 @@ class PokestarBot(discord.ext.commands.Bot):
         logger.warning("Guild unavaliable: %s", guild)
 
     async def blacklisted(self, guild_id: int, *emojis: str):
-        data = self.blacklisted_emojis.get(guild_id, [])
+        data = self.blacklisted_emojis.get(guild_id, set())
         if not data:
             return False
         for emoji in emojis:
@@ -623,16 +693,37 @@ class PokestarBot(discord.ext.commands.Bot):
         async with self.conn.execute("""SELECT GUILD_ID, EMOJI FROM BLACKLISTED_EMOJIS""") as cursor:
             data = await cursor.fetchall()
         for guild_id, emoji in data:
-            guild_data = self.blacklisted_emojis.setdefault(guild_id, [])
-            guild_data.append(emoji.lower())
+            guild_data = self.blacklisted_emojis.setdefault(guild_id, set())
+            guild_data.add(emoji.lower())
+
+    async def add_blacklisted_emoji(self, guild_id: int, emoji: str):
+        """Blacklist an emoji. Raises :class:`sqlite3.IntegrityError` if the emoji is already blacklisted."""
+        async with self.conn.execute("""INSERT INTO BLACKLISTED_EMOJIS(GUILD_ID, EMOJI) VALUES (?, ?)""", [guild_id, emoji]):
+            pass
+        self.blacklisted_emojis.setdefault(guild_id, set()).add(emoji.lower())
+
+    async def remove_blacklisted_emoji(self, guild_id: int, emoji: str):
+        async with self.conn.execute("""DELETE FROM BLACKLISTED_EMOJIS WHERE GUILD_ID==? AND EMOJI==?""", [guild_id, emoji]):
+            pass
+        self.blacklisted_emojis.get(guild_id, set()).discard(emoji.lower())
 
     async def get_disabled_commands(self):
         self.disabled_commands = {}
         async with self.conn.execute("""SELECT GUILD_ID, COMMAND_NAME FROM DISABLED_COMMANDS""") as cursor:
             data = await cursor.fetchall()
         for guild_id, command_name in data:
-            l = self.disabled_commands.setdefault(guild_id, [])
-            l.append(command_name)
+            self.disabled_commands.setdefault(guild_id, set()).add(command_name)
+
+    async def disable_command(self, guild_id: int, command_name: str):
+        """Disable a command for a Guild. Raises :class:`sqlite3.IntegrityError` if the command is already disabled."""
+        async with self.conn.execute("""INSERT INTO DISABLED_COMMANDS(GUILD_ID, COMMAND_NAME) VALUES (?, ?)""", [guild_id, command_name]):
+            pass
+        self.disabled_commands.setdefault(guild_id, set()).add(command_name)
+
+    async def enable_command(self, guild_id: int, command_name: str):
+        async with self.conn.execute("""DELETE FROM DISABLED_COMMANDS WHERE GUILD_ID==? AND COMMAND_NAME==?""", [guild_id, command_name]):
+            pass
+        self.disabled_commands.get(guild_id, set()).discard(command_name)
 
     async def get_disabled_channels(self):
         async with self.conn.execute("""SELECT GUILD_ID, CHANNEL_ID FROM DISABLED_STATS""") as cursor:
@@ -713,11 +804,18 @@ class PokestarBot(discord.ext.commands.Bot):
             self.session = ReloadingClient(bot=self, connector=aiohttp.TCPConnector(limit_per_host=5, limit=10))
 
     async def on_ready(self):
+        if self.startup_duration is None:
+            self.startup_duration = time.time() - psutil.Process().create_time()
+            logger.info("Bot ready %.3f seconds after the process started (%.3f seconds spent moving the previous logs).", self.startup_duration,
+                        archive_duration)
         logger.info("Bot ready.")
         print("Bot ready. All future output is going to the log file.")
         async with self.on_ready_wait:
             self.update_stats.start()
             await self.get_option_mappings()
+            if not self.bulk_jobs_resumed:
+                self.bulk_jobs_resumed = True
+                await BulkJob.resume_all(self)
             await self.get_all_stats()
 
     @staticmethod
@@ -785,7 +883,7 @@ class PokestarBot(discord.ext.commands.Bot):
             if getattr(message, "guild", None):
                 coros.extend((self.add_stat_on_message(message), self.check_spoiler(message), self.check_channel(message)))
             coros.append(super().on_message(message))
-        return await asyncio.gather(*coros)
+        return await asyncio.gather(*(self.metrics.timed("event", f"on_message:{coro.__qualname__}", coro) for coro in coros))
 
     async def add_stat_on_message(self, message: discord.Message):
         await self.stats_working_on(message.guild.id).wait()
@@ -805,9 +903,15 @@ class PokestarBot(discord.ext.commands.Bot):
         self.commands_processed += 1
 
     def dispatch(self, event_name: str, *args, **kwargs):
-        if not event_name.startswith("socket"):
-            self.events[event_name] = self.events.get(event_name, 0) + 1
-        super().dispatch(event_name, *args, **kwargs)
+        if event_name.startswith("socket"):
+            return super().dispatch(event_name, *args, **kwargs)
+        self.events[event_name] = self.events.get(event_name, 0) + 1
+        # Tasks copy the current context when they are created, so every listener scheduled here sees the event's log context.
+        token = log_context.set(LogContext.from_event_args(args) or LogContext())
+        try:
+            super().dispatch(event_name, *args, **kwargs)
+        finally:
+            log_context.reset(token)
 
     async def on_command(self, ctx: HubContext):
         command_logger.info("", extra={"ctx": ctx})
@@ -816,7 +920,23 @@ class PokestarBot(discord.ext.commands.Bot):
 
     async def invoke(self, ctx: HubContext):
         ctx.hub.add_breadcrumb({"category": "Command Start", "message": "Command has been identified and will be invoked.", "level": "info"})
-        return await super().invoke(ctx)
+        set_log_context(ctx)
+        start = time.perf_counter()
+        try:
+            return await super().invoke(ctx)
+        finally:
+            if ctx.command is not None:
+                self.metrics.observe("command", ctx.command.qualified_name, time.perf_counter() - start, ctx.command_failed)
+
+    async def _run_event(self, coro: Callable[..., Coroutine[None, None, Any]], event_name: str, *args, **kwargs):
+        # Timed inside discord.py's handler, so that exceptions are counted before on_error swallows them.
+        name = getattr(coro, "__qualname__", event_name)
+
+        async def timed(*event_args, **event_kwargs):
+            with self.metrics.time("event", name):
+                return await coro(*event_args, **event_kwargs)
+
+        return await super()._run_event(timed, event_name, *args, **kwargs)
 
     @discord.ext.tasks.loop(seconds=30)
     async def update_stats(self):
@@ -1066,9 +1186,7 @@ class PokestarBot(discord.ext.commands.Bot):
         logger.debug("Hit on-error!", stack_info=True)
         if str(exc) == "attempt to write a readonly database":
             await self.run_reload()
-        user, channel, command, message, ctx = get_context_variables_from_traceback(tb, break_on_message=False)
-        if not ctx:
-            _, _, _, _, ctx = get_context_variables(break_on_message=False)
+        user, channel, command, message, ctx = get_log_context().as_tuple()
         if not ctx:
             with sentry_sdk.push_scope() as scope:
                 guild: Optional[discord.Guild] = getattr(channel, "guild", None)
@@ -1088,6 +1206,8 @@ class PokestarBot(discord.ext.commands.Bot):
 
     async def close(self, self_initiated=False):
         logger.info("Started bot shutdown.")
+        self.loop_monitor.stop()
+        await self.metrics.stop_serving()
         if self.session is not None:
             await self.session.close()
         await self.conn.close()
@@ -1110,9 +1230,15 @@ class PokestarBot(discord.ext.commands.Bot):
 
     async def on_connect(self):
         logger.info("Bot has connected to Discord.")
+        self.loop_monitor.start()
+        if metrics_port:
+            try:
+                await self.metrics.serve(metrics_host, metrics_port)
+            except OSError:
+                logger.warning("Could not serve metrics on %s:%s", metrics_host, metrics_port, exc_info=True)
         if self.conn is None or not self.conn.is_alive():
-            self.conn = await aiosqlite.connect(os.path.abspath(os.path.join(__file__, "..", "database.db")), isolation_level=None)
-        startup = [self.pre_create(), self.get_channel_mappings(), self.get_disabled_commands(), self.get_disabled_channels(),
+            self.conn = await Database(os.path.abspath(os.path.join(__file__, "..", "database.db")), metrics=self.metrics).connect()
+        startup = [self.pre_create(), self.conn.migrate(), self.get_channel_mappings(), self.get_disabled_commands(), self.get_disabled_channels(),
                    self.get_blacklist_mappings()]
         for item in startup:
             await item
@@ -0,0 +1,77 @@
+"""Runs a single block of code for ``%eval`` / ``%exec``, started ahead of time by :class:`bot_data.utils.code_runner.CodeRunner` with
+``python -I``.
+
+The worker applies its resource limits, reports that it is ready, then waits for one JSON request (``code`` and ``exec``) on stdin. Everything the
+code prints is streamed back as JSON lines (``{"stream": "stdout", "data": ...}``), followed by a ``{"result": ...}`` line. The worker exits
+after one block, so blocks never share state or output. Like log_archiver.py, this must not import ``bot_data``.
+"""
+import io
+import json
+import pprint
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+pipe = sys.stdout
+
+
+class StreamWriter(io.TextIOBase):
+    def __init__(self, name: str):
+        self.name = name
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: str) -> int:
+        # Small chunks keep every line well under the parent's line length limit.
+        for start in range(0, len(data), 8192):
+            send({"stream": self.name, "data": data[start:start + 8192]})
+        return len(data)
+
+
+def send(message: dict):
+    pipe.write(json.dumps(message) + "\n")
+    pipe.flush()
+
+
+def set_limits(cpu_seconds: int, memory_bytes: int):
+    if resource is None:
+        return
+    if cpu_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    if memory_bytes:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+        except (ValueError, OSError):  # Not supported on macOS
+            pass
+
+
+def run(code: str, is_exec: bool, output_limit: int) -> dict:
+    namespace = {"__name__": "__main__", "__builtins__": __builtins__}
+    try:
+        output = (exec if is_exec else eval)(code, namespace)
+    except BaseException as exc:
+        traceback.print_exception(type(exc), exc, exc.__traceback__.tb_next)
+        return {"ok": False, "value": None, "truncated": False}
+    if is_exec:
+        return {"ok": True, "value": None, "truncated": False}
+    value = pprint.pformat(output)
+    return {"ok": True, "value": value[:output_limit], "truncated": len(value) > output_limit}
+
+
+def main():
+    set_limits(int(sys.argv[1]), int(sys.argv[2]))
+    sys.stdout = StreamWriter("stdout")
+    sys.stderr = StreamWriter("stderr")
+    send({"ready": True})
+    request = json.loads(sys.stdin.readline())
+    sys.stdin = io.StringIO()
+    send({"result": run(request["code"], request["exec"], int(sys.argv[3]))})
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,14 @@ from .creds import bot_client_id, github_token, support_code
 from .version import bot_version  # NOQA
 
 
+# __init__.py
+log_archive_codec = "bz2"  # gz, bz2 or xz
+log_archive_level = 9
+log_archive_max_count = 0  # 0 keeps every archive
+log_archive_max_bytes = 0  # 0 for no limit
+log_backup_count = 4  # Rotated copies of bot.log kept while the bot runs
+
+
 # const.py
 class CHANNEL_TYPE(enum.IntEnum):
     TEXT_CHANNEL = 0
@@ -16,6 +24,73 @@ class CHANNEL_TYPE(enum.IntEnum):
     VOICE_CHANNEL = 2
 
 
+# utils/bulk_job.py
+class BULK_JOB_STATUS(enum.IntEnum):
+    PENDING = 0
+    RUNNING = 1
+    DONE = 2
+    FAILED = 3
+    SKIPPED = 4  # The target no longer exists
+
+
+# utils/latex_renderer.py
+latex_workers = 2
+latex_timeout = 10.0  # Seconds
+latex_max_bytes = 8 * (1024 ** 2)  # Discord's upload limit
+latex_cache_bytes = 32 * (1024 ** 2)
+latex_fontsize = 16
+latex_dpi = 600
+
+
+# utils/tts_cache.py
+tts_cache_dir = os.path.abspath(os.path.join(__file__, "..", "..", "tts_cache"))
+tts_cache_bytes = 256 * (1024 ** 2)
+tts_workers = 2
+tts_voice = "us-mbrola-1"  # espeak-ng voice, pyttsx3 uses the system default
+tts_bitrate = 64  # kbps
+
+
+# utils/loop_monitor.py
+loop_monitor_interval = 0.1  # Seconds between lag samples
+loop_monitor_threshold = 0.5  # Seconds the loop has to be blocked for before its stack is captured
+
+
+# utils/metrics.py
+metrics_prefix = "pokestarbot"
+metrics_host = "127.0.0.1"
+metrics_port = 0  # Port to serve Prometheus metrics on, 0 to not serve them
+
+
+# utils/snapshot_store.py
+snapshot_path = os.path.abspath(os.path.join(__file__, "..", "..", "snapshots.json.gz"))
+
+
+# utils/code_runner.py
+code_warm_workers = 2
+code_timeout = 30.0  # Wall-clock seconds
+code_cpu_limit = 20  # CPU seconds
+code_memory_limit = 512 * (1024 ** 2)
+code_output_limit = 64 * 1024  # Characters kept per stream
+
+
+# utils/database.py
+db_reader_count = 3
+db_statement_cache_size = 256
+slow_query_threshold = 0.25  # Seconds
+db_pragmas = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,  # 16 MiB
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+db_reader_pragmas = {
+    "cache_size": -8000,  # 8 MiB
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+    "query_only": "ON",
+}
+
 # bot.py
 invalid_spoiler = re.compile(r"(?<!\|)(\|\|[^|]+\||\|[^|]+\|\|)(?!\|)", flags=re.UNICODE | re.MULTILINE | re.IGNORECASE)
 url_regex = re.compile(
@@ -59,7 +134,6 @@ MAL_ANIME_FIELDS = ['id', 'title', 'main_picture', 'alternative_titles', 'start_
                     'num_episodes', 'start_season', 'broadcast', 'source', 'average_episode_duration', 'rating']
 
 # management.py
-log_line = re.compile(r"\((DEBUG|INFO|WARNING|ERROR|CRITICAL)\):")
 channel_types = {
     "Generic Bot Channels": {
         "announcements": ("Shows important announcements from the bot. Used to announce winners in Waifu Wars.", CHANNEL_TYPE.TEXT_CHANNEL),
@@ -6,12 +6,13 @@ import logging
 import pprint
 import subprocess
 import traceback
-from typing import Optional, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING, Tuple
 
 import discord.ext.commands
 
 from . import PokestarBotCog
-from ..utils import Embed, parse_discord_code_block, send_embeds_fields, HubContext, generate_embeds_fields
+from ..const import code_output_limit
+from ..utils import CodeRunner, Embed, parse_discord_code_block, send_embeds_fields, HubContext, generate_embeds_fields
 
 if TYPE_CHECKING:
     from ..bot import PokestarBot
@@ -20,44 +21,68 @@ logger = logging.getLogger(__name__)
 
 
 class Code(PokestarBotCog):
-    async def python_code_base(self, ctx: HubContext, code: str, is_exec: bool, block_num: Optional[int] = None):
-        stdout = io.StringIO()
-        stderr = io.StringIO()
-        threw_exception = False
-        func = exec if is_exec else eval
-        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
-            try:
-                output = func(code)
-            except Exception as exc:
-                threw_exception = True
-                exc.__traceback__ = exc.__traceback__.tb_next
-                logger.warning("%s command lead to exception:", "Exec" if is_exec else "Eval", exc_info=exc)
-                traceback.print_exception(type(exc), exc, exc.__traceback__)
-        stdout.seek(0)
-        stderr.seek(0)
-        stdout_text = stdout.read()
-        stderr_text = stderr.read()
+    def __init__(self, bot: "PokestarBot"):
+        super().__init__(bot)
+        self.runner = CodeRunner()
+        self.bot.loop.create_task(self.runner.start())
+
+    def cog_unload(self):
+        self.bot.loop.create_task(self.runner.close())
+
+    async def send_python_results(self, ctx: HubContext, code: str, is_exec: bool, block_num: Optional[int], stdout_text: str, stderr_text: str,
+                                  threw_exception: bool, output: Optional[str], extra_fields: List[Tuple[str, str]] = ()):
         embed = Embed(ctx, title="Python Code Execution Results", description="Code Executed:\n```python\n{}\n```".format(code),
                       color=(discord.Color.green() if not threw_exception else discord.Color.red()))
         embed.add_field(name="Mode", value="Exec" if is_exec else "Eval")
         embed.add_field(name="Code Block Number", value=str(1 if not block_num else block_num))
+        for name, value in extra_fields:
+            embed.add_field(name=name, value=value)
         fields = []
         if stdout_text:
             fields.append(("Stdout", stdout_text))
         if stderr_text:
             fields.append(("Stderr", stderr_text))
         if not is_exec and not threw_exception:
-            output = pprint.pformat(output)
             fields.append(("Output", output))
         embeds = await generate_embeds_fields(embed, fields, template="```py\n", ending="\n```", inline_fields=False)
         await self.bot.send_all(ctx, embeds)
         return len(embeds) == 1
 
-    async def process_base(self, ctx: HubContext, code: str, is_exec: bool, block_num: Optional[int] = None, _single: bool = True):
+    async def python_code_base(self, ctx: HubContext, code: str, is_exec: bool, block_num: Optional[int] = None):
+        result = await self.runner.run(code, is_exec)
+        if not result.ok:
+            logger.warning("%s command lead to exception:\n%s", "Exec" if is_exec else "Eval", result.stderr)
+        extra_fields = [("Time To Run", f"{result.duration:.3f}s")]
+        if result.truncated:
+            extra_fields.append(("Output Truncated", f"Only the first {code_output_limit} characters of each stream were kept."))
+        return await self.send_python_results(ctx, code, is_exec, block_num, result.stdout, result.stderr, not result.ok, result.value,
+                                              extra_fields)
+
+    async def python_code_local(self, ctx: HubContext, code: str, is_exec: bool, block_num: Optional[int] = None):
+        """Runs the code in the bot process, with access to the cog (``self``) and ``ctx``. This blocks the event loop until the code finishes."""
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        threw_exception = False
+        output = None
+        func = exec if is_exec else eval
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                output = func(code)
+            except Exception as exc:
+                threw_exception = True
+                exc.__traceback__ = exc.__traceback__.tb_next
+                logger.warning("%s command lead to exception:", "Exec" if is_exec else "Eval", exc_info=exc)
+                traceback.print_exception(type(exc), exc, exc.__traceback__)
+        return await self.send_python_results(ctx, code, is_exec, block_num, stdout.getvalue(), stderr.getvalue(), threw_exception,
+                                              pprint.pformat(output))
+
+    async def process_base(self, ctx: HubContext, code: str, is_exec: bool, block_num: Optional[int] = None, _single: bool = True,
+                           local: bool = False):
         num = 1
         start = datetime.datetime.now()
         if "```" not in code:
-            multiple = await self.python_code_base(ctx, code, is_exec, block_num=block_num)
+            runner = self.python_code_local if local else self.python_code_base
+            multiple = await runner(ctx, code, is_exec, block_num=block_num)
         else:
             try:
                 items = await parse_discord_code_block(code)
@@ -67,7 +92,7 @@ class Code(PokestarBotCog):
                                                                       "{}\n```".format(code))
             tasks = []
             for num, item in enumerate(items, start=1):
-                tasks.append(self.process_base(ctx, item, is_exec, block_num=num, _single=False))
+                tasks.append(self.process_base(ctx, item, is_exec, block_num=num, _single=False, local=local))
             multiple = num > 1
             await asyncio.gather(*tasks)
         if _single and multiple:
@@ -132,6 +157,16 @@ class Code(PokestarBotCog):
     async def command_exec(self, ctx: HubContext, *, code: str):
         await self.process_base(ctx, code, True)
 
+    @discord.ext.commands.command(name="local_eval", brief="Evaluate python code inside the bot process", usage="code", not_channel_locked=True)
+    @discord.ext.commands.is_owner()
+    async def command_local_eval(self, ctx: HubContext, *, code: str):
+        await self.process_base(ctx, code, False, local=True)
+
+    @discord.ext.commands.command(name="local_exec", brief="Execute python code inside the bot process", usage="code", not_channel_locked=True)
+    @discord.ext.commands.is_owner()
+    async def command_local_exec(self, ctx: HubContext, *, code: str):
+        await self.process_base(ctx, code, True, local=True)
+
     @discord.ext.commands.command(name="bash", brief="Execute bash shell code", usage="code", aliases=["sh", "shell"], not_channel_locked=True)
     @discord.ext.commands.is_owner()
     async def command_bash(self, ctx: HubContext, *, code: str):
@@ -1,7 +1,8 @@
+import inspect
 import itertools
 import logging
 import os
-from typing import Dict, Iterable, List, Optional, TYPE_CHECKING
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, TYPE_CHECKING, Union
 
 import anytree
 import discord.ext.commands
@@ -25,14 +26,10 @@ class Help(PokestarBotCog):
         return file_path, os.path.exists(file_path)
 
     def get_help_file(self, command: str) -> str:
-        file_path, exists = self.help_file_exists(command)
-        if not exists:
+        data = self.bot.command_registry.help_file(command)
+        if not data:
             return "[No Extended Help]"
-        with open(file_path, encoding="utf-8") as file:
-            data = file.read().rstrip()
-            if not data:
-                return "[No Extended Help]"
-            return support_line + data.format(prefix=self.bot.command_prefix)
+        return support_line + data.format(prefix=self.bot.command_prefix)
 
     @discord.ext.commands.group(brief="Get the full extended help on a command.", usage="command",
                                 aliases=["extendedhelp", "exthelp", "ext_help", "man"], invoke_without_command=True)
@@ -48,8 +45,7 @@ class Help(PokestarBotCog):
     @discord.ext.commands.dm_only()
     async def pre_create(self, ctx: HubContext):
         count = 0
-        commands = {command.qualified_name: command for command in self.bot.walk_commands()}
-        commands.update(self.bot.cogs)
+        commands = {**self.bot.command_registry.commands, **self.bot.cogs}
         for name, command_or_cog in commands.items():
             path = os.path.join(self.HELP_FILE_DIR, name.lower() + ".md")
             if not os.path.exists(path) or os.stat(path).st_size == 0:
@@ -63,6 +59,7 @@ class Help(PokestarBotCog):
                                 file.write(f"* `{param.name}`:\n")
                             file.write("\nExamples:\n")
                 count += 1
+        self.bot.invalidate_command_registry()
         logger.info("Created %s files", count)
         embed = Embed(ctx, title="File Creation Was Successful", color=discord.Color.green(),
                       description="The extended help files were successfully created.")
@@ -74,9 +71,7 @@ class Help(PokestarBotCog):
     @discord.ext.commands.dm_only()
     async def man_prune(self, ctx: HubContext):
         count = 0
-        commands = [command.qualified_name for command in self.bot.walk_commands()]
-        commands.extend(name for name in self.bot.cogs.keys())
-        commands = set(command.lower() + ".md" for command in commands)
+        commands = set(command.lower() + ".md" for command in itertools.chain(self.bot.command_registry.command_names, self.bot.cogs.keys()))
         files = {file for file in os.listdir(self.HELP_FILE_DIR) if file.endswith(".md")}
         difference = files - commands
         for file in difference:
@@ -84,6 +79,7 @@ class Help(PokestarBotCog):
             ctx.hub.add_breadcrumb(category="File Deletion", message=f"File {path} will be deleted.")
             os.remove(path)
             count += 1
+        self.bot.invalidate_command_registry()
         logger.info("Pruned %s files", count)
         embed = Embed(ctx, title="File Prune Successful", color=discord.Color.green(),
                       description="The extended help files were successfully pruned.")
@@ -116,11 +112,11 @@ class CustomHelp(discord.ext.commands.HelpCommand):
 
     @property
     def commands(self) -> Dict[str, discord.ext.commands.Command]:
-        return {command.qualified_name: command for command in self.bot.walk_commands()}
+        return self.bot.command_registry.commands
 
     @property
     def command_names(self) -> List[str]:
-        return sorted(self.commands.keys())
+        return self.bot.command_registry.command_names
 
     async def filtered_commands(self) -> List[discord.ext.commands.Command]:
         commands = self.get_bot_mapping().values()
@@ -132,7 +128,7 @@ class CustomHelp(discord.ext.commands.HelpCommand):
     def cog_node(self, cog: PokestarBotCog):
         return CogNode(cog, self.bot_node())
 
-    async def get_node(self, command: List[str]):
+    async def get_node(self, command: List[str], children: Optional[List[discord.ext.commands.Command]] = None):
         node = self.bot_node()
         _command = command.copy()
         while command:
@@ -144,8 +140,10 @@ class CustomHelp(discord.ext.commands.HelpCommand):
         if not isinstance(node.command, discord.ext.commands.Group):
             return node
         else:
-            children = await self.filter_commands(node.command.commands, sort=True)
-            node._commands = children
+            if children is None:
+                children = await self.filter_commands(node.command.commands, sort=True)
+            node._commands = tuple(children)
+            node._child_nodes = None
             return node
 
     def help_file_exists(self, command: str):
@@ -153,58 +151,70 @@ class CustomHelp(discord.ext.commands.HelpCommand):
         return file_path, os.path.exists(file_path)
 
     def get_help_file(self, command: str) -> str:
-        command = command.lower()
-        file_path, exists = self.help_file_exists(command)
-        if not exists:
+        data = self.bot.command_registry.help_file(command)
+        if data is None:
             return ""
-        with open(file_path, encoding="utf-8") as file:
-            data = support_line + file.read().rstrip().format(prefix=self.bot.command_prefix)
-            if len(data) > 2048:
-                return data[:2045] + "..."
-            else:
-                return data
+        data = support_line + data.format(prefix=self.bot.command_prefix)
+        if len(data) > 2048:
+            return data[:2045] + "..."
+        else:
+            return data
 
     @staticmethod
     async def render(node: anytree.NodeMixin, maxlevel: Optional[int] = None):
-        string = ""
-        for pre, fill, node_obj in anytree.RenderTree(node, maxlevel=maxlevel):
-            string += "{}{}\n".format(pre, repr(node_obj))
-        return string.rstrip()
+        return "\n".join("{}{}".format(pre, repr(node_obj)) for pre, fill, node_obj in anytree.RenderTree(node, maxlevel=maxlevel)).rstrip()
+
+    async def render_cached(self, view: Hashable, make_node: Callable[[], Union[anytree.NodeMixin, Awaitable[anytree.NodeMixin]]],
+                            maxlevel: Optional[int] = None, commands: Optional[List[discord.ext.commands.Command]] = None) -> str:
+        """Render the tree from ``make_node``, or reuse the render for the same view and the same set of permitted ``commands`` (None if the view
+        is not filtered). The node is only built on a miss."""
+        registry = self.bot.command_registry
+        key = (view, registry.permission_set(commands))
+        if key not in registry.renders:
+            node = make_node()
+            if inspect.isawaitable(node):
+                node = await node
+            registry.renders[key] = await self.render(node, maxlevel=maxlevel)
+        return registry.renders[key]
 
     async def with_cog(self):
         embed = Embed(self.ctx, title="Bot Help/Commands", description=self.get_help_file("help") or discord.Embed.Empty)
         fields = []
         for cog in self.bot_node().children:
-            fields.append((cog.name, await self.render(cog)))
+            fields.append((cog.name, await self.render_cached(("cog", cog.name), lambda: cog)))
         await send_embeds_fields(self.get_destination(), embed, fields, template="```\n", ending="\n```")
 
     async def cog_list(self):
         await send_embeds_fields(self.get_destination(),
                                  Embed(self.ctx, title="Cog List", description=self.get_help_file("help") or discord.Embed.Empty),
-                                 [("\u200b", await self.render(self.bot_node(cog_mode=True), maxlevel=2))], template="```\n", ending="\n```")
+                                 [("\u200b", await self.render_cached("cog_list", lambda: self.bot_node(cog_mode=True), maxlevel=2))],
+                                 template="```\n", ending="\n```")
 
     async def commands_only(self):
+        commands = await self.filtered_commands()
         await send_embeds_fields(self.get_destination(), Embed(self.ctx, title="Bot Help/Commands"),
-                                 [("\u200b", await self.render(self.bot_node(cog_mode=False, commands=await self.filtered_commands()), maxlevel=2))],
+                                 [("\u200b", await self.render_cached("commands", lambda: self.bot_node(cog_mode=False, commands=commands), maxlevel=2,
+                                                                      commands=commands))],
                                  template="```\n", ending="\n```")
 
     async def all_commands(self):
         await send_embeds_fields(self.get_destination(),
                                  Embed(self.ctx, title="Bot Help/Commands", description=self.get_help_file("help") or discord.Embed.Empty),
-                                 [("\u200b", await self.render(self.bot_node(cog_mode=False), maxlevel=2))],
+                                 [("\u200b", await self.render_cached("all", lambda: self.bot_node(cog_mode=False), maxlevel=2))],
                                  template="```\n", ending="\n```")
 
     async def all_commands_nested(self):
         await send_embeds_fields(self.get_destination(),
                                  Embed(self.ctx, title="Bot Help/Commands", description=self.get_help_file("help") or discord.Embed.Empty),
-                                 [("\u200b", await self.render(self.bot_node(cog_mode=False), maxlevel=None))],
+                                 [("\u200b", await self.render_cached("all_nested", lambda: self.bot_node(cog_mode=False), maxlevel=None))],
                                  template="```\n", ending="\n```")
 
     async def nested(self):
+        commands = await self.filtered_commands()
         await send_embeds_fields(self.get_destination(),
                                  Embed(self.ctx, title="Bot Help/Commands", description=self.get_help_file("help") or discord.Embed.Empty),
-                                 [("\u200b",
-                                   await self.render(self.bot_node(cog_mode=False, commands=await self.filtered_commands()), maxlevel=None))],
+                                 [("\u200b", await self.render_cached("nested", lambda: self.bot_node(cog_mode=False, commands=commands), maxlevel=None,
+                                                                      commands=commands))],
                                  template="```\n", ending="\n```")
 
     async def send_bot_help(self, _=None):
@@ -223,17 +233,20 @@ class CustomHelp(discord.ext.commands.HelpCommand):
         cog = self.cog_node(cog)
         await send_embeds_fields(self.get_destination(),
                                  Embed(self.ctx, title="Help on Cog {}".format(cog), description=self.get_help_file(str(cog)) or discord.Embed.Empty),
-                                 [("Subcommands", await self.render(cog))], template="```\n", ending="\n```")
+                                 [("Subcommands", await self.render_cached(("cog", cog.name), lambda: cog))], template="```\n", ending="\n```")
 
     async def send_group_help(self, group: discord.ext.commands.Group):
         embed = Embed(self.ctx, title="Help for Command `{}{}`".format(self.bot.command_prefix, group.qualified_name),
                       description=self.get_help_file(group.qualified_name) or discord.Embed.Empty)
-        node = await self.get_node([word for word in group.qualified_name.split(" ") if word.strip()])
+        children = await self.filter_commands(group.commands, sort=True)
         fields = [("Aliases", "\n".join(group.aliases) or "None"), ("Brief", group.brief or "None"),
                   ("Usage", "`" + self.bot.command_prefix + group.qualified_name + (" " + group.signature if group.signature else "") + "`")]
         for name, value in fields:
             embed.add_field(name=name, value=value)
-        await send_embeds_fields(self.get_destination(), embed, [("Subcommands", await self.render(node))], template="```\n", ending="\n```")
+        render = await self.render_cached(("group", group.qualified_name),
+                                          lambda: self.get_node([word for word in group.qualified_name.split(" ") if word.strip()], children=children),
+                                          commands=children)
+        await send_embeds_fields(self.get_destination(), embed, [("Subcommands", render)], template="```\n", ending="\n```")
 
     async def send_command_help(self, command: discord.ext.commands.Command):
         embed = Embed(self.ctx, title="Help for Command `{}{}`".format(self.bot.command_prefix, command.qualified_name),
@@ -6,13 +6,13 @@ import signal
 import sqlite3
 from typing import List, Optional, TYPE_CHECKING, Union
 
-import aiosqlite
 import discord.ext.commands
 
 from . import PokestarBotCog
 from .. import base
-from ..const import CHANNEL_TYPE, channel_types, hideable_channel_types, log_line, option_types, writeable_channel_types
-from ..utils import Embed, admin_or_bot_owner, break_into_groups, send_embeds, send_embeds_fields, HubContext
+from ..const import CHANNEL_TYPE, channel_types, hideable_channel_types, option_types, writeable_channel_types
+from ..utils import Embed, LogFilter, admin_or_bot_owner, break_into_groups, send_embeds, send_embeds_fields, tail_log, HubContext
+from ..utils.migrations import hot_queries
 
 if TYPE_CHECKING:
     from ..bot import PokestarBot
@@ -21,7 +21,6 @@ logger = logging.getLogger(__name__)
 
 
 class Management(PokestarBotCog):
-    log_line = log_line
 
     CHANNELS = channel_types
 
@@ -42,26 +41,30 @@ class Management(PokestarBotCog):
         await ctx.send(embed=embed)
         await self.bot.run_reload()
 
-    @discord.ext.commands.command(brief="Fetch bot logs.", usage="number")
+    @discord.ext.commands.command(brief="Fetch bot logs.", usage="[number] [filter=value] [...]",
+                                  help="Filters can be any of `level` (minimum level), `module`, `user`, `channel`, `command` and `message_id`. "
+                                       "For example, `logs 10 level=warning module=bot`.")
     @discord.ext.commands.is_owner()
     @discord.ext.commands.dm_only()
-    async def logs(self, ctx: HubContext, number: int = 20):
-        ctx.hub.add_breadcrumb(category="Logs", message=f"Fetching {number} log entries.", level="debug")
-        with open(os.path.join(base, "bot.log"), "r", encoding="utf-8") as logfile:
-            lines = logfile.read().splitlines(False)
-        lines.reverse()
-        send_lines = []
-        counter = 0
-        for line in lines:
-            send_lines.append(line)
-            if self.log_line.search(line):
-                counter += 1
-            if counter == number:
-                break
-        send_lines.reverse()
-        groups = await break_into_groups("\n".join(send_lines), template="```\n")
+    async def logs(self, ctx: HubContext, number: Optional[int] = 20, *filters: str):
+        number = number or 20
+        kwargs = {}
+        for item in filters:
+            key, sep, value = item.partition("=")
+            if not sep or key.lower() not in LogFilter.keys:
+                raise discord.ext.commands.BadArgument(f"Filter `{item}` is not one of {', '.join(f'`{key}=`' for key in LogFilter.keys)}.")
+            kwargs[key.lower()] = value
+        try:
+            log_filter = LogFilter(**kwargs)
+        except ValueError as exc:
+            raise discord.ext.commands.BadArgument(str(exc)) from exc
+        ctx.hub.add_breadcrumb(category="Logs", message=f"Fetching {number} log entries.", data={"filter": str(log_filter)}, level="debug")
+        records = await self.bot.execute(tail_log, os.path.join(base, "bot.log"), number, log_filter)
+        groups = await break_into_groups("\n".join(records), template="```\n")
         embed = Embed(ctx, title="Log Lines")
         embed.add_field(name="Amount Requested", value=str(number), inline=False)
+        embed.add_field(name="Amount Found", value=str(len(records)), inline=False)
+        embed.add_field(name="Filter", value=str(log_filter), inline=False)
         await send_embeds(ctx, embed, groups)
 
     @discord.ext.commands.command(brief="Resets the bot's permission overrides", enabled=False)
@@ -110,10 +113,8 @@ class Management(PokestarBotCog):
             embed.add_field(name="Provided Name", value=name)
             return await ctx.send(embed=embed)
         try:
-            async with self.bot.conn.execute("""INSERT INTO CHANNEL_DATA(GUILD_ID, CHANNEL_NAME, CHANNEL_ID) VALUES (?, ?, ?)""",
-                                             [guild.id, name, channel.id]):
-                pass
-        except aiosqlite.IntegrityError:
+            await self.bot.add_channel_mapping(guild.id, name, channel.id)
+        except sqlite3.IntegrityError:
             embed = Embed(ctx, title="Guild-Channel Mapping Already Exists", description="The channel name for this guild already exists.",
                           color=discord.Color.red())
             embed.add_field(name="Guild ID", value=str(guild.id))
@@ -121,31 +122,24 @@ class Management(PokestarBotCog):
             embed.add_field(name="Channel", value=channel.mention)
             await ctx.send(embed=embed)
         else:
-            ctx.hub.add_breadcrumb(category="Channel Mapping", message="Updating bot channel mappings.", level="debug")
-            coros = [self.bot.get_channel_mappings()]
             embed = Embed(ctx, title="Guild-Channel Mapping Added", description="The channel name for this guild has been added.",
                           color=discord.Color.green())
             embed.add_field(name="Guild ID", value=str(guild.id))
             embed.add_field(name="Channel Name", value=name)
             embed.add_field(name="Channel", value=channel.mention)
-            coros.append(ctx.send(embed=embed))
-            await asyncio.gather(*coros)
+            await ctx.send(embed=embed)
 
     @channel.command(name="remove", brief="Delete the channel in the guild-channel database", usage="name", aliases=["delete"], significant=True)
     @discord.ext.commands.has_guild_permissions(manage_channels=True)
     async def channel_remove(self, ctx: HubContext, name: str):
         guild = ctx.guild
         ctx.hub.add_breadcrumb(category="Channel Mapping", message=f"Removing the {name!r} channel mapping.", data={"guild_id": ctx.guild.id})
-        async with self.bot.conn.execute("""DELETE FROM CHANNEL_DATA WHERE GUILD_ID==? AND CHANNEL_NAME==?""", [guild.id, name]):
-            pass
-        ctx.hub.add_breadcrumb(category="Channel Mapping", message="Updating bot channel mappings.", level="debug")
-        coros = [self.bot.get_channel_mappings()]
+        await self.bot.remove_channel_mapping(guild.id, name)
         embed = Embed(ctx, title="Guild-Channel Mapping Deleted", description="The channel name for this guild has been deleted.",
                       color=discord.Color.green())
         embed.add_field(name="Guild ID", value=str(guild.id))
         embed.add_field(name="Channel Name", value=name)
-        coros.append(ctx.send(embed=embed))
-        await asyncio.gather(*coros)
+        await ctx.send(embed=embed)
 
     @channel.command(name="list", brief="Get the list of possible channels that a guild can contain.")
     @discord.ext.commands.guild_only()
@@ -191,9 +185,7 @@ class Management(PokestarBotCog):
             return await ctx.send_help()
         try:
             ctx.hub.add_breadcrumb(category="Commands", message=f"Disabling command {command_obj.qualified_name!r}", data={"guild_id": ctx.guild.id})
-            async with self.bot.conn.execute("""INSERT INTO DISABLED_COMMANDS(GUILD_ID, COMMAND_NAME) VALUES (?, ?)""",
-                                             [getattr(ctx.guild, "id", None), command_obj.qualified_name]):
-                pass
+            await self.bot.disable_command(getattr(ctx.guild, "id", None), command_obj.qualified_name)
         except sqlite3.IntegrityError:
             embed = Embed(ctx, title="Command Already Disabled", description="The given command is already disabled for the Guild.",
                           color=discord.Color.red())
@@ -204,8 +196,6 @@ class Management(PokestarBotCog):
                           color=discord.Color.green())
             embed.add_field(name="Command", value=command_obj.qualified_name)
             await ctx.send(embed=embed)
-            ctx.hub.add_breadcrumb(category="Commands", message=f"Getting the disabled command list.", level="debug")
-            await self.bot.get_disabled_commands()
 
     @disable.command(name="list", brief="Get the list of disabled commands")
     @discord.ext.commands.guild_only()
@@ -220,7 +210,8 @@ class Management(PokestarBotCog):
     @discord.ext.commands.command(brief="Enable a command (or subcommand) for the Guild", usage="command", significant=True)
     @admin_or_bot_owner()
     async def enable(self, ctx: HubContext, *, command: str):
-        command = self.bot.get_command(command)
+        if command.startswith(self.bot.command_prefix):
+            command = command[len(self.bot.command_prefix):]
         command_obj = self.bot.get_command(command)
         if command_obj is None:
             embed = Embed(ctx, title="Command Does Not Exist", description="The provided command does not exist.", color=discord.Color.red())
@@ -228,14 +219,10 @@ class Management(PokestarBotCog):
             await ctx.send(embed=embed)
             return await ctx.send_help()
         ctx.hub.add_breadcrumb(category="Commands", message=f"Enabling command {command_obj.qualified_name!r}", data={"guild_id": ctx.guild.id})
-        async with self.bot.conn.execute("""DELETE FROM DISABLED_COMMANDS WHERE GUILD_ID==? AND COMMAND_NAME==?""",
-                                         [getattr(ctx.guild, "id", None), command_obj.qualified_name]):
-            pass
+        await self.bot.enable_command(getattr(ctx.guild, "id", None), command_obj.qualified_name)
         embed = Embed(ctx, title="Command Enabled", description="The given command is enabled for the Guild.", color=discord.Color.green())
         embed.add_field(name="Command", value=command_obj.qualified_name)
         await ctx.send(embed=embed)
-        ctx.hub.add_breadcrumb(category="Commands", message=f"Getting the disabled command list.", level="debug")
-        await self.bot.get_disabled_commands()
 
     @discord.ext.commands.command(brief="Setup the bot channels", significant=True)
     @admin_or_bot_owner()
@@ -373,14 +360,10 @@ class Management(PokestarBotCog):
             await ctx.send(embed=embed)
         else:
             ctx.hub.add_breadcrumb(category="Options", message=f"Enabling option {option_name!r}", data={"guild_id": ctx.guild.id})
-            async with self.bot.conn.execute("""UPDATE OPTIONS SET ENABLED=? WHERE GUILD_ID==? AND OPTION_NAME==?""",
-                                             [True, getattr(ctx.guild, "id", None), option_name]):
-                pass
+            await self.bot.set_option(getattr(ctx.guild, "id", None), option_name, True)
             embed = Embed(ctx, title="Option Enabled", description="The option was enabled.", color=discord.Color.green())
             embed.add_field(name="Option Name", value=option_name)
             await ctx.send(embed=embed)
-            ctx.hub.add_breadcrumb(category="Options", message=f"Getting the option list.", level="debug")
-            await self.bot.get_option_mappings()
 
     @option.command(name="disable", brief="Disable an option.", usage="option_name")
     @admin_or_bot_owner()
@@ -393,14 +376,10 @@ class Management(PokestarBotCog):
             await ctx.send(embed=embed)
         else:
             ctx.hub.add_breadcrumb(category="Options", message=f"Disabling option {option_name!r}", data={"guild_id": ctx.guild.id})
-            async with self.bot.conn.execute("""UPDATE OPTIONS SET ENABLED=? WHERE GUILD_ID==? AND OPTION_NAME==?""",
-                                             [False, getattr(ctx.guild, "id", None), option_name]):
-                pass
+            await self.bot.set_option(getattr(ctx.guild, "id", None), option_name, False)
             embed = Embed(ctx, title="Option Disabled", description="The option was disabled.", color=discord.Color.green())
             embed.add_field(name="Option Name", value=option_name)
             await ctx.send(embed=embed)
-            ctx.hub.add_breadcrumb(category="Options", message=f"Getting the option list.", level="debug")
-            await self.bot.get_option_mappings()
 
     @option.command(name="list", brief="List all options.")
     @discord.ext.commands.guild_only()
@@ -428,6 +407,27 @@ class Management(PokestarBotCog):
             embed._fields += (_fields or [])
             await ctx.send(embed=embed)
 
+    @discord.ext.commands.group(brief="Inspect the bot database", invoke_without_command=True)
+    @discord.ext.commands.is_owner()
+    async def db(self, ctx: HubContext):
+        await self.bot.generic_help(ctx)
+
+    @db.command(name="explain", brief="Show the query plans for the hot queries", usage="[query_name]")
+    @discord.ext.commands.is_owner()
+    async def db_explain(self, ctx: HubContext, query_name: Optional[str] = None):
+        if query_name and query_name not in hot_queries:
+            embed = Embed(ctx, title="Unknown Query", description="The query name is not one of the hot queries.", color=discord.Color.red())
+            embed.add_field(name="Query Name", value=query_name)
+            embed.add_field(name="Valid Names", value=", ".join(f"`{name}`" for name in hot_queries), inline=False)
+            return await ctx.send(embed=embed)
+        plans = await self.bot.conn.explain_hot_queries()
+        if query_name:
+            plans = [item for item in plans if item[0] == query_name]
+        scans = [name for name, sql, plan in plans if any(line.startswith("SCAN") for line in plan)]
+        embed = Embed(ctx, title="Query Plans", description=f"**{len(scans)}** of **{len(plans)}** queries use a full table scan.",
+                      color=discord.Color.red() if scans else discord.Color.green())
+        await send_embeds_fields(ctx, embed, [(name, f"```sql\n{sql}\n```\n" + "\n".join(f"`{line}`" for line in plan)) for name, sql, plan in plans])
+
     @discord.ext.commands.command(brief="Delete any mention of a Guild", usage="guild_id")
     @discord.ext.commands.is_owner()
     @discord.ext.commands.dm_only()
@@ -6,7 +6,6 @@ import itertools
 import logging
 import os
 import re
-import pyparsing
 import string
 from typing import Dict, List, Optional, TYPE_CHECKING, Tuple, Union
 
@@ -18,7 +17,7 @@ import pytz
 from . import PokestarBotCog
 from ..const import strftime_format
 from ..creds import owner, repo, support_code
-from ..utils import Embed, break_into_groups, post_issue, send_embeds, send_embeds_fields, latex_as_png, HubContext
+from ..utils import Embed, break_into_groups, post_issue, send_embeds, send_embeds_fields, LatexRenderer, HubContext
 
 if TYPE_CHECKING:
     from ..bot import PokestarBot
@@ -32,6 +31,13 @@ class Misc(PokestarBotCog):
     STRFTIME_FORMAT = strftime_format
     OWO = owotext.OwO()
 
+    def __init__(self, bot: "PokestarBot"):
+        super().__init__(bot)
+        self.latex_renderer = LatexRenderer()
+
+    def cog_unload(self):
+        self.bot.loop.create_task(self.latex_renderer.close())
+
     @discord.ext.commands.command(brief="Say the message `num` times", usage="num message", enabled=False)
     async def echo(self, ctx: HubContext, num: int, *, message: str):
         if not ctx.author.guild_permissions.administrator and num > 5:
@@ -214,6 +220,62 @@ class Misc(PokestarBotCog):
             embed = Embed(ctx, title="Bot Events", color=discord.Color.green())
             return await send_embeds_fields(ctx, embed, fields)
 
+    @cmd_bot_stats.command(name="sends", brief="Outbound message queue stats")
+    async def cmd_bot_stats_sends(self, ctx: HubContext):
+        outbound = self.bot.outbound
+        embed = Embed(ctx, title="Outbound Messages", color=discord.Color.green())
+        embed.add_field(name="Queued Embeds", value=str(outbound.depth))
+        embed.add_field(name="Most Queued In One Channel", value=str(outbound.max_depth))
+        embed.add_field(name="Channels Sending", value=str(len(outbound.workers)))
+        embed.add_field(name="Messages Sent", value=str(outbound.stats["messages"]))
+        embed.add_field(name="Embeds Sent", value=str(outbound.stats["embeds"]))
+        embed.add_field(name="Failed Sends", value=str(outbound.stats["errors"]))
+        embed.add_field(name="Packing Embeds", value="Yes" if outbound.pack else "No")
+        for percentile in (50, 90, 99):
+            latency = outbound.latency_percentile(percentile)
+            embed.add_field(name=f"p{percentile} Send Latency", value="N/A" if latency is None else f"{latency * 1000:.1f} ms")
+        await ctx.send(embed=embed)
+
+    @cmd_bot_stats.command(name="lag", brief="Event loop lag stats")
+    async def cmd_bot_stats_lag(self, ctx: HubContext):
+        monitor = self.bot.loop_monitor
+        histogram = monitor.histogram
+        embed = Embed(ctx, title="Event Loop Lag", color=discord.Color.green() if not monitor.stalls else discord.Color.red())
+        embed.add_field(name="Samples", value=str(histogram.count))
+        embed.add_field(name="Mean Lag", value="N/A" if histogram.mean is None else f"{histogram.mean * 1000:.1f} ms")
+        embed.add_field(name="Max Lag", value=f"{histogram.max * 1000:.1f} ms")
+        for percentile in (50, 90, 99):
+            lag = histogram.percentile(percentile)
+            embed.add_field(name=f"p{percentile} Lag (at most)", value="N/A" if lag is None else f"{lag * 1000:.1f} ms")
+        buckets = [f"<= {bound * 1000:g} ms: {count}" if bound != float("inf") else f"All: {count}" for bound, count in histogram.cumulative()]
+        fields = [("Samples By Lag", "\n".join(buckets))]
+        for stall in reversed(monitor.stalls):
+            started = datetime.datetime.utcfromtimestamp(stall.started)
+            started = (started + NY.utcoffset(started)).strftime(strftime_format) + " " + NY.tzname(started)
+            fields.append((f"Blocked {stall.duration:.2f}s at {started}", stall.context))
+        await send_embeds_fields(ctx, embed, fields)
+
+    @cmd_bot_stats.command(name="perf", brief="Command, event, loop and query timings", usage="[command|event|loop|query] [limit]")
+    async def cmd_bot_stats_perf(self, ctx: HubContext, kind: Optional[str] = None, limit: int = 5):
+        metrics = self.bot.metrics
+        if kind is not None:
+            kind = kind.lower().rstrip("s")
+            if kind not in metrics.stats:
+                raise discord.ext.commands.BadArgument(f"kind must be one of {', '.join(f'`{name}`' for name in metrics.stats)}")
+        kinds = [kind] if kind is not None else list(metrics.stats)
+        embed = Embed(ctx, title="Performance", color=discord.Color.green(),
+                      description="The names that took the most time in total. p99 is the upper bound of the bucket holding it.")
+        fields = []
+        for kind in kinds:
+            for name, metric in metrics.top(kind, limit):
+                histogram = metric.histogram
+                fields.append((f"{kind.title()}: {name if len(name) <= 200 else name[:197] + '...'}",
+                               f"{metric.count} calls, {metric.errors} errors\nTotal {metric.total:.2f}s, mean {histogram.mean * 1000:.1f} ms\n"
+                               f"p99 {histogram.percentile(99) * 1000:.1f} ms, max {histogram.max * 1000:.1f} ms"))
+        if not fields:
+            fields.append(("No Timings", "Nothing has been timed yet."))
+        await send_embeds_fields(ctx, embed, fields)
+
     @discord.ext.commands.command(name="issue", significant=True, brief="File an issue with the bot. Please use as much detail as possible.",
                                   usage="description")
     @discord.ext.commands.cooldown(1, 60, type=discord.ext.commands.BucketType.user)
@@ -434,17 +496,9 @@ class Misc(PokestarBotCog):
 
     @discord.ext.commands.command(brief="Convert text in LaTeX format into a rendered PNG, and upload it.", usage="text", aliases=["tex"])
     async def latex(self, ctx: HubContext, *, text: str):
-        try:
-            png = latex_as_png(text)
-        except ValueError as exc:
-            original = exc.__cause__
-            if isinstance(original, pyparsing.ParseFatalException):
-                embed = Embed(ctx, title="Error Parsing Text", description=original.msg + ". (Hint, you may need to separate backslashes `\\` with braces, such as `${\\beta}...$`.)", color=discord.Color.red())
-                return await ctx.send(embed=embed)
-            else:
-                raise exc
-        else:
-            return await ctx.send(file=discord.File(png, filename="render.png"))
+        async with ctx.typing():
+            png = await self.latex_renderer.render(text)
+        return await ctx.send(file=discord.File(png, filename="render.png"))
 
     @discord.ext.commands.command(brief="Test")
     @discord.ext.commands.is_owner()
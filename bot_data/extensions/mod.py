@@ -111,25 +111,22 @@ class Mod(PokestarBotCog):
             else:
                 full_users.extend(user)
         full_users = set(full_users)
+        items = []
         for user in full_users:
             user: discord.Member
-            try:
-                logger.debug("Moving %s to %s", user, channel)
-                if user.permissions_in(channel).connect:
-                    await user.move_to(channel, reason="Mass Move requested by {}".format(ctx.author))
-                else:
-                    fail.append(user)
-                    continue
-            except discord.DiscordException:
-                fail.append(user)
+            if user.permissions_in(channel).connect:
+                items.append((user.id, "move_member", {"channel_id": channel.id, "reason": "Mass Move requested by {}".format(ctx.author)}))
             else:
-                success.append(user)
+                fail.append(user)
+        succeeded_ids, failed_ids = await self.bot.run_bulk_job(ctx, f"Mass Move to {channel}", items)
+        success.extend(ctx.guild.get_member(member_id) or discord.Object(member_id) for member_id in succeeded_ids)
+        fail.extend(ctx.guild.get_member(member_id) or discord.Object(member_id) for member_id in failed_ids)
         embed = Embed(ctx, title="Voice Channel Mass Move", color=discord.Color.green())
         fields = [("Moved To Voice Channel", str(channel)), ("User That Requested Move", ctx.author.mention),
-                  ("Successfully Moved", "\n".join(user.mention for user in success) or "None"),
-                  ("Failed To Move", "\n".join(user.mention for user in fail) or "None")]
+                  ("Successfully Moved", "\n".join(f"<@{user.id}>" for user in success) or "None"),
+                  ("Failed To Move", "\n".join(f"<@{user.id}>" for user in fail) or "None")]
         if fail:
-            logger.warning("Unable to move these users to %s: %s", channel, ", ".join(user.mention for user in fail))
+            logger.warning("Unable to move these users to %s: %s", channel, ", ".join(f"<@{user.id}>" for user in fail))
         await send_embeds_fields(ctx, embed, fields)
 
     @discord.ext.commands.command(brief="Kick all users that belong to a Role (very dangerous)", usage="user_or_role [user_or_role] [...]")
@@ -152,27 +149,36 @@ class Mod(PokestarBotCog):
                                     check=lambda
                                         message: message.author == ctx.author and message.channel == ctx.channel and message.content.lower() in [
                                         "y", "yes", "confirm", "1"], timeout=60)
-        guild: discord.Guild = ctx.guild
-        for member in members:
-            await guild.kick(member, reason=f"Mass Kick by {ctx.author}")
+        succeeded, failed = await self.bot.run_bulk_job(ctx, "Mass Kick", [(member.id, "kick_member", {"reason": f"Mass Kick by {ctx.author}"})
+                                                                           for member in set(members)])
+        if failed:
+            embed = Embed(ctx, title="Kicked", description="Some of the members specified could not be kicked.", color=discord.Color.red())
+            return await send_embeds_fields(ctx, embed, [("Kicked", "\n".join(f"<@{member_id}>" for member_id in succeeded) or "None"),
+                                                          ("Failed", "\n".join(f"<@{member_id}>" for member_id in failed))])
         return await ctx.send(embed=Embed(ctx, title="Kicked", description="All members specified have been kicked.", color=discord.Color.green()))
 
+    async def _voice_base(self, ctx: discord.ext.commands.Context, voice_channel: discord.VoiceChannel, exceptions: Tuple[List[discord.Member], ...],
+                          action: str, past_tense: str, **state: bool):
+        exception_members = list(itertools.chain(*exceptions))
+        targets = [member for member in voice_channel.members if member not in exception_members]
+        succeeded, failed = await self.bot.run_bulk_job(ctx, f"Mass {action} in {voice_channel}",
+                                                        [(member.id, "edit_member_voice", dict(state, reason=f"Mass {action} by {ctx.author}"))
+                                                         for member in targets])
+        embed = Embed(ctx, title=f"{past_tense} Users", color=discord.Color.green(),
+                      description=f"The following users (minus exceptions) were {past_tense.lower()}.")
+        fields = [(past_tense, "\n".join(f"<@{member_id}>" for member_id in succeeded) or "None"),
+                  ("Exceptions", "\n".join(user.mention for user in exception_members) or "None")]
+        if failed:
+            fields.append(("Failed", "\n".join(f"<@{member_id}>" for member_id in failed)))
+        await send_embeds_fields(ctx, embed, fields)
+
     @discord.ext.commands.command(brief="Mute all members in a voice channel (except the exceptions provided)",
                                   usage="voice_channel [exception] [exception]")
     @discord.ext.commands.bot_has_guild_permissions(mute_members=True)
     @discord.ext.commands.has_guild_permissions(mute_members=True)
     @discord.ext.commands.max_concurrency(1, discord.ext.commands.BucketType.guild)
     async def mute(self, ctx: discord.ext.commands.Context, voice_channel: discord.VoiceChannel, *exceptions: MemberRolesConverter):
-        exception_members = list(itertools.chain(*exceptions))
-        to_mute = [member for member in voice_channel.members if member not in exception_members]
-        await ctx.trigger_typing()
-        for member in to_mute:
-            member: discord.Member
-            await member.edit(mute=True, reason=f"Mass Mute by {ctx.author}")
-        embed = Embed(ctx, title="Muted Users", description="The following users (minus exceptions) were muted.", color=discord.Color.green())
-        fields = [("Muted", "\n".join(user.mention for user in to_mute) or "None"),
-                  ("Exceptions", "\n".join(user.mention for user in exception_members) or "None")]
-        await send_embeds_fields(ctx, embed, fields)
+        await self._voice_base(ctx, voice_channel, exceptions, "Mute", "Muted", mute=True)
 
     @discord.ext.commands.command(brief="Deafen all members in a voice channel (except the exceptions provided)",
                                   usage="voice_channel [exception] [exception]")
@@ -180,16 +186,7 @@ class Mod(PokestarBotCog):
     @discord.ext.commands.has_guild_permissions(deafen_members=True)
     @discord.ext.commands.max_concurrency(1, discord.ext.commands.BucketType.guild)
     async def deafen(self, ctx: discord.ext.commands.Context, voice_channel: discord.VoiceChannel, *exceptions: MemberRolesConverter):
-        exception_members = list(itertools.chain(*exceptions))
-        to_deafen = [member for member in voice_channel.members if member not in exception_members]
-        await ctx.trigger_typing()
-        for member in to_deafen:
-            member: discord.Member
-            await member.edit(deafen=True, reason=f"Mass Deafen by {ctx.author}")
-        embed = Embed(ctx, title="Deafened Users", description="The following users (minus exceptions) were deafened.", color=discord.Color.green())
-        fields = [("Deafened", "\n".join(user.mention for user in to_deafen) or "None"),
-                  ("Exceptions", "\n".join(user.mention for user in exception_members) or "None")]
-        await send_embeds_fields(ctx, embed, fields)
+        await self._voice_base(ctx, voice_channel, exceptions, "Deafen", "Deafened", deafen=True)
 
     @discord.ext.commands.command(brief="Unmute all members in a voice channel (except the exceptions provided)",
                                   usage="voice_channel [exception] [exception]")
@@ -197,16 +194,7 @@ class Mod(PokestarBotCog):
     @discord.ext.commands.has_guild_permissions(mute_members=True)
     @discord.ext.commands.max_concurrency(1, discord.ext.commands.BucketType.guild)
     async def unmute(self, ctx: discord.ext.commands.Context, voice_channel: discord.VoiceChannel, *exceptions: MemberRolesConverter):
-        exception_members = list(itertools.chain(*exceptions))
-        to_mute = [member for member in voice_channel.members if member not in exception_members]
-        await ctx.trigger_typing()
-        for member in to_mute:
-            member: discord.Member
-            await member.edit(mute=False, reason=f"Mass Unmute by {ctx.author}")
-        embed = Embed(ctx, title="Unmuted Users", description="The following users (minus exceptions) were unmuted.", color=discord.Color.green())
-        fields = [("Unmuted", "\n".join(user.mention for user in to_mute) or "None"),
-                  ("Exceptions", "\n".join(user.mention for user in exception_members) or "None")]
-        await send_embeds_fields(ctx, embed, fields)
+        await self._voice_base(ctx, voice_channel, exceptions, "Unmute", "Unmuted", mute=False)
 
     @discord.ext.commands.command(brief="Undeafen all members in a voice channel (except the exceptions provided)",
                                   usage="voice_channel [exception] [exception]")
@@ -214,17 +202,7 @@ class Mod(PokestarBotCog):
     @discord.ext.commands.has_guild_permissions(deafen_members=True)
     @discord.ext.commands.max_concurrency(1, discord.ext.commands.BucketType.guild)
     async def undeafen(self, ctx: discord.ext.commands.Context, voice_channel: discord.VoiceChannel, *exceptions: MemberRolesConverter):
-        exception_members = list(itertools.chain(*exceptions))
-        to_deafen = [member for member in voice_channel.members if member not in exception_members]
-        await ctx.trigger_typing()
-        for member in to_deafen:
-            member: discord.Member
-            await member.edit(deafen=False, reason=f"Mass Undeafen by {ctx.author}")
-        embed = Embed(ctx, title="Undeafened Users", description="The following users (minus exceptions) were undeafened.",
-                      color=discord.Color.green())
-        fields = [("Undeafened", "\n".join(user.mention for user in to_deafen) or "None"),
-                  ("Exceptions", "\n".join(user.mention for user in exception_members) or "None")]
-        await send_embeds_fields(ctx, embed, fields)
+        await self._voice_base(ctx, voice_channel, exceptions, "Undeafen", "Undeafened", deafen=False)
 
     @discord.ext.commands.command(brief="Panel that allows moderators to perform mutes/unmutes, deafen/undeafens and moves on a channel.",
                                   usage="voice_channel")
@@ -254,28 +232,22 @@ class Mod(PokestarBotCog):
     async def emoji_add(self, ctx: discord.ext.commands.Context, emoji: EmojiConverter):
         emoji = emoji.lower()
         try:
-            async with self.bot.conn.execute("""INSERT INTO BLACKLISTED_EMOJIS(GUILD_ID, EMOJI) VALUES (?, ?)""",
-                                             [getattr(ctx.guild, "id", None), emoji]):
-                pass
+            await self.bot.add_blacklisted_emoji(getattr(ctx.guild, "id", None), emoji)
         except sqlite3.IntegrityError:
             embed = Embed(ctx, title="Emoji Exists", description="The emoji has already been added to the blacklist.", color=discord.Color.red())
         else:
             embed = Embed(ctx, title="Emoji Added", description="The emoji was added to the blacklist.", color=discord.Color.green())
         embed.add_field(name="Emoji Name", value=emoji)
         await ctx.send(embed=embed)
-        await self.bot.get_blacklist_mappings()
 
     @emoji_blacklist.command(name="remove", brief="Remove an emoji from the blacklist.", usage="emoji")
     @discord.ext.commands.has_guild_permissions(administrator=True)
     async def emoji_remove(self, ctx: discord.ext.commands.Context, emoji: EmojiConverter):
         emoji = emoji.lower()
-        async with self.bot.conn.execute("""DELETE FROM BLACKLISTED_EMOJIS WHERE GUILD_ID==? AND EMOJI==?""",
-                                         [getattr(ctx.guild, "id", None), emoji]):
-            pass
+        await self.bot.remove_blacklisted_emoji(getattr(ctx.guild, "id", None), emoji)
         embed = Embed(ctx, title="Emoji Removed", description="The emoji was removed from the blacklist.", color=discord.Color.green())
         embed.add_field(name="Emoji Name", value=emoji)
         await ctx.send(embed=embed)
-        await self.bot.get_blacklist_mappings()
 
     @emoji_blacklist.command(name="list", brief="List blacklisted emoji.")
     @discord.ext.commands.has_guild_permissions(administrator=True)
@@ -390,7 +362,7 @@ class Mod(PokestarBotCog):
     @discord.ext.commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.content or (message.content or "").startswith(self.bot.command_prefix + "emoji_blacklist") or not (
-                self.bot.blacklisted_emojis.get(getattr(getattr(message, "guild", None), "id", None), [])):
+                self.bot.blacklisted_emojis.get(getattr(getattr(message, "guild", None), "id", None), set())):
             return
         context = await self.bot.get_context(message)
         words = (message.content or "").replace("\n", " ").split(" ")
@@ -75,6 +75,7 @@ class RedditMod(PokestarBotCog):
             pass
         async with self.conn.execute("""CREATE TABLE IF NOT EXISTS MODLOG_ITEMS(ID STRING PRIMARY KEY)"""):
             pass
+        await self.conn.migrate()
 
     async def unmoderated_item_check(self, item: asyncpraw.models.Submission):
         async with self.conn.execute("""SELECT * FROM UNMODERATED_ITEMS WHERE FULLNAME==? LIMIT 1""", [item.fullname]) as cursor:
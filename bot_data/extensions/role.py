@@ -1,3 +1,4 @@
+import asyncio
 import itertools
 import logging
 import random
@@ -9,6 +10,7 @@ from . import PokestarBotCog
 from ..const import bland_colors, color_str_set, css_colors, discord_colors, role_template_role, user_template_role
 from ..converters import ColorConverter, MemberRolesConverter, RolesConverter
 from ..utils import CustomContext, Embed, rgb_string_from_int, send_embeds_fields
+from ..utils.bulk_job import get_member, get_role
 
 if TYPE_CHECKING:
     from ..bot import PokestarBot
@@ -37,6 +39,31 @@ class Roles(PokestarBotCog):
     def __init__(self, bot: "PokestarBot"):
         super().__init__(bot)
         self._last_operation_members = {}
+        self.color_role_lock = asyncio.Lock()
+        self.bot.bulk_operations["random_color"] = self.bulk_random_color
+        self.bot.bulk_operations["snapshot"] = self.bulk_snapshot
+
+    def cog_unload(self):
+        self.bot.bulk_operations.pop("random_color", None)
+        self.bot.bulk_operations.pop("snapshot", None)
+
+    async def bulk_random_color(self, guild: discord.Guild, member_id: int):
+        member = get_member(guild, member_id)
+        if self.contains_color_roles(member):
+            return
+        name = random.choice(self.RANDOM_COLORS)
+        async with self.color_role_lock:
+            role = discord.utils.get(guild.roles, name=name)
+            if role is None:
+                color = int(self.DISCORD_COLORS.get(name, self.CSS_COLORS.get(name))[1:], base=16)
+                role = await guild.create_role(name=name, color=discord.Color(color), reason="Assigning Random Colors")
+        await member.add_roles(role, reason="Assigning Random Colors")
+
+    async def bulk_snapshot(self, guild: discord.Guild, target_id: int, *, role: bool):
+        if role:
+            await self.add_role_snapshot(get_role(guild, target_id))
+        else:
+            await self.add_user_snapshot(get_member(guild, target_id))
 
     @discord.ext.commands.group(invoke_without_command=True,
                                 brief="Deals with role management",
@@ -49,15 +76,16 @@ class Roles(PokestarBotCog):
     async def _base(self, remove: bool, ctx: discord.ext.commands.Context, role: discord.Role,
                     members: List[discord.Member]):
         members = list(set(members))
-        embed = Embed(ctx, title="Role " + ("Removal" if remove else "Addition"), color=discord.Color.green())
+        title = "Role " + ("Removal" if remove else "Addition")
+        embed = Embed(ctx, title=title, color=discord.Color.green())
         fields = [("Role", role.mention), ("Number of Users", len(members))]
-        done = []
-        async with ctx.typing():
-            for member in members:
-                method = member.add_roles if not remove else member.remove_roles
-                await method(role, reason="Mass Role Operation triggered by {}".format(ctx.author))
-                done.append(member.mention)
-            fields.append(("Users Modified", "\n".join(done)))
+        operation = "remove_role" if remove else "add_role"
+        reason = "Mass Role Operation triggered by {}".format(ctx.author)
+        succeeded, failed = await self.bot.run_bulk_job(ctx, title, [(member.id, operation, {"role_id": role.id, "reason": reason})
+                                                                      for member in members])
+        fields.append(("Users Modified", "\n".join(f"<@{member_id}>" for member_id in succeeded) or "None"))
+        if failed:
+            fields.append(("Users Failed", "\n".join(f"<@{member_id}>" for member_id in failed)))
         await send_embeds_fields(ctx, embed, fields)
 
     @role.group(invoke_without_command=True,
@@ -175,25 +203,18 @@ class Roles(PokestarBotCog):
     @discord.ext.commands.max_concurrency(1, discord.ext.commands.BucketType.guild)
     async def distribute(self, ctx: discord.ext.commands.Context):
         default = ctx.guild.default_role.permissions.value
+        items = []
         for role in ctx.guild.roles:
             perms = role.permissions.value
-            new_perms = discord.Permissions(perms | default)
-            if new_perms.value != perms:
-                logger.info("Copied perms from @everyone onto %s role", role)
-                try:
-                    await role.edit(permissions=new_perms, reason="Copying permissions from @everyone")
-                except discord.Forbidden:
-                    logger.warning("Bot unable to edit any roles from here on out.")
-                    embed = Embed(ctx, color=discord.Color.red(), title="Unable to edit Role",
-                                  description="The bot is unable to edit the role due to permissions.")
-                    embed.add_field(name="Role", value=role.mention)
-                    await ctx.send(embed=embed)
-                    break
-                else:
-                    embed = Embed(ctx, color=discord.Color.green(), description="The role was updated to have the same permissions as @everyone.",
-                                  title="Role Updated")
-                    embed.add_field(name="Role", value=role.mention)
-                    await ctx.send(embed=embed)
+            new_perms = perms | default
+            if new_perms != perms:
+                items.append((role.id, "edit_role", {"permissions": new_perms, "reason": "Copying permissions from @everyone"}))
+        succeeded, failed = await self.bot.run_bulk_job(ctx, "Distribute Role Permissions", items)
+        logger.info("Copied perms from @everyone onto %s roles (%s failed)", len(succeeded), len(failed))
+        embed = Embed(ctx, color=discord.Color.green(), description="The roles were updated to have the same permissions as @everyone.",
+                      title="Roles Updated")
+        await send_embeds_fields(ctx, embed, [("Roles Updated", "\n".join(f"<@&{role_id}>" for role_id in succeeded) or "None"),
+                                              ("Unable to edit Roles", "\n".join(f"<@&{role_id}>" for role_id in failed) or "None")])
 
     @role.command(brief="Get people without the given roles", usage="role [role] [role]")
     @discord.ext.commands.cooldown(1, 20, type=discord.ext.commands.BucketType.guild)
@@ -325,19 +346,13 @@ class Roles(PokestarBotCog):
                 embed.add_field(name="Role", value=user_or_role.mention)
                 return await ctx.send(embed=embed)
             members = [ctx.guild.get_member(member_id) for member_id in member_ids]
-            failed = []
-            success = []
-            for member in members:
-                member: Optional[discord.Member]
-                if member:
-                    try:
-                        await member.add_roles(user_or_role, reason=f"Replaying of Snapshot for Role {user_or_role}")
-                    except discord.Forbidden:
-                        failed.append(member)
-                    else:
-                        success.append(member)
-                else:
-                    failed.append(member)
+            failed: List[Optional[discord.Member]] = [member for member in members if member is None]
+            succeeded_ids, failed_ids = await self.bot.run_bulk_job(
+                ctx, f"Snapshot Use for {user_or_role}", [(member.id, "add_role", {"role_id": user_or_role.id,
+                                                                                  "reason": f"Replaying of Snapshot for Role {user_or_role}"})
+                                                          for member in members if member])
+            success = [ctx.guild.get_member(member_id) for member_id in succeeded_ids]
+            failed.extend(ctx.guild.get_member(member_id) for member_id in failed_ids)
             embed = Embed(ctx, title="Snapshot Used",
                           description=f"The Snapshot for role {user_or_role.mention} was added to **{len(members)}** members.",
                           color=discord.Color.green())
@@ -356,18 +371,13 @@ class Roles(PokestarBotCog):
                 embed.add_field(name="Member", value=user_or_role.mention)
                 return await ctx.send(embed=embed)
             roles = [ctx.guild.get_role(role_id) for role_id in role_ids]
-            failed = []
-            success = []
-            for role in roles:
-                if role:
-                    try:
-                        await user_or_role.add_roles(role, reason=f"Replaying of Snapshot for User {user_or_role}")
-                    except discord.Forbidden:
-                        failed.append(role)
-                    else:
-                        success.append(role)
-                else:
-                    failed.append(role)
+            failed: List[Optional[discord.Role]] = [role for role in roles if role is None]
+            succeeded_ids, failed_ids = await self.bot.run_bulk_job(
+                ctx, f"Snapshot Use for {user_or_role}", [(role.id, "assign_role", {"member_id": user_or_role.id,
+                                                                                   "reason": f"Replaying of Snapshot for User {user_or_role}"})
+                                                          for role in roles if role])
+            success = [ctx.guild.get_role(role_id) for role_id in succeeded_ids]
+            failed.extend(ctx.guild.get_role(role_id) for role_id in failed_ids)
             embed = Embed(ctx, title="Snapshot Used",
                           description=f"The Snapshot for Member {user_or_role.mention} was used to add **{len(roles)}** roles.",
                           color=discord.Color.green())
@@ -379,16 +389,13 @@ class Roles(PokestarBotCog):
     @discord.ext.commands.bot_has_guild_permissions(manage_roles=True)
     @discord.ext.commands.max_concurrency(2, discord.ext.commands.BucketType.guild)
     async def snapshot_replace(self, ctx: discord.ext.commands.Context, user_or_role: Union[discord.Member, discord.Role]):
-        failed = []
-        success = []
         if isinstance(user_or_role, discord.Role):
-            for member in user_or_role.members:
-                try:
-                    await member.remove_roles(user_or_role, reason="Removing Member from Role to use Snapshot on")
-                except discord.Forbidden:
-                    failed.append(member)
-                else:
-                    success.append(member)
+            succeeded_ids, failed_ids = await self.bot.run_bulk_job(
+                ctx, f"Snapshot Replace for {user_or_role}", [(member.id, "remove_role", {"role_id": user_or_role.id,
+                                                                                          "reason": "Removing Member from Role to use Snapshot on"})
+                                                              for member in user_or_role.members])
+            success = [ctx.guild.get_member(member_id) for member_id in succeeded_ids]
+            failed = [ctx.guild.get_member(member_id) for member_id in failed_ids]
             embed = Embed(ctx, title="Removed Role From Users", description="The role has been removed from all users that have it.",
                           color=discord.Color.green())
             embed.add_field(name="Role", value=user_or_role.mention)
@@ -396,13 +403,12 @@ class Roles(PokestarBotCog):
                 ("Succeeded", "\n".join(member.mention if member else "[Not in Guild/Deleted User]" for member in success) or None),
                 ("Failed", "\n".join(member.mention if member else "[Not in Guild/Deleted User]" for member in failed) or None)])
         else:
-            for role in user_or_role.roles[1:]:
-                try:
-                    await user_or_role.remove_roles(role, reason="Removing Role from Member to use Snapshot on")
-                except discord.Forbidden:
-                    failed.append(role)
-                else:
-                    success.append(role)
+            succeeded_ids, failed_ids = await self.bot.run_bulk_job(
+                ctx, f"Snapshot Replace for {user_or_role}", [(role.id, "unassign_role", {"member_id": user_or_role.id,
+                                                                                          "reason": "Removing Role from Member to use Snapshot on"})
+                                                              for role in user_or_role.roles[1:]])
+            success = [ctx.guild.get_role(role_id) for role_id in succeeded_ids]
+            failed = [ctx.guild.get_role(role_id) for role_id in failed_ids]
             embed = Embed(ctx, title="Removed Member From Roles", description="The member has been removed from all roles that they have.",
                           color=discord.Color.green())
             embed.add_field(name="Member", value=user_or_role.mention)
@@ -414,12 +420,12 @@ class Roles(PokestarBotCog):
     @discord.ext.commands.has_guild_permissions(manage_roles=True)
     @discord.ext.commands.max_concurrency(1, discord.ext.commands.BucketType.guild)
     async def snapshot_all(self, ctx: discord.ext.commands.Context):
-        await ctx.send(embed=Embed(ctx, title="Starting Generation Of All Snapshots.", color=discord.Color.green()))
-        for member in ctx.guild.members:
-            await self.snapshot_add(ctx, member)
-        for role in ctx.guild.roles[1:]:
-            await self.snapshot_add(ctx, role)
-        await ctx.send(embed=Embed(ctx, title="Finished Generation Of All Snapshots.", color=discord.Color.green()))
+        await self.pre_create()
+        items = [(member.id, "snapshot", {"role": False}) for member in ctx.guild.members]
+        items.extend((role.id, "snapshot", {"role": True}) for role in ctx.guild.roles[1:])
+        succeeded, failed = await self.bot.run_bulk_job(ctx, "Generate All Snapshots", items)
+        await ctx.send(embed=Embed(ctx, title="Finished Generation Of All Snapshots.", color=discord.Color.green(),
+                                   description=f"Saved **{len(succeeded)}** Snapshots, **{len(failed)}** failed."))
 
     @discord.ext.commands.group(brief="Give yourself a role with the specified color", usage="[member] color", invoke_without_command=True,
                                 significant=True)
@@ -524,20 +530,12 @@ class Roles(PokestarBotCog):
     @discord.ext.commands.max_concurrency(1, discord.ext.commands.BucketType.guild)
     async def color_clean_all(self, ctx: discord.ext.commands.Context):
         roles = self.contains_color_roles(ctx.guild)
-        cleaned = []
-        failed = []
-        for role in ctx.guild.roles:
-            role: discord.Role
-            if role not in roles and role.color != discord.Color.default():
-                try:
-                    await role.edit(color=discord.Color.default(), reason="Cleaning all non-color roles of color.")
-                except discord.Forbidden:
-                    failed.append(role)
-                else:
-                    cleaned.append(role)
+        items = [(role.id, "edit_role", {"color": discord.Color.default().value, "reason": "Cleaning all non-color roles of color."})
+                 for role in ctx.guild.roles if role not in roles and role.color != discord.Color.default()]
+        cleaned, failed = await self.bot.run_bulk_job(ctx, "Clean Role Colors", items)
         await send_embeds_fields(ctx, Embed(ctx, title="Cleaned Roles", description="All non-color roles are now cleaned of color.",
-                                            color=discord.Color.green()), [("Roles Cleaned", "\n".join(role.mention for role in cleaned) or "None"), (
-            "Failed to Clean Roles", "\n".join(role.mention for role in failed) or "None")])
+                                            color=discord.Color.green()), [("Roles Cleaned", "\n".join(f"<@&{role_id}>" for role_id in cleaned) or "None"),
+                                                                           ("Failed to Clean Roles", "\n".join(f"<@&{role_id}>" for role_id in failed) or "None")])
 
     @color.command(name="prune", brief="Prunes all color roles that aren't being used.")
     @discord.ext.commands.bot_has_guild_permissions(manage_roles=True)
@@ -566,13 +564,10 @@ class Roles(PokestarBotCog):
     @discord.ext.commands.has_guild_permissions(manage_roles=True)
     @discord.ext.commands.max_concurrency(1, discord.ext.commands.BucketType.guild)
     async def randomall(self, ctx: discord.ext.commands.Context):
-        converter = ColorConverter()
-        for member in ctx.guild.members:
-            roles = self.contains_color_roles(member)
-            if not roles:
-                color = random.choice(self.RANDOM_COLORS)
-                await self.color(ctx, member, await converter.convert(ctx, color))
-        await ctx.send(embed=Embed(ctx, title="Completed", color=discord.Color.green()))
+        items = [(member.id, "random_color", {}) for member in ctx.guild.members if not self.contains_color_roles(member)]
+        succeeded, failed = await self.bot.run_bulk_job(ctx, "Assign Random Colors", items)
+        await ctx.send(embed=Embed(ctx, title="Completed", color=discord.Color.green(),
+                                   description=f"Assigned colors to **{len(succeeded)}** members, **{len(failed)}** failed."))
 
     @discord.ext.commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
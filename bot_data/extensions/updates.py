@@ -1,10 +1,11 @@
-import asyncio
+import datetime
+import hashlib
 import html
 import logging
 import re
 import sqlite3
 import traceback
-from typing import Optional, TYPE_CHECKING, Union
+from typing import Dict, List, Optional, TYPE_CHECKING, Union
 
 import bbcode
 import discord.ext.commands
@@ -13,7 +14,7 @@ import pytz
 
 from . import PokestarBotCog
 from ..const import bot_version, guyamoe, mangadex, nyaasi
-from ..utils import CustomContext, Embed, get_filter_level, loop_command_deco, post_issue, send_embeds_fields
+from ..utils import CustomContext, Embed, NyaaFeedKey, NyaaFeeds, SnapshotStore, get_filter_level, loop_command_deco, post_issue, send_embeds_fields
 from ..utils.data.guyamoe import GuyamoeManga
 from ..utils.data.mangadex import MangadexChapterList, MangadexManga
 from ..utils.data.nyaasi import BaseTitleParser, NyaaCategoryTypes, NyaaTorrent, NyaaTorrentList, author_parser_mapping, search_string_builder
@@ -38,6 +39,8 @@ class Updates(PokestarBotCog):
         super().__init__(bot)
         self.parser = self.set_up_parser()
         self.checked_for = []
+        self.nyaa_feeds = NyaaFeeds(bot)
+        self.snapshot_store = SnapshotStore()
         self.check_for_updates.start()
         check = self.bot.has_channel("anime-and-manga-updates")
         self.bot.add_check_recursive(self.updates, check)
@@ -87,6 +90,9 @@ class Updates(PokestarBotCog):
             pass
         async with self.conn.execute("""CREATE TABLE IF NOT EXISTS NYAASI_SEEN(ID INTEGER PRIMARY KEY)"""):
             pass
+        async with self.conn.execute("""CREATE TABLE IF NOT EXISTS MANGADEX_LAST_SEEN(MANGA_ID INTEGER PRIMARY KEY, CHAPTER_ID INTEGER NOT NULL)"""):
+            pass
+        await self.conn.migrate()
 
     async def get_conn(self):
         await self.pre_create()
@@ -214,11 +220,8 @@ class Updates(PokestarBotCog):
             embed = Embed(ctx, title=title, description=message, color=discord.Color.red())
             embed.add_field(name="Issue", value=f"[#{issue_num}](https://github.com/PythonCoderAS/PokestarBot/issues/{issue_num})")
             return await ctx.send(embed=embed)
-        rss_link = search_string_builder(query=anime_name, user=user, category=NyaaCategoryTypes.Anime_ENG)
-        async with self.bot.session.get(rss_link) as request:
-            request.raise_for_status()
-            text = await request.text()
-        torrents = NyaaTorrentList.from_rss_feed(text)
+        # Not from the update cycle's cache, which can be minutes old (or never cleared while the loop is stopped)
+        torrents = NyaaTorrentList(await self.nyaa_feeds.search(anime_name, user=user, category=NyaaCategoryTypes.Anime_ENG, cached=False))
         torrents.parse_titles(display_warnings=get_filter_level(logger))
         latest_episode = torrents.max_episode
         embed = Embed(ctx, title=anime_name)
@@ -380,6 +383,9 @@ class Updates(PokestarBotCog):
         async with self.bot.session.get(url) as request:
             request.raise_for_status()
             json = await request.json()
+            digest = hashlib.sha1(await request.read()).hexdigest()
+        if self.snapshot_store.unchanged("guyamoe:" + slug, digest):
+            return
         manga = GuyamoeManga.from_api(json)
         chaps = {str(float(key.num)) for key in manga.chapters}
         async with self.conn.execute("""SELECT CHAPTER FROM SEEN WHERE SERVICE==? AND ITEM==?""", ["Guyamoe", slug]) as cursor:
@@ -412,13 +418,27 @@ class Updates(PokestarBotCog):
         async with self.conn.executemany("""INSERT INTO SEEN(SERVICE, ITEM, CHAPTER) VALUES('Guyamoe', ?, ?)""",
                                          [(slug, chap) for chap in new_chaps]):
             pass
+        self.snapshot_store.put("guyamoe:" + slug, digest, manga)
 
     async def mangadex_update(self, manga_id: int, name: str):
         url = f"https://mangadex.org/api/v2/manga/{manga_id}/chapters"
         async with self.bot.session.get(url) as request:
             request.raise_for_status()
             json = await request.json()
-        chapters = MangadexChapterList.from_chapter_list_v2(json).filter_lang().filter_duplicates()
+        max_id = MangadexChapterList.max_chapter_id(json)
+        snapshot_key = f"mangadex:{manga_id}"
+        if max_id is None or self.snapshot_store.unchanged(snapshot_key, str(max_id)):
+            return
+        async with self.conn.execute("""SELECT CHAPTER_ID FROM MANGADEX_LAST_SEEN WHERE MANGA_ID==?""", [manga_id]) as cursor:
+            row = await cursor.fetchone()
+        last_seen = row[0] if row else None
+        if last_seen is not None and max_id <= last_seen:
+            # Only the marker changed (e.g. a chapter was deleted), so the last built chapters are kept, or nothing if none were built yet.
+            snapshot = self.snapshot_store.get(snapshot_key)
+            self.snapshot_store.put(snapshot_key, str(max_id), snapshot.value if snapshot else None)
+            return
+        # Only chapters uploaded since the last check are built. SEEN still decides what is new, since a re-upload gets a new ID.
+        chapters = MangadexChapterList.from_chapter_list_v2(json, newer_than=last_seen).filter_lang().filter_duplicates()
         async with self.conn.execute("""SELECT CHAPTER FROM SEEN WHERE SERVICE==? AND ITEM==?""", ["MangaDex", str(manga_id)]) as cursor:
             data = await cursor.fetchall()
         chap_map = {chap.chapter_str: chap.id for chap in chapters}
@@ -447,19 +467,34 @@ class Updates(PokestarBotCog):
         async with self.conn.executemany("""INSERT INTO SEEN(SERVICE, ITEM, CHAPTER) VALUES('MangaDex', ?, ?)""",
                                          [(str(manga_id), chap) for chap in new_chaps]):
             pass
-
-    async def nyaasi_update(self, anime_name: str):
-        rss_link = search_string_builder(query=anime_name, category=NyaaCategoryTypes.Anime_ENG)
-        async with self.bot.session.get(rss_link) as request:
-            request.raise_for_status()
-            text = await request.text()
+        async with self.conn.execute("""INSERT OR REPLACE INTO MANGADEX_LAST_SEEN(MANGA_ID, CHAPTER_ID) VALUES (?, ?)""", [manga_id, max_id]):
+            pass
+        self.snapshot_store.put(snapshot_key, str(max_id), chapters)
+
+    async def nyaasi_update(self, key: NyaaFeedKey, anime_names: List[str]):
+        """Check one search for new episodes. Every subscribed name in ``anime_names`` normalizes to ``key``, so the feed is shared between them
+        and its torrents are only marked as seen once."""
+        feed = await self.nyaa_feeds.fetch(key)
+        snapshot_key = "nyaasi:" + key.url
+        # Every torrent in the last processed feed is already in NYAASI_SEEN, so the table is only read when the feed has other torrents.
+        snapshot = self.snapshot_store.get(snapshot_key)
+        fresh = feed.filter_ids(*(torrent.id for torrent in snapshot.value)) if snapshot else feed
+        if not fresh:
+            self.snapshot_store.hits += 1
+            return
+        self.snapshot_store.misses += 1
         async with self.conn.execute("""SELECT ID FROM NYAASI_SEEN""") as cursor:
             ids = [id async for id, in cursor]
-        torrents = NyaaTorrentList.from_rss_feed(text).filter_ids(*ids)
+        torrents = fresh.filter_ids(*ids)
         torrents.parse_titles(display_warnings=get_filter_level(logger))
         filtered = torrents.filter_resolution(1080)
         async with self.conn.executemany("""INSERT INTO NYAASI_SEEN(ID) VALUES (?)""", [[torrent.id] for torrent in torrents]):
             pass
+        for anime_name in anime_names:
+            await self.nyaasi_notify(anime_name, filtered)
+        self.snapshot_store.put(snapshot_key, None, feed)
+
+    async def nyaasi_notify(self, anime_name: str, filtered: NyaaTorrentList):
         async with self.conn.execute("""SELECT CHAPTER FROM SEEN WHERE SERVICE==? AND ITEM==?""", ["Nyaasi", anime_name]) as cursor:
             data = await cursor.fetchall()
         seen_eps = {int(ep) for ep, in data}
@@ -541,6 +576,8 @@ class Updates(PokestarBotCog):
     async def check_for_updates(self):
         await self.get_conn()
         await self.bot.load_session()
+        if not self.snapshot_store.loaded:
+            await self.bot.execute(self.snapshot_store.load)
         async with self.conn.execute("""SELECT DISTINCT SLUG, NAME FROM GUYAMOE WHERE COMPLETED==?""", [False]) as cursor:
             guyamoe = await cursor.fetchall()
         for slug, name in guyamoe:
@@ -565,16 +602,22 @@ class Updates(PokestarBotCog):
                 self.checked_for.append("MANGADEX" + str(manga_id))
         async with self.conn.execute("""SELECT DISTINCT NAME FROM NYAASI WHERE COMPLETED==?""", [False]) as cursor:
             nyaasi = await cursor.fetchall()
+        searches: Dict[NyaaFeedKey, List[str]] = {}
         for anime_name, in nyaasi:
-            if "NYAASI" + anime_name in self.checked_for:
+            searches.setdefault(NyaaFeedKey.make(anime_name, category=NyaaCategoryTypes.Anime_ENG), []).append(anime_name)
+        self.nyaa_feeds.new_cycle()
+        for key, anime_names in searches.items():
+            if "NYAASI" + key.query in self.checked_for:
                 continue
             try:
-                await self.nyaasi_update(anime_name)
+                await self.nyaasi_update(key, anime_names)
             except:
                 raise
             else:
-                self.checked_for.append("NYAASI" + anime_name)
+                self.checked_for.append("NYAASI" + key.query)
         self.checked_for = []
+        if self.snapshot_store.dirty:
+            await self.bot.execute(self.snapshot_store.save, self.snapshot_store.checkpoint())
 
     @check_for_updates.before_loop
     async def before_check_for_updates(self):
@@ -589,6 +632,21 @@ class Updates(PokestarBotCog):
     async def loop(self, ctx: discord.ext.commands.Context):
         await self.bot.loop_stats(ctx, self.check_for_updates, "Check For Updates")
 
+    @updates.command(brief="Get the statistics of the snapshots kept between update checks", aliases=["snapshot"])
+    async def snapshots(self, ctx: discord.ext.commands.Context):
+        store = self.snapshot_store
+        embed = Embed(ctx, title="Update Snapshots")
+        embed.add_field(name="Sources", value=str(len(store.entries)))
+        embed.add_field(name="Size", value=f"{store.size:,} bytes")
+        embed.add_field(name="Load Time", value=f"{store.load_seconds * 1000:.1f} ms" if store.loaded else "Not loaded")
+        embed.add_field(name="Last Save Time", value=f"{store.save_seconds * 1000:.1f} ms")
+        embed.add_field(name="Unchanged Sources", value=str(store.hits))
+        embed.add_field(name="Changed Sources", value=str(store.misses))
+        if store.saved_at is not None:
+            saved_at = datetime.datetime.fromtimestamp(store.saved_at, NY).strftime("%A, %B %d, %Y at %I:%M:%S %p")
+            embed.add_field(name="Last Saved", value=saved_at)
+        await ctx.send(embed=embed)
+
     async def on_reaction(self, msg: discord.Message, emoji: Union[discord.PartialEmoji, discord.Emoji], user: discord.Member):
         if user.id == self.bot.user.id or user.bot or msg.author.id != self.bot.user.id or not msg.embeds or not msg.embeds[0].title:
             return
@@ -678,7 +736,5 @@ def setup(bot: "PokestarBot"):
     logger.info("Loaded the Updates extension.")
 
 
-def teardown(bot: "PokestarBot"):
-    cog: Updates = bot.cogs["Updates"]
-    asyncio.gather(cog.conn.close())
+def teardown(_bot: "PokestarBot"):
     logger.warning("Unloading the Updates extension.")
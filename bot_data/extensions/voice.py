@@ -1,15 +1,12 @@
-import asyncio
 import logging
-import os
-import platform
 from typing import Optional, TYPE_CHECKING
 
 import discord.ext.commands
 import discord.ext.tasks
-import pyttsx3
 
 from . import PokestarBotCog
-from ..utils import Embed, StopCommand, loop_command_deco
+from ..const import tts_bitrate
+from ..utils import Embed, StopCommand, TTSCache, loop_command_deco, send_embeds_fields
 
 if TYPE_CHECKING:
     from ..bot import PokestarBot
@@ -27,25 +24,11 @@ class Voice(PokestarBotCog):
         super().__init__(bot)
         self.bot.voice_players = {}
         self.clean_up_voice_clients.start()
-        self.cleanup_mp3s.start()
+        self.tts = TTSCache()
 
-    async def get_audio_file(self, message: str, message_id: int):
-        if platform.system().lower() == 'darwin':
-            return await self.use_pyttsx3(message, message_id)
-        else:
-            return await self.use_espeak_ng(message, message_id)
-
-    async def use_pyttsx3(self, message: str, message_id: int):
-        engine = pyttsx3.init()
-        engine.save_to_file(message, str(message_id) + ".mp3")
-        engine.runAndWait()
-        return str(message_id) + ".mp3"
-
-    async def use_espeak_ng(self, message: str, message_id: int):
-        subprocess = await asyncio.create_subprocess_exec("espeak-ng", "-v", "us-mbrola-1", "-w", str(message_id) + ".wav",
-                                                          '"{}"'.format(message.replace('"', '\\"')))
-        await subprocess.wait()
-        return str(message_id) + ".wav"
+    def cog_unload(self):
+        self.clean_up_voice_clients.stop()
+        self.tts.close()
 
     @discord.ext.commands.command(brief="Say something in a voice channel", usage="message", aliases=["announce"])
     @discord.ext.commands.guild_only()
@@ -68,11 +51,18 @@ class Voice(PokestarBotCog):
             voice_client = await voice_channel.connect()
         embed = Embed(ctx, title="Generating TTS audio", color=discord.Color.green())
         await ctx.send(embed=embed)
-        filename = await self.get_audio_file(ctx.author.display_name + " says: " + message, ctx.message.id)
-        self.voice_players[voice_channel] = ctx.author
-        embed = Embed(ctx, title="Playing Message", description=ctx.author.display_name + " says: " + message, color=discord.Color.green())
-        await ctx.send(embed=embed)
-        voice_client.play(discord.FFmpegOpusAudio(filename, bitrate=int(voice_channel.bitrate / 1000)))
+        path = await self.tts.acquire(ctx.author.display_name + " says: " + message)
+        try:
+            self.voice_players[voice_channel] = ctx.author
+            embed = Embed(ctx, title="Playing Message", description=ctx.author.display_name + " says: " + message, color=discord.Color.green())
+            await ctx.send(embed=embed)
+            # The cached file is already 48 kHz stereo Opus. discord.py only passes the packets through for the "opus" codec, anything else is
+            # encoded again.
+            voice_client.play(discord.FFmpegOpusAudio(path, codec="opus", bitrate=tts_bitrate),
+                              after=lambda error: self.bot.loop.call_soon_threadsafe(self.tts.release, path))
+        except BaseException:  # Including cancellation, so the file is never left pinned in the cache
+            self.tts.release(path)
+            raise
 
     async def voice_validation(self, ctx: discord.ext.commands.Context, word: str):
         voice_channel: Optional[discord.VoiceChannel] = getattr(ctx.author.voice, "channel", None)
@@ -132,16 +122,6 @@ class Voice(PokestarBotCog):
         embed.add_field(name="Starting User", value=self.voice_players[voice_channel].mention)
         return await ctx.send(embed=embed)
 
-    @discord.ext.tasks.loop(minutes=10)
-    async def cleanup_mp3s(self):
-        for file in os.listdir(os.getcwd()):
-            if file.endswith(".mp3") or file.endswith(".wav"):
-                os.remove(file)
-
-    @cleanup_mp3s.error
-    async def on_cleanup_mp3s_error(self, exception: BaseException):
-        return await self.bot.on_error("cleanup_mp3s")
-
     @discord.ext.tasks.loop(minutes=1)
     async def clean_up_voice_clients(self):
         await self.bot.wait_until_ready()
@@ -161,12 +141,17 @@ class Voice(PokestarBotCog):
     async def cleanup_loop(self, ctx: discord.ext.commands.Context):
         await self.bot.loop_stats(ctx, self.clean_up_voice_clients, "Clean Up Voice Clients")
 
-    @loop_command_deco(cleanup_mp3s)
-    @discord.ext.commands.group(brief="Get the mp3 loop statistics")
+    @discord.ext.commands.command(brief="Get the text-to-speech cache statistics")
     @discord.ext.commands.is_owner()
-    @discord.ext.commands.dm_only()
-    async def mp3_loop(self, ctx: discord.ext.commands.Context):
-        await self.bot.loop_stats(ctx, self.cleanup_mp3s, "Clean Up mp3s")
+    async def tts_cache(self, ctx: discord.ext.commands.Context):
+        stats = self.tts.stats
+        embed = Embed(ctx, title="Text-to-Speech Cache", color=discord.Color.green())
+        fields = [("Files", str(len(self.tts.files))),
+                  ("Size", f"{self.tts.total_bytes / (1024 ** 2):.2f} MiB of {self.tts.max_bytes / (1024 ** 2):.0f} MiB"),
+                  ("Hits", str(stats["hits"])), ("Misses", str(stats["misses"])), ("Evictions", str(stats["evictions"])),
+                  ("Average Synthesis Time", f"{stats['synthesis_time'] / stats['misses']:.3f}s" if stats["misses"] else "N/A"),
+                  ("Playing", str(len(self.tts.in_use)))]
+        await send_embeds_fields(ctx, embed, fields)
 
 
 def setup(bot: "PokestarBot"):
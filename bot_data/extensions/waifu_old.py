@@ -1,4 +1,3 @@
-import asyncio
 import logging
 import random
 import sqlite3
@@ -2397,6 +2396,5 @@ def setup(bot: "PokestarBot"):
 def teardown(bot: "PokestarBot"):
     cog: Waifu = bot.cogs["Waifu"]
     bot._guide_data = cog.guide_data
-    asyncio.gather(cog.conn.close())
     logger.warning("Unloading the Waifu extension.")
     pass
@@ -1,10 +1,21 @@
+import argparse
+import concurrent.futures
+import hashlib
+import json
 import os
+import time
 
 import jinja2
 import markdown
+import pymdownx
 import pymdownx.emoji
 
-md = markdown.Markdown(extensions=[
+base_path = os.path.abspath(os.path.join(__file__, ".."))
+content_path = os.path.join(base_path, "data", "markdown")
+export_path = os.path.join(base_path, "data", "html")
+manifest_path = os.path.join(base_path, "data", "manifest.json")
+
+extensions = [
     'pymdownx.emoji',
     "sane_lists",
     "smarty",
@@ -18,18 +29,47 @@ md = markdown.Markdown(extensions=[
     "pymdownx.keys",
     "pymdownx.betterem",
     "toc"
-],
-    extension_configs={
-        "pymdownx.emoji": {
-            "emoji_index": pymdownx.emoji.twemoji,
-            "emoji_generator": pymdownx.emoji.to_svg
-        },
+]
+extension_configs = {
+    "pymdownx.emoji": {
+        "emoji_index": pymdownx.emoji.twemoji,
+        "emoji_generator": pymdownx.emoji.to_svg
+    },
+
+}
+
+# Set up once per worker process by init_worker, since a Markdown instance cannot be shared between processes (or converted on concurrently).
+md = None
+template = None
+
+
+def init_worker():
+    global md, template
+    md = markdown.Markdown(extensions=extensions, extension_configs=extension_configs)
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(base_path))
+    template = env.get_template("template.html")
+
+
+def fingerprint():
+    """Hash of everything besides the page itself that affects the output. If it changes, every page is rebuilt."""
+    def describe(value):
+        if callable(value):
+            return f"{value.__module__}.{value.__qualname__}"
+        return value
+
+    configs = {name: {key: describe(value) for key, value in config.items()} for name, config in extension_configs.items()}
+    digest = hashlib.sha256()
+    digest.update(json.dumps([extensions, configs, markdown.__version__, getattr(pymdownx, "__version__", None)], sort_keys=True).encode())
+    for file in ("template.html", "generate.py"):
+        with open(os.path.join(base_path, file), "rb") as fp:
+            digest.update(fp.read())
+    return digest.hexdigest()
 
-    }
-)
 
-env = jinja2.Environment(loader=jinja2.FileSystemLoader(os.path.abspath(os.path.join(__file__, ".."))))
-template = env.get_template("template.html")
+def file_hash(path):
+    with open(path, "rb") as fp:
+        return hashlib.sha256(fp.read()).hexdigest()
+
 
 def format_parts(parts: list):
     """Format a parts list to be prettified"""
@@ -37,7 +77,13 @@ def format_parts(parts: list):
         if "_" in parts[i]:
             parts[i] = parts[i].replace("_", " ")
 
+
+def output_path(source):
+    return os.path.splitext(source.replace(content_path, export_path, 1))[0] + ".html"
+
+
 def do_file(file_name, current_dir, export_dir, content_path):
+    start = time.perf_counter()
     with open(os.path.join(current_dir, file_name), "r") as fp:
         data = fp.read()
     lines = data.splitlines(False)
@@ -49,19 +95,67 @@ def do_file(file_name, current_dir, export_dir, content_path):
     toc = getattr(md, "toc", None)
     rendered = template.render(title=title, content=content, page_parts=parts,
                                toc=None if toc == '<div class="toc">\n<ul></ul>\n</div>\n' else toc)
+    os.makedirs(export_dir, exist_ok=True)
     with open(os.path.join(export_dir, os.path.splitext(file_name)[0] + ".html"), "w") as fp:
         fp.write(rendered)
     md.reset()
+    return time.perf_counter() - start
+
+
+def load_manifest():
+    try:
+        with open(manifest_path) as fp:
+            return json.load(fp)
+    except (FileNotFoundError, ValueError):
+        return {"fingerprint": None, "pages": {}}
+
 
 def main():
-    content_path = os.path.abspath(os.path.join(__file__, "..", "data", "markdown"))
-    export_path = os.path.abspath(os.path.join(__file__, "..", "data", "html"))
+    parser = argparse.ArgumentParser(description="Build the HTML help pages from data/markdown, rebuilding only the pages that changed.")
+    parser.add_argument("-f", "--force", action="store_true", help="Rebuild every page.")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Number of worker processes.")
+    parser.add_argument("-m", "--manifest", default=manifest_path,
+                        help="Where to write the new manifest. generate.sh writes it beside the real one and moves it into place once minification "
+                             "succeeds.")
+    args = parser.parse_args()
+    total_start = time.perf_counter()
     os.makedirs(export_path, exist_ok=True)
+    manifest = load_manifest()
+    current_fingerprint = fingerprint()
+    rebuild_all = args.force or manifest["fingerprint"] != current_fingerprint
+    pages = {}
+    pending = []
     for cd, folders, files in os.walk(content_path):
-        ecd = cd.replace(content_path, export_path)
-        os.makedirs(ecd, exist_ok=True)
         for file in files:
-            do_file(file, cd, ecd, content_path)
+            source = os.path.join(cd, file)
+            name = os.path.relpath(source, content_path)
+            pages[name] = file_hash(source)
+            if rebuild_all or manifest["pages"].get(name) != pages[name] or not os.path.exists(output_path(source)):
+                pending.append((name, (file, cd, cd.replace(content_path, export_path), content_path)))
+    for name in manifest["pages"].keys() - pages.keys():  # Sources that were deleted
+        stale = output_path(os.path.join(content_path, name))
+        if os.path.exists(stale):
+            os.remove(stale)
+            print(f"Removed {os.path.relpath(stale, base_path)}")
+    timings = []
+    if len(pending) > 1 and args.jobs > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(args.jobs, len(pending)), initializer=init_worker) as executor:
+            futures = {executor.submit(do_file, *file_args): name for name, file_args in pending}
+            for future in concurrent.futures.as_completed(futures):
+                timings.append((future.result(), futures[future]))
+    elif pending:
+        init_worker()
+        for name, file_args in pending:
+            timings.append((do_file(*file_args), name))
+    # Only written once every page has been built, so an interrupted run is redone in full.
+    with open(args.manifest, "w") as fp:
+        json.dump({"fingerprint": current_fingerprint, "pages": pages}, fp, indent=4, sort_keys=True)
+    for seconds, name in sorted(timings, reverse=True):
+        print(f"{seconds * 1000:>9.1f} ms  {name}")
+    reason = "forced" if args.force else "template or extensions changed" if rebuild_all else "incremental"
+    print(f"Built {len(timings)} of {len(pages)} pages ({reason}) in {time.perf_counter() - total_start:.2f}s, "
+          f"{sum(seconds for seconds, _name in timings):.2f}s of page time")
+
 
 if __name__ == '__main__':
     main()
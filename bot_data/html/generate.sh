@@ -1,7 +1,12 @@
 #!/usr/bin/env zsh
 cd "$(dirname "$0")" || exit 1
-pipenv run python generate.py
-for file in data/html/**/*.html
+stamp=$(mktemp)
+trap 'rm -f "$stamp" data/manifest.json.new' EXIT
+pipenv run python generate.py --manifest data/manifest.json.new "$@" || exit 1
+# Only minify the pages that generate.py rebuilt.
+find data/html -name '*.html' -newer "$stamp" -print0 | while IFS= read -r -d '' file
 do
-minify-html --css --js -s "$file" -o "$file"
-done
+minify-html --css --js -s "$file" -o "$file" || exit 1
+done || exit 1
+# The manifest is only updated once every rebuilt page was minified, so a page that failed is rebuilt on the next run.
+mv data/manifest.json.new data/manifest.json
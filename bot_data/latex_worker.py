@@ -0,0 +1,48 @@
+"""A long-lived LaTeX rendering worker, started by :class:`bot_data.utils.latex_renderer.LatexRenderer` with ``python -I``.
+
+Requests are read from stdin as one JSON object per line (``expr``, ``fontsize``, ``dpi`` and ``max_bytes``). Each response is a JSON header
+line, followed by ``size`` bytes of PNG data if ``ok`` is true. matplotlib is imported and warmed up once when the worker starts, so a render
+only pays for drawing the expression. Like log_archiver.py, this must not import ``bot_data``.
+"""
+import json
+import os
+import sys
+import traceback
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "utils"))
+
+import pyparsing  # NOQA
+
+from latex_as_png import latex_as_png  # NOQA
+
+
+def render(request: dict) -> dict:
+    try:
+        png = latex_as_png(request["expr"], fontsize=request["fontsize"], dpi=request["dpi"]).getvalue()
+    except ValueError as exc:
+        original = exc.__cause__
+        if isinstance(original, pyparsing.ParseFatalException):
+            return {"ok": False, "error": "parse", "message": original.msg}
+        return {"ok": False, "error": "exception", "message": "".join(traceback.format_exception_only(type(exc), exc)).strip()}
+    except Exception as exc:
+        return {"ok": False, "error": "exception", "message": "".join(traceback.format_exception_only(type(exc), exc)).strip()}
+    if len(png) > request["max_bytes"]:
+        return {"ok": False, "error": "size", "message": str(len(png))}
+    return {"ok": True, "size": len(png), "png": png}
+
+
+def main():
+    stdout = sys.stdout.buffer
+    latex_as_png("$x$", dpi=72)  # Loads the fonts and the mathtext parser before the first real request.
+    stdout.write(json.dumps({"ready": True, "pid": os.getpid()}).encode("utf-8") + b"\n")
+    stdout.flush()
+    for line in sys.stdin.buffer:
+        response = render(json.loads(line))
+        png = response.pop("png", b"")
+        stdout.write(json.dumps(response).encode("utf-8") + b"\n" + png)
+        stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
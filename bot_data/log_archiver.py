@@ -0,0 +1,101 @@
+"""Compresses the log directories that ``bot_data/__init__.py`` moves aside on startup, then prunes old archives.
+
+This runs as its own process (``python -I log_archiver.py ...``) so the bot can start while the previous logs are being compressed. It must not
+import ``bot_data``, since that would set up logging (and move the logs) again.
+"""
+import argparse
+import fcntl
+import os
+import shutil
+import tarfile
+import time
+from typing import List, Optional, Tuple
+
+codecs = ("gz", "bz2", "xz")
+
+
+def archive_name(pending: str) -> str:
+    return "logs-" + os.path.basename(pending).partition("-")[2]
+
+
+def compress(base: str, pending: str, codec: str, level: int) -> str:
+    path = os.path.join(base, archive_name(pending) + ".tar." + codec)
+    temp_path = path + ".part"
+    # gzip and bz2 take ``compresslevel``, lzma takes ``preset``.
+    kwargs = {"preset": level} if codec == "xz" else {"compresslevel": level}
+    with tarfile.open(temp_path, mode="w:" + codec, **kwargs) as tf:
+        for file in sorted(os.listdir(pending)):
+            tf.add(os.path.join(pending, file), arcname=file)
+    os.replace(temp_path, path)
+    shutil.rmtree(pending)
+    return path
+
+
+def claim_and_compress(base: str, pending: str, codec: str, level: int) -> Optional[str]:
+    """Compress ``pending`` unless another archiver (started by a quick restart) is already working on it. The claim is a lock on a file next to
+    the directory, which the OS releases if the archiver is killed, so the next archiver picks the directory up again."""
+    lock_path = pending + ".lock"
+    with open(lock_path, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return None
+        if not os.path.isdir(pending):  # Finished by the archiver that held the lock before, which also removed the lock file
+            try:
+                os.remove(lock_path)  # The one that opening it just created again
+            except FileNotFoundError:  # Another archiver that found the directory gone removed it first
+                pass
+            return None
+        path = compress(base, pending, codec, level)
+        os.remove(lock_path)  # Still locked, so a new archiver that opens the path gets a new file and finds the directory gone
+        return path
+
+
+def get_archives(base: str) -> List[Tuple[str, int]]:
+    """Return ``(path, size)`` for every finished archive, oldest first. The timestamp in the name sorts chronologically."""
+    archives = []
+    for file in sorted(os.listdir(base)):
+        if file.startswith("logs-") and any(file.endswith(".tar." + codec) for codec in codecs):
+            path = os.path.join(base, file)
+            archives.append((path, os.path.getsize(path)))
+    return archives
+
+
+def prune(base: str, max_count: int, max_bytes: int) -> List[str]:
+    archives = get_archives(base)
+    total = sum(size for _path, size in archives)
+    removed = []
+    # The newest archive is always kept, even if it is bigger than the byte limit on its own.
+    while len(archives) > 1 and ((max_count and len(archives) > max_count) or (max_bytes and total > max_bytes)):
+        path, size = archives.pop(0)
+        os.remove(path)
+        total -= size
+        removed.append(path)
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n")[0])
+    parser.add_argument("base", help="The log directory.")
+    parser.add_argument("--codec", choices=codecs, default="bz2")
+    parser.add_argument("--level", type=int, default=9)
+    parser.add_argument("--max-count", type=int, default=0, help="Maximum number of archives to keep (0 to keep all).")
+    parser.add_argument("--max-bytes", type=int, default=0, help="Maximum total size of the archives in bytes (0 for no limit).")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    # Also picks up directories left behind by an archiver that was killed, e.g. by a reload.
+    pending_dirs = sorted(os.path.join(args.base, file) for file in os.listdir(args.base) if file.startswith("pending-"))
+    for pending in pending_dirs:
+        if os.path.isdir(pending):
+            path = claim_and_compress(args.base, pending, args.codec, args.level)
+            if path:
+                print("Archived", path)
+            else:
+                print("Skipped", pending, "(claimed by another archiver)")
+    for path in prune(args.base, args.max_count, args.max_bytes):
+        print("Removed", path)
+    print(f"Finished in {time.perf_counter() - start:.3f} seconds")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,25 +2,37 @@ from .admin_owner import admin_or_bot_owner  # NOQA
 from .async_enumerate import aenumerate  # NOQA
 from .bounded_list import BoundedDict, BoundedList  # NOQA
 from .break_into_groups import break_into_groups  # NOQA
+from .bulk_job import BulkItemSkipped, BulkJob, builtin_bulk_operations  # NOQA
+from .code_runner import CodeResult, CodeRunner  # NOQA
+from .command_registry import CommandRegistry  # NOQA
 from .conforming_iterator import ConformingIterator  # NOQA
 from .custom_commands import CustomCommand, CustomGroup  # NOQA
 from .custom_context import CustomContext, HubContext  # NOQA
 from .custom_hub import CustomHub  # NOQA
 from .custom_textwrap import CustomTextWrap  # NOQA
 from .custom_warnings import NotUsingFullyInvokeCommand  # NOQA
+from .database import Database  # NOQA
 from .embed import Embed  # NOQA
 from .get_key import get_key  # NOQA
-from .get_message import get_context_variables, get_context_variables_from_traceback  # NOQA
-from .latex_as_png import latex_as_png  # NOQA
-from .log_config import CommandFormatter, ShutdownStatusFilter, UserChannelFormatter, get_filter_level  # NOQA
+from .histogram import Histogram  # NOQA
+from .latex_renderer import LatexParseError, LatexRenderError, LatexRenderTimeout, LatexRenderer, LatexTooLarge  # NOQA
+from .log_config import BoundedQueueHandler, CommandFormatter, LoggerNameFilter, ShutdownStatusFilter, UserChannelFormatter, get_filter_level  # NOQA
+from .log_context import LogContext, get_log_context, log_context, set_log_context  # NOQA
+from .log_reader import LogFilter, log_files, reverse_lines, tail_log  # NOQA
 from .loop_command import define_loop_subcommands, loop_command_deco  # NOQA
+from .loop_monitor import LoopMonitor, Stall  # NOQA
 from .mention import ChannelMention, Mention, RoleMention, UserMention  # NOQA
+from .metrics import Metric, Metrics, Timer  # NOQA
 from .nodes import BotNode, CogNode, CommandNode, CommentNode, GroupNode, SubmissionNode  # NOQA
+from .nyaa_feeds import NyaaFeedKey, NyaaFeeds  # NOQA
+from .outbound import OutboundDispatcher, OutboundItem  # NOQA
 from .parse_code_block import parse_discord_code_block  # NOQA
 from .partition import partition  # NOQA
 from .post_issue import post_issue  # NOQA
 from .reloading_client import ReloadingClient  # NOQA
 from .rgb_string_from_int import rgb_string_from_int  # NOQA
-from .send_embeds import generate_embeds, generate_embeds_fields, send_embeds, send_embeds_fields  # NOQA
+from .send_embeds import EmbedPaginator, generate_embeds, generate_embeds_fields, send_all, send_embeds, send_embeds_fields  # NOQA
+from .snapshot_store import Snapshot, SnapshotError, SnapshotStore  # NOQA
 from .soft_stop import StopCommand  # NOQA
 from .timed_cache import TimedCache  # NOQA
+from .tts_cache import TTSCache, TTSError  # NOQA
@@ -11,20 +11,26 @@ async def break_into_groups(text: Optional[str] = None, heading: str = "", templ
                             regex: Optional[Pattern[str]] = None) -> List[str]:
     if text is None:
         text = ""
-    lines = [line.replace("```", "``​`") for line in (text.splitlines(False) if not lines else lines)]
+    lines = (line.replace("```", "``​`") for line in (text.splitlines(False) if not lines else lines))
+    wrapped = []  # Pieces of a line that was too long, in reverse, so that they are consumed before the rest of the lines
+    wrappers = {}
     return_lines = []
     msg = "{}{}".format(heading, template)
     allocation = 1024 - len(template + ending)
-    while lines:
-        line = lines.pop(0)
+    while True:
+        if wrapped:
+            line = wrapped.pop()
+        else:
+            line = next(lines, None)
+            if line is None:
+                break
         if len(line) > allocation:  # Special case
             width = (allocation - len(msg) - len(line_template) - 2)
             if width < 5:
                 width = 5
-            textwrap = CustomTextWrap(regex=regex, width=width, break_on_hyphens=False,
-                                      replace_whitespace=False)
-            extra_lines = textwrap.wrap(line)
-            lines = extra_lines + lines
+            if width not in wrappers:
+                wrappers[width] = CustomTextWrap(regex=regex, width=width, break_on_hyphens=False, replace_whitespace=False)
+            wrapped.extend(reversed(wrappers[width].wrap(line)))
             continue
         newmsg = msg + (line if not line_template else line_template.format(line)) + "\n"
         if len(newmsg.rstrip()) > allocation:
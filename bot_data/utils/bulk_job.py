@@ -0,0 +1,318 @@
+import asyncio
+import datetime
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TYPE_CHECKING, Tuple, Union
+
+import discord
+
+from ..const import BULK_JOB_STATUS, bot_version
+
+if TYPE_CHECKING:
+    from ..bot import PokestarBot
+
+logger = logging.getLogger(__name__)
+
+BulkOperation = Callable[..., Awaitable[Any]]
+BulkItem = Tuple[int, str, Dict[str, Any]]
+
+
+class BulkItemSkipped(Exception):
+    """Raised by an operation whose target is gone (such as a member who left before a resumed job got to them)."""
+
+
+class ConcurrencyController:
+    """Additive-increase/multiplicative-decrease limiter for API calls.
+
+    discord.py does not expose the ``X-RateLimit-*`` headers, but it serializes requests per route bucket and sleeps when a bucket is exhausted.
+    A call that takes far longer than the running average therefore waited on a bucket reset, and is treated the same as a 429."""
+
+    __slots__ = ("limit", "minimum", "maximum", "active", "average", "_successes", "_condition")
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 10):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.active = 0
+        self.average: Optional[float] = None
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def release(self, latency: float, rate_limited: bool = False):
+        async with self._condition:
+            self.active -= 1
+            if rate_limited or (self.average is not None and latency > max(self.average * 3, 0.5)):
+                self.limit = max(self.minimum, self.limit // 2)
+                self._successes = 0
+                logger.debug("Bucket pressure detected (latency %.3fs), lowering concurrency to %s", latency, self.limit)
+            else:
+                self._successes += 1
+                if self._successes >= self.limit:
+                    self.limit = min(self.maximum, self.limit + 1)
+                    self._successes = 0
+                self.average = latency if self.average is None else self.average * 0.8 + latency * 0.2
+            # Only wake as many waiters as there are free slots, instead of every item in a large job on every completion
+            self._condition.notify(max(0, self.limit - self.active))
+
+
+class BulkJob:
+    """Runs a list of ``(target_id, operation, kwargs)`` items against a Guild.
+
+    The job state is persisted in the ``BULK_JOBS`` and ``BULK_JOB_ITEMS`` tables so that a restart resumes where the job left off, and a progress
+    Embed in the calling channel is edited as items complete. Operations are looked up by name in :attr:`PokestarBot.bulk_operations`, and are
+    called as ``operation(guild, target_id, **kwargs)``. Operations should be idempotent, since items finished in the last flush interval before a
+    crash are run again."""
+
+    PROGRESS_INTERVAL = 5
+    FLUSH_INTERVAL = 2
+
+    def __init__(self, bot: "PokestarBot", guild: discord.Guild, channel: discord.abc.Messageable, title: str, items: List[BulkItem], *,
+                 author_id: int = 0, job_id: Optional[int] = None, message: Optional[discord.Message] = None):
+        self.bot = bot
+        self.guild = guild
+        self.channel = channel
+        self.title = title
+        self.items = items
+        self.total = len(items)
+        self.author_id = author_id
+        self.job_id = job_id
+        self.message = message
+        self.succeeded: List[int] = []
+        self.failed: List[int] = []
+        self.skipped: List[int] = []
+        self.controller = ConcurrencyController()
+        self._pending_updates: List[Tuple[int, int, int, str]] = []
+        self._last_progress = 0.0
+        self._last_flush = 0.0
+        self._started = 0.0
+
+    @property
+    def completed(self):
+        return len(self.succeeded) + len(self.failed) + len(self.skipped)
+
+    def progress_embed(self, finished: bool = False) -> discord.Embed:
+        percent = (self.completed / self.total * 100) if self.total else 100
+        if finished:
+            color = discord.Color.green() if not self.failed else discord.Color.orange()
+        else:
+            color = discord.Color.blue()
+        embed = discord.Embed(timestamp=datetime.datetime.utcnow(), title=f"{self.title} ({'Finished' if finished else 'Running'})", color=color,
+                              description=f"**{percent:.2f}**% complete")
+        embed.add_field(name="Succeeded", value=str(len(self.succeeded)))
+        embed.add_field(name="Failed", value=str(len(self.failed)))
+        if self.skipped:
+            embed.add_field(name="Skipped", value=str(len(self.skipped)))
+        embed.add_field(name="Remaining", value=str(self.total - self.completed))
+        embed.add_field(name="Concurrency", value=str(self.controller.limit))
+        if self._started:
+            embed.add_field(name="Elapsed", value=str(datetime.timedelta(seconds=round(time.monotonic() - self._started))))
+        if self.job_id is not None:
+            embed.add_field(name="Job ID", value=str(self.job_id))
+        embed.set_footer(text=f"PokestarBot Version {bot_version}")
+        return embed
+
+    async def update_progress(self, finished: bool = False):
+        self._last_progress = time.monotonic()
+        try:
+            if self.message is None:
+                self.message = await self.channel.send(embed=self.progress_embed(finished))
+                if self.job_id is not None:
+                    async with self.bot.conn.execute("""UPDATE BULK_JOBS SET MESSAGE_ID=? WHERE ID==?""", [self.message.id, self.job_id]):
+                        pass
+            else:
+                await self.message.edit(embed=self.progress_embed(finished))
+        except discord.HTTPException:
+            logger.warning("Unable to update progress message for bulk job %s", self.job_id, exc_info=True)
+
+    async def save(self):
+        async with self.bot.conn.execute("""INSERT INTO BULK_JOBS(GUILD_ID, CHANNEL_ID, AUTHOR_ID, TITLE, STATUS) VALUES (?, ?, ?, ?, ?)""",
+                                         [self.guild.id, self.channel.id, self.author_id, self.title, BULK_JOB_STATUS.RUNNING]) as cursor:
+            self.job_id = cursor.lastrowid
+        async with self.bot.conn.executemany(
+                """INSERT OR IGNORE INTO BULK_JOB_ITEMS(JOB_ID, TARGET_ID, OPERATION, ARGS, STATUS) VALUES (?, ?, ?, ?, ?)""",
+                [(self.job_id, target_id, operation, json.dumps(kwargs), BULK_JOB_STATUS.PENDING) for target_id, operation, kwargs in self.items]):
+            pass
+
+    async def flush(self):
+        self._last_flush = time.monotonic()
+        if self.job_id is None or not self._pending_updates:
+            return
+        updates, self._pending_updates = self._pending_updates, []
+        async with self.bot.conn.executemany(
+                """UPDATE BULK_JOB_ITEMS SET STATUS=? WHERE JOB_ID==? AND TARGET_ID==? AND OPERATION==?""", updates):
+            pass
+
+    async def finish(self):
+        await self.flush()
+        if self.job_id is not None:
+            async with self.bot.conn.execute("""DELETE FROM BULK_JOB_ITEMS WHERE JOB_ID==?""", [self.job_id]), self.bot.conn.execute(
+                    """DELETE FROM BULK_JOBS WHERE ID==?""", [self.job_id]):
+                pass
+
+    async def run_item(self, target_id: int, operation: str, kwargs: Dict[str, Any]):
+        func = self.bot.bulk_operations.get(operation)
+        rate_limited = False
+        await self.controller.acquire()
+        start = time.monotonic()
+        try:
+            if func is None:
+                raise KeyError(f"Bulk operation {operation!r} is not registered.")
+            await func(self.guild, target_id, **kwargs)
+        except BulkItemSkipped as exc:
+            logger.debug("Skipped bulk operation %s on %s: %s", operation, target_id, exc)
+            self.skipped.append(target_id)
+            status = BULK_JOB_STATUS.SKIPPED
+        except discord.HTTPException as exc:
+            rate_limited = exc.status == 429
+            logger.debug("Bulk operation %s failed on %s", operation, target_id, exc_info=True)
+            self.failed.append(target_id)
+            status = BULK_JOB_STATUS.FAILED
+        except Exception:
+            logger.warning("Bulk operation %s failed on %s", operation, target_id, exc_info=True)
+            self.failed.append(target_id)
+            status = BULK_JOB_STATUS.FAILED
+        else:
+            self.succeeded.append(target_id)
+            status = BULK_JOB_STATUS.DONE
+        finally:
+            await self.controller.release(time.monotonic() - start, rate_limited=rate_limited)
+        self._pending_updates.append((status, self.job_id, target_id, operation))
+        now = time.monotonic()
+        if now - self._last_flush >= self.FLUSH_INTERVAL:
+            await self.flush()
+        if now - self._last_progress >= self.PROGRESS_INTERVAL:
+            await self.update_progress()
+
+    async def run(self) -> Tuple[List[int], List[int]]:
+        """Run the job to completion, returning the target IDs that succeeded and failed. Skipped targets are in :attr:`skipped`."""
+        if self.job_id is None:
+            await self.save()
+        self._started = time.monotonic()
+        await self.update_progress()
+        logger.info("Running bulk job %s (%s) on %s items", self.job_id, self.title, self.total)
+        # A fixed pool of workers, so that a job for thousands of members does not keep thousands of coroutines waiting on the controller.
+        items = iter(self.items)
+
+        async def worker():
+            for target_id, operation, kwargs in items:
+                await self.run_item(target_id, operation, kwargs)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.controller.maximum, len(self.items)))))
+        await self.finish()
+        await self.update_progress(finished=True)
+        logger.info("Finished bulk job %s (%s): %s succeeded, %s failed, %s skipped", self.job_id, self.title, len(self.succeeded), len(self.failed),
+                    len(self.skipped))
+        return self.succeeded, self.failed
+
+    @classmethod
+    async def resume_all(cls, bot: "PokestarBot"):
+        """Resume every job that was still running when the bot last stopped."""
+        async with bot.conn.execute("""SELECT ID, GUILD_ID, CHANNEL_ID, MESSAGE_ID, AUTHOR_ID, TITLE FROM BULK_JOBS WHERE STATUS==?""",
+                                    [BULK_JOB_STATUS.RUNNING]) as cursor:
+            jobs = await cursor.fetchall()
+        for job_id, guild_id, channel_id, message_id, author_id, title in jobs:
+            guild = bot.get_guild(guild_id)
+            channel = bot.get_channel(channel_id)
+            if guild is None or channel is None:
+                logger.warning("Dropping bulk job %s, the Guild or channel no longer exists.", job_id)
+                async with bot.conn.execute("""DELETE FROM BULK_JOB_ITEMS WHERE JOB_ID==?""", [job_id]), bot.conn.execute(
+                        """DELETE FROM BULK_JOBS WHERE ID==?""", [job_id]):
+                    pass
+                continue
+            async with bot.conn.execute("""SELECT TARGET_ID, OPERATION, ARGS, STATUS FROM BULK_JOB_ITEMS WHERE JOB_ID==?""", [job_id]) as cursor:
+                rows = await cursor.fetchall()
+            message = None
+            if message_id:
+                try:
+                    message = await channel.fetch_message(message_id)
+                except discord.HTTPException:
+                    message = None
+            job = cls(bot, guild, channel, title, [], author_id=author_id, job_id=job_id, message=message)
+            for target_id, operation, args, status in rows:
+                if status == BULK_JOB_STATUS.PENDING:
+                    job.items.append((target_id, operation, json.loads(args)))
+                elif status == BULK_JOB_STATUS.DONE:
+                    job.succeeded.append(target_id)
+                elif status == BULK_JOB_STATUS.SKIPPED:
+                    job.skipped.append(target_id)
+                else:
+                    job.failed.append(target_id)
+            job.total = len(rows)
+            logger.info("Resuming bulk job %s (%s) with %s items left", job_id, title, len(job.items))
+            bot.loop.create_task(job.run())
+
+
+def get_member(guild: discord.Guild, member_id: int) -> discord.Member:
+    member = guild.get_member(member_id)
+    if member is None:
+        raise BulkItemSkipped(f"Member {member_id} is no longer in the Guild.")
+    return member
+
+
+def get_role(guild: discord.Guild, role_id: int) -> discord.Role:
+    role = guild.get_role(role_id)
+    if role is None:
+        raise BulkItemSkipped(f"Role {role_id} no longer exists.")
+    return role
+
+
+async def add_role(guild: discord.Guild, member_id: int, *, role_id: int, reason: Optional[str] = None):
+    await get_member(guild, member_id).add_roles(discord.Object(role_id), reason=reason)
+
+
+async def remove_role(guild: discord.Guild, member_id: int, *, role_id: int, reason: Optional[str] = None):
+    await get_member(guild, member_id).remove_roles(discord.Object(role_id), reason=reason)
+
+
+async def assign_role(guild: discord.Guild, role_id: int, *, member_id: int, reason: Optional[str] = None):
+    await get_member(guild, member_id).add_roles(discord.Object(role_id), reason=reason)
+
+
+async def unassign_role(guild: discord.Guild, role_id: int, *, member_id: int, reason: Optional[str] = None):
+    await get_member(guild, member_id).remove_roles(discord.Object(role_id), reason=reason)
+
+
+async def edit_role(guild: discord.Guild, role_id: int, *, permissions: Optional[int] = None, color: Optional[int] = None,
+                    reason: Optional[str] = None):
+    kwargs: Dict[str, Union[discord.Permissions, discord.Color]] = {}
+    if permissions is not None:
+        kwargs["permissions"] = discord.Permissions(permissions)
+    if color is not None:
+        kwargs["color"] = discord.Color(color)
+    await get_role(guild, role_id).edit(reason=reason, **kwargs)
+
+
+async def move_member(guild: discord.Guild, member_id: int, *, channel_id: int, reason: Optional[str] = None):
+    await get_member(guild, member_id).move_to(guild.get_channel(channel_id), reason=reason)
+
+
+async def kick_member(guild: discord.Guild, member_id: int, *, reason: Optional[str] = None):
+    await guild.kick(discord.Object(member_id), reason=reason)
+
+
+async def edit_member_voice(guild: discord.Guild, member_id: int, *, mute: Optional[bool] = None, deafen: Optional[bool] = None,
+                            reason: Optional[str] = None):
+    kwargs = {}
+    if mute is not None:
+        kwargs["mute"] = mute
+    if deafen is not None:
+        kwargs["deafen"] = deafen
+    await get_member(guild, member_id).edit(reason=reason, **kwargs)
+
+
+builtin_bulk_operations: Dict[str, BulkOperation] = {
+    "add_role": add_role,
+    "remove_role": remove_role,
+    "assign_role": assign_role,
+    "unassign_role": unassign_role,
+    "edit_role": edit_role,
+    "move_member": move_member,
+    "kick_member": kick_member,
+    "edit_member_voice": edit_member_voice,
+}
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from typing import List, Optional
+
+from ..const import code_cpu_limit, code_memory_limit, code_output_limit, code_timeout, code_warm_workers
+
+logger = logging.getLogger(__name__)
+
+worker_path = os.path.abspath(os.path.join(__file__, "..", "..", "code_worker.py"))
+
+
+class CodeResult:
+    """The output of one block. ``value`` is the pretty-printed result of an eval, or None."""
+
+    __slots__ = ("stdout", "stderr", "value", "ok", "timed_out", "returncode", "duration", "truncated", "finished")
+
+    def __init__(self):
+        self.stdout = ""
+        self.stderr = ""
+        self.value: Optional[str] = None
+        self.ok = False
+        self.timed_out = False
+        self.returncode: Optional[int] = None
+        self.duration = 0.0
+        self.truncated = False
+        self.finished = False
+
+    def add(self, stream: str, data: str):
+        current = getattr(self, stream)
+        if len(current) >= code_output_limit:
+            self.truncated = True
+            return
+        setattr(self, stream, current + data[:code_output_limit - len(current)])
+
+
+class CodeRunner:
+    """Runs ``%eval`` / ``%exec`` blocks in ``code_worker.py`` subprocesses, one process per block, so that user code can neither block the event
+    loop nor see another block's state or output.
+
+    ``warm`` workers are kept started ahead of time, with their CPU and memory limits already applied, so a block does not wait for the
+    interpreter to start. A block that runs for longer than ``timeout`` seconds of wall-clock time is killed."""
+
+    def __init__(self, warm: int = code_warm_workers, timeout: float = code_timeout, cpu_limit: int = code_cpu_limit,
+                 memory_limit: int = code_memory_limit):
+        self.warm = warm
+        self.timeout = timeout
+        self.cpu_limit = cpu_limit
+        self.memory_limit = memory_limit
+        self.idle: List[asyncio.subprocess.Process] = []
+        self.starting = 0
+        self.closed = False
+
+    async def spawn(self) -> asyncio.subprocess.Process:
+        process = await asyncio.create_subprocess_exec(sys.executable, "-I", worker_path, str(self.cpu_limit), str(self.memory_limit),
+                                                       str(code_output_limit), stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+                                                       stderr=asyncio.subprocess.STDOUT, start_new_session=True, limit=2 ** 22)
+        if not await process.stdout.readline():
+            raise RuntimeError(f"Code worker exited with code {await process.wait()} while starting")
+        return process
+
+    async def replenish(self):
+        if self.closed or len(self.idle) + self.starting >= self.warm:
+            return
+        self.starting += 1
+        try:
+            process = await self.spawn()
+        except Exception:
+            logger.exception("Unable to start a code worker")
+            return
+        finally:
+            self.starting -= 1
+        if self.closed:
+            self.kill(process)
+        else:
+            self.idle.append(process)
+
+    async def start(self):
+        await asyncio.gather(*(self.replenish() for _ in range(self.warm)))
+
+    async def acquire(self) -> asyncio.subprocess.Process:
+        while self.idle:
+            process = self.idle.pop()
+            if process.returncode is None:
+                break
+        else:
+            process = await self.spawn()
+        asyncio.ensure_future(self.replenish())
+        return process
+
+    @staticmethod
+    def kill(process: asyncio.subprocess.Process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)  # Also kills anything the code started, even after the worker has exited
+        except (ProcessLookupError, PermissionError, AttributeError):
+            if process.returncode is None:
+                process.kill()
+
+    async def close(self):
+        self.closed = True
+        for process in self.idle:
+            self.kill(process)
+        await asyncio.gather(*(process.wait() for process in self.idle))
+        self.idle.clear()
+
+    async def read(self, process: asyncio.subprocess.Process, result: CodeResult):
+        async for line in process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:  # Written to the real stdout, such as with os.write(1, ...)
+                result.add("stdout", line.decode("utf-8", errors="replace"))
+                continue
+            if "stream" in message:
+                result.add(message["stream"], message["data"])
+            elif "result" in message:
+                result.finished = True
+                result.ok = message["result"]["ok"]
+                result.value = message["result"]["value"]
+                result.truncated = result.truncated or message["result"]["truncated"]
+                return  # Processes started by the code may still hold the pipe open
+
+    async def run(self, code: str, is_exec: bool) -> CodeResult:
+        result = CodeResult()
+        start = time.perf_counter()
+        process = await self.acquire()
+        try:
+            process.stdin.write(json.dumps({"code": code, "exec": is_exec}).encode("utf-8") + b"\n")
+            await process.stdin.drain()
+            process.stdin.close()
+            await asyncio.wait_for(self.read(process, result), self.timeout)
+        except asyncio.TimeoutError:
+            result.timed_out = True
+        finally:
+            # The pipes only close (and wait() only returns) once anything the code started is gone too.
+            self.kill(process)
+        result.returncode = await process.wait()
+        result.duration = time.perf_counter() - start
+        if result.timed_out:
+            result.add("stderr", f"\nExecution was stopped after {self.timeout:g} seconds.")
+        elif result.finished:
+            pass
+        elif hasattr(signal, "SIGXCPU") and result.returncode == -signal.SIGXCPU:
+            result.add("stderr", f"\nExecution used more than {self.cpu_limit} seconds of CPU time.")
+        else:
+            result.add("stderr", f"\nThe worker exited with code {result.returncode}.")
+        return result
@@ -0,0 +1,44 @@
+import logging
+import os
+from typing import Dict, FrozenSet, Hashable, List, Optional, TYPE_CHECKING, Tuple
+
+import discord.ext.commands
+
+from ..const import help_file_dir
+
+if TYPE_CHECKING:
+    from ..bot import PokestarBot
+
+logger = logging.getLogger(__name__)
+
+
+class CommandRegistry:
+    """A snapshot of the bot's commands, along with everything the help command derives from them.
+
+    The bot builds it on first use and throws it away whenever a command is added or removed (which is what loading, unloading or reloading
+    an extension does), so the cached help renders can never be stale. Renders are keyed by ``(view, permission set)``, where the permission
+    set is the names of the commands that the user passed the checks for, so that users who can run the same commands share a render."""
+
+    __slots__ = ("commands", "command_names", "renders", "help_files")
+
+    def __init__(self, bot: "PokestarBot"):
+        self.commands: Dict[str, discord.ext.commands.Command] = {command.qualified_name: command for command in bot.walk_commands()}
+        self.command_names: List[str] = sorted(self.commands)
+        self.renders: Dict[Tuple[Hashable, Optional[FrozenSet[str]]], str] = {}
+        self.help_files: Dict[str, Optional[str]] = {}
+
+    @staticmethod
+    def permission_set(commands: Optional[List[discord.ext.commands.Command]]) -> Optional[FrozenSet[str]]:
+        return None if commands is None else frozenset(command.qualified_name for command in commands)
+
+    def help_file(self, name: str) -> Optional[str]:
+        """The contents of the man page for ``name`` (a command's qualified name or a cog's name), stripped of trailing whitespace, or None if it
+        does not exist. Each file is only read once per snapshot."""
+        name = name.lower().rstrip()
+        if name not in self.help_files:
+            try:
+                with open(os.path.join(help_file_dir, name + ".md"), encoding="utf-8") as file:
+                    self.help_files[name] = file.read().rstrip()
+            except FileNotFoundError:
+                self.help_files[name] = None
+        return self.help_files[name]
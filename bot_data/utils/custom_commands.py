@@ -5,6 +5,7 @@ import discord.ext.commands
 
 from .custom_warnings import NotUsingFullyInvokeCommand
 from .custom_context import HubContext
+from .log_context import set_log_context
 
 class CustomMixin:
     """Mixin to do the custom behaviors."""
@@ -30,6 +31,7 @@ class CustomMixin:
 
     async def fully_run_command(self, ctx: HubContext, *args: Any, **kwargs: Any):
         ctx.hub.add_breadcrumb(category="Command Run", message=f"Invoking command {self.name}")
+        set_log_context(ctx)
         if not await self.can_run(ctx):
             raise discord.ext.commands.CheckFailure("Check functions failed")
         self._prepare_cooldowns(ctx)
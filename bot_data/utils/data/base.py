@@ -1,10 +1,31 @@
 import abc
 import datetime
 import json
-from typing import Any, Callable, ClassVar, Dict, Iterable, Optional, Type, Union
+import os
+from typing import Any, Callable, ClassVar, Dict, FrozenSet, Iterable, Optional, Tuple, Type, Union
+
+# Set to turn off the generated methods for every class, such as to step through the generic ones in a debugger.
+compile_classes = not os.environ.get("NO_COMPILE_DATA_CLASSES")
+
+
+def _generated(func: Callable) -> Callable:
+    func._bdc_generated = True
+    return func
+
+
+def _compile(source: str, name: str, namespace: Dict[str, Any]) -> Callable:
+    exec(compile(source, f"<generated {name}>", "exec"), namespace)
+    return _generated(namespace[name])
 
 
 class BDCMeta(abc.ABCMeta):
+    """Checks the class attributes of every data class, and replaces the generic ``__init__``, ``__setattr__``, ``dict``, ``_dict``, ``json``,
+    ``__hash__`` and comparison methods of :class:`BaseDataClass` with versions generated for the class's fields, which do not look the fields up on every call.
+
+    A method is only generated if the class would otherwise use the generic one, so methods that a class defines itself (or inherits from a
+    class that defines it) are left alone. Set ``COMPILED = False`` on a class, or the ``NO_COMPILE_DATA_CLASSES`` environment variable, to
+    use the generic methods."""
+
     def __new__(mcs, *args, **kwargs):
         cls: Type["BaseDataClass"] = super().__new__(mcs, *args, **kwargs)
         if "BaseDataClass" not in str(cls.mro()):
@@ -14,19 +35,122 @@ class BDCMeta(abc.ABCMeta):
         if cls.REPR_FIELDS is not None:
             for field in cls.REPR_FIELDS:
                 assert hasattr(cls, field), f"{field!r} not in defined attributes."
+        slots = (cls.__slots__,) if isinstance(cls.__slots__, str) else tuple(cls.__slots__)
+        cls._bdc_slots = slots
+        cls._bdc_slot_set = frozenset(slots)
+        cls._bdc_fields = tuple(val for val in slots if not val.startswith("_"))
+        base = next(klass for klass in cls.__mro__ if klass.__module__ == __name__ and klass.__qualname__ == "BaseDataClass")
+        if base is not cls:
+            mcs._generate(cls, base, compile_classes and cls.COMPILED)
         return cls
 
+    @staticmethod
+    def _inherited(cls: type, name: str) -> Any:
+        for klass in cls.__mro__:
+            if name in klass.__dict__:
+                return klass.__dict__[name]
+        return None
+
+    @classmethod
+    def _generate(mcs, cls: Type["BaseDataClass"], base: Type["BaseDataClass"], enabled: bool):
+        def replaceable(name: str) -> bool:
+            current = mcs._inherited(cls, name)
+            func = current.fget if isinstance(current, property) else current
+            return current is base.__dict__[name] or getattr(func, "_bdc_generated", False)
+
+        def install(name: str, func: Optional[Callable], is_property: bool = False):
+            if not replaceable(name):
+                return
+            if not enabled or func is None:  # Undo what a parent class generated
+                func = base.__dict__[name]
+                if mcs._inherited(cls, name) is not func:
+                    setattr(cls, name, func)
+            else:
+                setattr(cls, name, property(func) if is_property else func)
+
+        namespace = {"_cls": cls, "_generic_init": base.__init__, "_datetime": datetime.datetime, "_utc": datetime.timezone.utc,
+                     "_dumps": json.dumps, "_getattr": getattr, "_NotImplemented": NotImplemented}
+        default_setattr = replaceable("__setattr__")
+        namespace["_setattr"] = super(base, cls).__setattr__ if default_setattr else setattr
+        install("__init__", mcs._make_init(cls, default_setattr, namespace) if enabled else None)
+        install("__setattr__", _compile("def __setattr__(self, key, value):\n"
+                                        "    if isinstance(value, _datetime) and value.tzinfo is None:\n"
+                                        "        value = value.replace(tzinfo=_utc)\n"
+                                        "    _setattr(self, key, value)\n", "__setattr__", namespace) if enabled else None)
+        dict_func = mcs._make_dict(cls._bdc_fields, "dict", namespace) if enabled else None
+        install("dict", dict_func, is_property=True)
+        install("_dict", mcs._make_dict(cls._bdc_slots, "_dict", namespace) if enabled else None, is_property=True)
+        if enabled and isinstance(cls.__dict__.get("dict"), property) and cls.__dict__["dict"].fget is dict_func:
+            namespace["_dict_func"] = dict_func
+            install("json", _compile("def json(self):\n    return _dumps(_dict_func(self), default=self._serialize_func)\n", "json", namespace),
+                    is_property=True)
+        else:
+            install("json", None, is_property=True)
+        install("__eq__", mcs._make_eq(cls, namespace) if enabled else None)
+        install("__hash__", mcs._make_hash(cls, namespace) if enabled and cls.REPR_FIELDS is not None else None)
+        for name, operator in (("__lt__", "<"), ("__gt__", ">"), ("__le__", "<="), ("__ge__", ">=")):
+            install(name, mcs._make_comparison(cls, name, operator, namespace) if enabled and cls.COMP_FIELD is not None else None)
+
+    @staticmethod
+    def _attribute(name: str, obj: str = "self") -> str:
+        return f"{obj}.{name}" if name.isidentifier() and not name.startswith("__") else f"_getattr({obj}, {name!r})"
+
+    @classmethod
+    def _make_init(mcs, cls: Type["BaseDataClass"], default_setattr: bool, namespace: Dict[str, Any]) -> Callable:
+        # A subclass with its own __init__ that calls this one has different fields, so it takes the generic path.
+        lines = ["def __init__(self, **data):", "    if self.__class__ is not _cls:", "        return _generic_init(self, **data)",
+                 "    for key, value in data.items():", "        if value is not None:"]
+        if default_setattr:
+            # Inline BaseDataClass.__setattr__, which only makes naive datetimes UTC.
+            lines += ["            if isinstance(value, _datetime) and value.tzinfo is None:", "                value = value.replace(tzinfo=_utc)"]
+        lines.append("            _setattr(self, key, value)")
+        for attr in cls.REQUIRED_FIELDS or ():
+            lines += [f"    if {mcs._attribute(attr)} is None:",
+                      f"        raise ValueError({f'Attribute {attr} must be defined during class initialization.'!r})"]
+        return _compile("\n".join(lines) + "\n", "__init__", namespace)
+
+    @classmethod
+    def _make_dict(mcs, fields: Tuple[str, ...], name: str, namespace: Dict[str, Any]) -> Callable:
+        lines = [f"def {name}(self):", "    result = {}"]
+        for field in dict.fromkeys(fields):
+            lines += [f"    value = {mcs._attribute(field)}", "    if value is not None:", f"        result[{field!r}] = value"]
+        lines.append("    return result")
+        return _compile("\n".join(lines) + "\n", name, namespace)
+
+    @classmethod
+    def _make_eq(mcs, cls: Type["BaseDataClass"], namespace: Dict[str, Any]) -> Callable:
+        lines = ["def __eq__(self, other):", "    if type(other) != type(self):", "        return _NotImplemented"]
+        for field in cls._bdc_fields:
+            lines += [f"    if not {mcs._attribute(field)} == {mcs._attribute(field, 'other')}:", "        return False"]
+        lines.append("    return True")
+        return _compile("\n".join(lines) + "\n", "__eq__", namespace)
+
+    @classmethod
+    def _make_hash(mcs, cls: Type["BaseDataClass"], namespace: Dict[str, Any]) -> Callable:
+        terms = " ^ ".join(f"hash({mcs._attribute(field)})" for field in dict.fromkeys(cls.REPR_FIELDS))
+        return _compile(f"def __hash__(self):\n    return {terms or '0'}\n", "__hash__", namespace)
+
+    @classmethod
+    def _make_comparison(mcs, cls: Type["BaseDataClass"], name: str, operator: str, namespace: Dict[str, Any]) -> Callable:
+        return _compile(f"def {name}(self, other):\n    if type(other) != type(self):\n        return _NotImplemented\n"
+                        f"    return {mcs._attribute(cls.COMP_FIELD)} {operator} {mcs._attribute(cls.COMP_FIELD, 'other')}\n", name, namespace)
+
 
 class BaseDataClass(metaclass=BDCMeta):
     REPR_FIELDS: ClassVar[Optional[Iterable[str]]] = None
     COMP_FIELD: ClassVar[Optional[str]] = None
     __slots__: ClassVar[Union[str, Iterable[str]]] = ("_serialize_func",)
     REQUIRED_FIELDS: ClassVar[Optional[Iterable[str]]] = None
+    COMPILED: ClassVar[bool] = True
     _serialize_func: Optional[Callable[[Any], Union[str, int, bool, float, list, dict, None]]]
 
+    _bdc_slots: ClassVar[Tuple[str, ...]]
+    _bdc_slot_set: ClassVar[FrozenSet[str]]
+    _bdc_fields: ClassVar[Tuple[str, ...]]
+
     @property
     def slots(self):
-        return tuple(val for val in ((self.__slots__,) if isinstance(self.__slots__, str) else self.__slots__) if not val.startswith("_"))
+        return self._bdc_fields
 
     def __init__(self, **data):
         for key, value in data.items():
@@ -57,7 +181,7 @@ class BaseDataClass(metaclass=BDCMeta):
             return val
 
     def __getattr__(self, item: str) -> None:
-        if item in self.__slots__:
+        if item in self._bdc_slot_set:
             return None
         raise AttributeError(f"{type(self).__name__!r} object has no attribute {item!r}")
 
@@ -1,5 +1,5 @@
 import datetime
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 from .group import MangadexGroup
 from ..base import BaseDataClass
@@ -70,15 +70,82 @@ class MangadexChapter(BaseDataClass):
 
 
 class MangadexChapterList(list, List[MangadexChapter]):
-    @property
-    def latest(self) -> Optional[MangadexChapter]:
-        return sorted(self)[-1] if self else None
+    """A list of chapters that keeps track of its latest chapter as chapters are added, so :attr:`latest` does not sort the list. Removing or
+    replacing chapters invalidates it, and the next access finds it again in one pass."""
 
-    __slots__ = ("lang")
+    __slots__ = ("lang", "_latest", "_latest_valid")
 
     def __init__(self, *args, lang=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.lang = lang
+        self._latest: Optional[MangadexChapter] = None
+        self._latest_valid = False
+
+    def _offer(self, chapter: MangadexChapter):
+        # ``>=`` so that, like ``sorted(self)[-1]``, the last of several equal chapters wins.
+        if self._latest is None or chapter >= self._latest:
+            self._latest = chapter
+
+    @property
+    def latest(self) -> Optional[MangadexChapter]:
+        if not self._latest_valid:
+            self._latest = None
+            for chapter in self:
+                self._offer(chapter)
+            self._latest_valid = True
+        return self._latest
+
+    def append(self, chapter: MangadexChapter):
+        super().append(chapter)
+        if self._latest_valid:
+            self._offer(chapter)
+
+    def extend(self, chapters: Iterable[MangadexChapter]):
+        chapters = list(chapters)
+        super().extend(chapters)
+        if self._latest_valid:
+            for chapter in chapters:
+                self._offer(chapter)
+
+    def __iadd__(self, chapters: Iterable[MangadexChapter]):
+        self.extend(chapters)
+        return self
+
+    def _invalidate(self):
+        self._latest_valid = False
+
+    def insert(self, index: int, chapter: MangadexChapter):
+        super().insert(index, chapter)
+        self._invalidate()  # The position matters when chapters are equal
+
+    def remove(self, chapter: MangadexChapter):
+        super().remove(chapter)
+        self._invalidate()
+
+    def pop(self, index: int = -1) -> MangadexChapter:
+        chapter = super().pop(index)
+        self._invalidate()
+        return chapter
+
+    def clear(self):
+        super().clear()
+        self._invalidate()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._invalidate()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._invalidate()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._invalidate()
+
+    def reverse(self):
+        super().reverse()
+        self._invalidate()
 
     def __repr__(self) -> str:
         return f"ChapterList<{len(self)} chapters, latest={self.latest!r}, lang={self.lang!r}>"
@@ -87,23 +154,32 @@ class MangadexChapterList(list, List[MangadexChapter]):
         return type(self)([chap for chap in self if chap.language and chap.language == lang], lang=lang)
 
     def filter_duplicates(self) -> "MangadexChapterList":
-        seen = []
+        seen = set()
         final = []
         for item in self:
             identifier = item.num if item.num else item.title
             if identifier not in seen:
-                seen.append(identifier)
+                seen.add(identifier)
                 final.append(item)
         return type(self)(final)
 
+    @staticmethod
+    def max_chapter_id(data: dict) -> Optional[int]:
+        """The highest chapter ID in a v2 chapter list response, in any language, without building the chapters."""
+        return max((int(item["id"]) for item in data["data"]["chapters"]), default=None)
+
     @classmethod
-    def from_chapter_list_v2(cls, data: dict):
+    def from_chapter_list_v2(cls, data: dict, newer_than: Optional[int] = None):
+        """Build the chapters of a v2 chapter list response. If ``newer_than`` is a chapter ID, only chapters uploaded after it (which have
+        higher IDs) are built."""
         data = data["data"]
         chapters: list = data["chapters"]
         groups: list = data["groups"]
         group_data_dict = {item["id"]: item["name"] for item in groups}
-        intermediate = MangadexChapterList()
+        intermediate = cls()
         for item in chapters:
+            if newer_than is not None and int(item["id"]) <= newer_than:
+                continue
             chap = MangadexChapter.from_api_v2_list(item)
             for group in chap.groups:
                 group.name = group_data_dict[group.id]
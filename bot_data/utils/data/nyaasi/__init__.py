@@ -1,5 +1,5 @@
 from .category import NyaaCategory
 from .enum import NyaaCategoryTypes, NyaaFilter, NyaaTitleParseWarningLevel
-from .title_parsers import BaseTitleParser, author_parser_mapping
+from .title_parsers import BaseTitleParser, NO_MATCH, TitleParserRegistry, author_parser_mapping, title_parser_registry
 from .torrent import NyaaTorrent, NyaaTorrentList
 from .util import get_category, search_string_builder
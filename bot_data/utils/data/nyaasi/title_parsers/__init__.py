@@ -1,2 +1,3 @@
 from .base import BaseTitleParser
-from .mapping import author_parser_mapping
+from .mapping import author_parser_mapping, title_parser_registry
+from .registry import NO_MATCH, TitleParserRegistry
@@ -2,6 +2,8 @@ from .base import BaseTitleParser
 
 
 class AnimeTimeTitleParser(BaseTitleParser):
+    TAG = "Anime Time"
+
     @classmethod
     def parse(cls, data: str):
-        return cls._common_res_logic(data, name="Anime Time")
+        return cls._common_res_logic(data)
@@ -1,6 +1,7 @@
 import abc
+import functools
 import re
-from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple, Type, TypeVar
 
 from .exceptions import TitleDoesNotMatchException
 from ...base import BDCMeta, BaseDataClass
@@ -8,13 +9,29 @@ from ...util import remove_suffix
 
 _T = TypeVar("_T")
 
+_bracket_pattern = re.compile(r"([\[\(\{])([^\(\)\[\]\{\}]*)([\)\}\]])")
+
+
+@functools.lru_cache(maxsize=1024)
+def _bracket_contents(string: str) -> Tuple[str, ...]:
+    # Cached because the registry extracts the brackets to pick a parser, and then the parser extracts them again.
+    matches = []
+    for match in _bracket_pattern.finditer(string):
+        start, end = match.group(1, 3)
+        text = match.group(2)
+        if (start, end) in [tuple("[]"), tuple("()"), tuple("{}")] and start not in text and end not in text:
+            matches.append(text)
+    return tuple(matches)
+
 
 class BaseTitleParser(BaseDataClass):
     REQUIRED_FIELDS = REPR_FIELDS = ("name", "number", "resolution")
     COMP_FIELD = "_comp"
     __slots__ = ("name", "number", "resolution", "version", "season", "hash")
 
-    _bracket_pattern = re.compile(r"([\[\(\{])([^\(\)\[\]\{\}]*)([\)\}\]])")
+    TAG: ClassVar[Optional[str]] = None  # The release group's bracket tag, if it is not the class name without "TitleParser"
+
+    _bracket_pattern = _bracket_pattern
     _ep_and_version_pattern = re.compile(r"([0-9]+)v([0-9]+)", flags=re.IGNORECASE)
     _season_and_ep_version_pattern = re.compile(r"S([0-9]+)E([0-9]+)", flags=re.IGNORECASE)
 
@@ -30,14 +47,12 @@ class BaseTitleParser(BaseDataClass):
         return self.name.lower(), self.season or -1, self.number, self.resolution, self.version or -1
 
     @classmethod
-    def _get_brackets(cls, string: str):
-        matches = []
-        for match in cls._bracket_pattern.finditer(string):
-            start, end = match.group(1, 3)
-            text = match.group(2)
-            if (start, end) in [tuple("[]"), tuple("()"), tuple("{}")] and start not in text and end not in text:
-                matches.append(text)
-        return matches
+    def tag(cls) -> str:
+        return cls.TAG or remove_suffix(cls.__name__, "TitleParser")
+
+    @classmethod
+    def _get_brackets(cls, string: str) -> Tuple[str, ...]:
+        return _bracket_contents(string)
 
     @classmethod
     def _remove_brackets(cls, string: str):
@@ -47,16 +62,16 @@ class BaseTitleParser(BaseDataClass):
         super().__init__(name=name.strip(), number=number, resolution=resolution, **kwargs)
 
     @classmethod
-    def _check_for_name(cls, string: str, bracket_data: list, name: Optional[str] = None):
+    def _check_for_name(cls, string: str, bracket_data: Tuple[str, ...], name: Optional[str] = None):
         if name is None:
-            name = remove_suffix(cls.__name__, "TitleParser")
+            name = cls.tag()
         if name.lower() not in [item.lower() for item in bracket_data]:
             raise TitleDoesNotMatchException(string, cls.__name__, specific=f"the matcher's name ({name!r}) was not found in the bracket data")
 
     @classmethod
     def _common_ep_logic(cls, data: str, name: Optional[str] = None, does_batch: bool = True):
         if name is None:
-            name = remove_suffix(cls.__name__, "TitleParser")
+            name = cls.tag()
         bracket_data = cls._get_brackets(data)
         cls._check_for_name(data, bracket_data, name=name)
         remainder = cls._remove_brackets(data).strip().partition(".")[0].strip()  # remove extension
@@ -76,7 +91,7 @@ class BaseTitleParser(BaseDataClass):
     @classmethod
     def _ep_logic_season(cls, data: str, name: Optional[str] = None):
         if name is None:
-            name = remove_suffix(cls.__name__, "TitleParser")
+            name = cls.tag()
         bracket_data = cls._get_brackets(data)
         cls._check_for_name(data, bracket_data, name=name)
         remainder = cls._remove_brackets(data).strip().partition(".")[0].strip()  # remove extension
@@ -89,11 +104,11 @@ class BaseTitleParser(BaseDataClass):
 
     @classmethod
     def _common_res_logic(cls, data: str, name: Optional[str] = None,
-                          ep_method: Optional[Callable[[str, str], Tuple[str, str, str, str, List[str], str]]] = None,
+                          ep_method: Optional[Callable[[str, str], Tuple[str, str, str, str, Tuple[str, ...], str]]] = None,
                           hash_chars: Optional[int] = None,
                           extra_bracket_data_callables: Optional[List[Callable[[str], Dict[str, Optional[Any]]]]] = None):
         if name is None:
-            name = remove_suffix(cls.__name__, "TitleParser")
+            name = cls.tag()
         if ep_method is None:
             ep_method = cls._common_ep_logic
         anime_name, ep, version, season, bracket_data, remainder = ep_method(data, name)
@@ -2,6 +2,7 @@ from .base import BaseTitleParser
 
 
 class EraiRawsParser(BaseTitleParser):
+    TAG = "Erai-raws"
 
     @staticmethod
     def _get_version(item: str):
@@ -15,4 +16,4 @@ class EraiRawsParser(BaseTitleParser):
     @classmethod
     def parse(cls, data: str):
         data = data.replace(" END ", " ")
-        return cls._common_res_logic(data, name="Erai-raws", extra_bracket_data_callables=[cls._get_version])
+        return cls._common_res_logic(data, extra_bracket_data_callables=[cls._get_version])
@@ -13,6 +13,7 @@ from .lostyears import LostYearsTitleParser
 from .mlz import MLZTitleParser
 from .pantsu import PantsuTitleParser
 from .raze import RazeTitleParser
+from .registry import TitleParserRegistry
 from .riptime import RipTimeTitleParser
 from .sheoo import SheooTitleParser
 from .ssa import SSATitleParser
@@ -29,3 +30,5 @@ author_parser_mapping = {
     "Raze876": RazeTitleParser, "horo747": PantsuTitleParser, "Luxury": USDTitleParser, "Zahuczky": ZahuczkyTitleParser, "Sheoo": SheooTitleParser,
     "LostYears": LostYearsTitleParser
 }
+
+title_parser_registry = TitleParserRegistry(author_parser_mapping)
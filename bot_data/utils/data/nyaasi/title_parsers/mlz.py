@@ -2,6 +2,8 @@ from .base import BaseTitleParser
 
 
 class MLZTitleParser(BaseTitleParser):
+    TAG = "mal lu zen"
+
     @classmethod
     def parse(cls, data: str):
-        return cls._common_res_logic(data, name="mal lu zen")
+        return cls._common_res_logic(data)
@@ -0,0 +1,81 @@
+import collections
+from typing import Dict, List, Tuple, Type, Union
+
+from .base import BaseTitleParser
+from .exceptions import TitleDoesNotMatchException
+
+
+class _NoMatch:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "NO_MATCH"
+
+    def __bool__(self) -> bool:
+        return False
+
+
+NO_MATCH = _NoMatch()
+"""Returned by :meth:`TitleParserRegistry.parse` when no release group that has a parser is tagged in the title."""
+
+ParseResult = Union[Tuple[str, BaseTitleParser], List[Tuple[str, TitleDoesNotMatchException]], _NoMatch]
+
+
+class TitleParserRegistry:
+    """Picks the title parser for a torrent from the release group tags in its title, instead of trying every parser.
+
+    The brackets are extracted once per title and looked up (case-insensitively) in an index of parser tags, so only the parsers of the groups
+    in the title are run. :meth:`parse` returns ``(user, parsed title)`` for the first parser that matches, in the mapping's order, or a list of
+    ``(user, exception)`` if the group was found but the rest of the title could not be parsed, or :data:`NO_MATCH` if no parser applies.
+
+    The same torrents show up in every RSS fetch, so results are kept in a memo of the ``memo_size`` most recently used titles. Parsed titles
+    are shared between calls and must not be modified."""
+
+    __slots__ = ("mapping", "order", "by_tag", "memo", "memo_size", "hits", "misses")
+
+    def __init__(self, mapping: Dict[str, Type[BaseTitleParser]], memo_size: int = 4096):
+        self.mapping = mapping
+        self.order: Dict[str, int] = {user: num for num, user in enumerate(mapping)}
+        self.by_tag: Dict[str, List[Tuple[str, Type[BaseTitleParser]]]] = {}
+        for user, parser in mapping.items():
+            self.by_tag.setdefault(parser.tag().lower(), []).append((user, parser))
+        self.memo: Dict[str, ParseResult] = collections.OrderedDict()
+        self.memo_size = memo_size
+        self.hits = 0
+        self.misses = 0
+
+    def candidates(self, title: str) -> List[Tuple[str, Type[BaseTitleParser]]]:
+        found = {}
+        for item in BaseTitleParser._get_brackets(title):
+            for user, parser in self.by_tag.get(item.lower(), ()):
+                found[user] = parser
+        if len(found) > 1:
+            return sorted(found.items(), key=lambda pair: self.order[pair[0]])
+        return list(found.items())
+
+    def _parse(self, title: str) -> ParseResult:
+        exceptions = []
+        for user, parser in self.candidates(title):
+            try:
+                return user, parser.parse(title)
+            except TitleDoesNotMatchException as exc:
+                exceptions.append((user, exc))
+        return exceptions or NO_MATCH
+
+    def parse(self, title: str) -> ParseResult:
+        try:
+            result = self.memo[title]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.memo.move_to_end(title)
+            return result
+        result = self.memo[title] = self._parse(title)
+        if len(self.memo) > self.memo_size:
+            self.memo.popitem(last=False)
+        return result
+
+    def clear(self):
+        self.memo.clear()
+        self.hits = self.misses = 0
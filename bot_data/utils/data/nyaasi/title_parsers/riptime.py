@@ -2,6 +2,8 @@ from .base import BaseTitleParser
 
 
 class RipTimeTitleParser(BaseTitleParser):
+    TAG = "Rip Time"
+
     @classmethod
     def parse(cls, data: str):
-        return cls._common_res_logic(data, name="Rip Time")
+        return cls._common_res_logic(data)
@@ -2,6 +2,8 @@ from .base import BaseTitleParser
 
 
 class ZahuczkyTitleParser(BaseTitleParser):
+    TAG = "Zahuczky Sub Team"
+
     @classmethod
     def _get_season(cls, item: str):
         if match := cls._season_and_ep_version_pattern.search(item):
@@ -11,4 +13,4 @@ class ZahuczkyTitleParser(BaseTitleParser):
 
     @classmethod
     def parse(cls, data: str):
-        return cls._common_res_logic(data, name="Zahuczky Sub Team", extra_bracket_data_callables=[cls._get_season])
+        return cls._common_res_logic(data, extra_bracket_data_callables=[cls._get_season])
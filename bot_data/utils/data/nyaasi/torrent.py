@@ -10,7 +10,8 @@ from .category import NyaaCategory
 from .enum import NyaaTitleParseWarningLevel
 from .title_parsers.base import BaseTitleParser
 from .title_parsers.exceptions import TitleDoesNotMatchException
-from .title_parsers.mapping import author_parser_mapping
+from .title_parsers.mapping import author_parser_mapping, title_parser_registry
+from .title_parsers.registry import NO_MATCH
 from .util import get_category
 from .. import BaseDataClass
 from ..byte import Byte
@@ -97,16 +98,13 @@ class NyaaTorrent(BaseDataClass):
         return cls(**final_data)
 
     def parse_title(self) -> Optional[Union[BaseTitleParser, List[Tuple[str, TitleDoesNotMatchException]]]]:
-        exceptions = []
-        for user, parser in author_parser_mapping.items():
-            try:
-                data = parser.parse(self.title)
-                self.user = user
-                return data
-            except TitleDoesNotMatchException as exc:
-                if not (exc.specific and "was not found in the bracket data" in exc.specific):
-                    exceptions.append((user, exc))
-        return exceptions or None
+        result = title_parser_registry.parse(self.title)
+        if result is NO_MATCH:
+            return None
+        elif isinstance(result, tuple):
+            self.user, data = result
+            return data
+        return result
 
 
 class NyaaTorrentList(list, List[NyaaTorrent]):
@@ -165,6 +163,7 @@ class NyaaTorrentList(list, List[NyaaTorrent]):
         return new
 
     def filter_ids(self, *ids: int):
+        ids = set(ids)
         return type(self)(torrent for torrent in self if torrent.id not in ids)
 
     @property
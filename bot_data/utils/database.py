@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import aiosqlite
+
+from .metrics import Metrics
+from .migrations import hot_queries, migrations, run_migrations
+from ..const import db_pragmas, db_reader_count, db_reader_pragmas, db_statement_cache_size, slow_query_threshold
+
+logger = logging.getLogger(__name__)
+
+Parameters = Optional[Union[Iterable[Any], Dict[str, Any]]]
+
+read_query_regex = re.compile(r"^\s*(SELECT|EXPLAIN)\b", flags=re.IGNORECASE)
+whitespace_regex = re.compile(r"\s+")
+
+
+class QueryStats:
+    __slots__ = ("count", "errors", "total", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, duration: float, error: bool = False):
+        self.count += 1
+        self.errors += error
+        self.total += duration
+        self.maximum = max(self.maximum, duration)
+
+
+class Query:
+    """A pending query. Like :mod:`aiosqlite`, it can either be awaited or used as an async context manager, in which case the cursor is closed on
+    exit."""
+
+    __slots__ = ("database", "method", "sql", "parameters", "connection", "result")
+
+    def __init__(self, database: "Database", method: str, sql: str, parameters: Parameters = None):
+        self.database = database
+        self.method = method
+        self.sql = sql
+        self.parameters = parameters
+        self.connection: Optional[aiosqlite.Connection] = None
+        self.result = None
+
+    def __await__(self):
+        return self.run().__await__()
+
+    async def run(self):
+        reader = self.method in ("execute", "execute_fetchall") and read_query_regex.match(self.sql) is not None
+        self.connection = self.database.acquire_reader() if reader else self.database.writer
+        args = (self.sql,) if self.parameters is None else (self.sql, self.parameters)
+        start = time.perf_counter()
+        error = False
+        try:
+            self.result = await getattr(self.connection, self.method)(*args)
+        except Exception:
+            error = True
+            raise
+        finally:
+            if reader:
+                self.database.release_reader(self.connection)
+            self.database.record(self, time.perf_counter() - start, error)
+        return self.result
+
+    async def __aenter__(self):
+        return await self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if isinstance(self.result, aiosqlite.Cursor):
+            await self.result.close()
+
+
+class Database:
+    """Wraps one writer connection and a small pool of read-only connections to the same WAL database.
+
+    Statements starting with ``SELECT`` go to the least busy reader, everything else goes to the writer, so long scans no longer queue behind
+    (or in front of) the writes made on every message. The API mirrors :class:`aiosqlite.Connection`, so cogs keep using
+    ``async with bot.conn.execute(...) as cursor``."""
+
+    def __init__(self, path: str, reader_count: int = db_reader_count, metrics: Optional[Metrics] = None):
+        self.path = path
+        self.reader_count = reader_count if path != ":memory:" else 0
+        self.writer: Optional[aiosqlite.Connection] = None
+        self.readers: List[aiosqlite.Connection] = []
+        self.reader_load: Dict[aiosqlite.Connection, int] = {}
+        self.stats: Dict[str, QueryStats] = {}
+        self.slow_queries_logged = set()
+        self.applied_migrations: Optional[Set[int]] = None
+        self.migration_lock = asyncio.Lock()
+        self.metrics = metrics
+
+    async def connect(self) -> "Database":
+        self.writer = await aiosqlite.connect(self.path, isolation_level=None, cached_statements=db_statement_cache_size)
+        for pragma, value in db_pragmas.items():
+            async with self.writer.execute(f"PRAGMA {pragma}={value}"):
+                pass
+        for _ in range(self.reader_count):
+            reader = await aiosqlite.connect(f"file:{self.path}?mode=ro", uri=True, isolation_level=None,
+                                             cached_statements=db_statement_cache_size)
+            for pragma, value in db_reader_pragmas.items():
+                async with reader.execute(f"PRAGMA {pragma}={value}"):
+                    pass
+            self.readers.append(reader)
+            self.reader_load[reader] = 0
+        logger.info("Opened database %s with %s read connections", self.path, len(self.readers))
+        return self
+
+    def is_alive(self) -> bool:
+        return self.writer is not None and self.writer.is_alive()
+
+    async def close(self):
+        await asyncio.gather(*(reader.close() for reader in self.readers))
+        self.readers.clear()
+        self.reader_load.clear()
+        if self.writer is not None:
+            await self.writer.close()
+
+    def acquire_reader(self) -> aiosqlite.Connection:
+        if not self.readers:
+            return self.writer
+        reader = min(self.readers, key=self.reader_load.__getitem__)
+        self.reader_load[reader] += 1
+        return reader
+
+    def release_reader(self, reader: aiosqlite.Connection):
+        if reader in self.reader_load:
+            self.reader_load[reader] -= 1
+
+    def record(self, query: Query, duration: float, error: bool):
+        key = whitespace_regex.sub(" ", query.sql).strip()
+        if key not in self.stats:
+            self.stats[key] = QueryStats()
+        self.stats[key].add(duration, error)
+        if self.metrics is not None:
+            self.metrics.observe("query", key, duration, error)
+        if duration >= slow_query_threshold and query.method == "execute" and key not in self.slow_queries_logged:
+            self.slow_queries_logged.add(key)
+            asyncio.ensure_future(self.log_slow_query(query, key, duration))
+
+    async def explain(self, sql: str, parameters: Parameters = None) -> List[str]:
+        connection = self.writer if read_query_regex.match(sql) is None or not self.readers else self.readers[0]
+        args = ("EXPLAIN QUERY PLAN " + sql,) if parameters is None else ("EXPLAIN QUERY PLAN " + sql, parameters)
+        async with connection.execute(*args) as cursor:
+            return [detail for _id, _parent, _unused, detail in await cursor.fetchall()]
+
+    async def log_slow_query(self, query: Query, key: str, duration: float):
+        try:
+            plan = await self.explain(query.sql, query.parameters)
+        except Exception:
+            plan = ["(plan unavailable)"]
+        logger.warning("Slow query (%.3fs): %s\nPlan:\n%s", duration, key, "\n".join(plan))
+
+    async def migrate(self):
+        """Apply any pending schema migrations. This is cheap once every migration has been applied, so cogs call it after creating their
+        tables."""
+        if self.applied_migrations is not None and len(self.applied_migrations) == len(migrations):
+            return
+        async with self.migration_lock:  # Startup and the cogs can call this at the same time
+            if self.applied_migrations is not None and len(self.applied_migrations) == len(migrations):
+                return
+            # A connection of its own, so that writes made on the writer meanwhile are not part of (and rolled back with) a migration. An
+            # in-memory database only exists on the writer.
+            if self.path == ":memory:":
+                connection = self.writer
+            else:
+                connection = await aiosqlite.connect(self.path, isolation_level=None)
+            try:
+                self.applied_migrations = await run_migrations(connection, self.applied_migrations)
+            finally:
+                if connection is not self.writer:
+                    await connection.close()
+
+    async def explain_hot_queries(self) -> List[Tuple[str, str, List[str]]]:
+        """Return ``(name, sql, plan)`` for every registered hot query."""
+        plans = []
+        for name, (sql, parameters) in hot_queries.items():
+            try:
+                plan = await self.explain(sql, parameters)
+            except Exception as exc:  # Table does not exist yet
+                plan = [f"{type(exc).__name__}: {exc}"]
+            plans.append((name, sql, plan))
+        return plans
+
+    def execute(self, sql: str, parameters: Parameters = None) -> Query:
+        return Query(self, "execute", sql, parameters)
+
+    def executemany(self, sql: str, parameters: Iterable[Iterable[Any]]) -> Query:
+        return Query(self, "executemany", sql, parameters)
+
+    def executescript(self, sql_script: str) -> Query:
+        return Query(self, "executescript", sql_script)
+
+    def execute_insert(self, sql: str, parameters: Parameters = None) -> Query:
+        return Query(self, "execute_insert", sql, parameters)
+
+    def execute_fetchall(self, sql: str, parameters: Parameters = None) -> Query:
+        return Query(self, "execute_fetchall", sql, parameters)
+
+    async def commit(self):
+        await self.writer.commit()
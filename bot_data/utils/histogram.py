@@ -0,0 +1,58 @@
+import bisect
+import math
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+default_buckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Counts observations (usually durations in seconds) into fixed buckets, like a Prometheus histogram. Each bucket counts the observations
+    that are at most its bound and above the previous bound, and the last one counts everything above the largest bound."""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: Sequence[float] = default_buckets):
+        self.bounds = tuple(bounds)
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """The upper bound of the bucket holding the given percentile (the largest observation for the last bucket)."""
+        if not self.count:
+            return None
+        target = math.ceil(self.count * percentile / 100) or 1
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self) -> Iterator[Tuple[float, int]]:
+        """``(bound, observations at most bound)`` for every bucket, ending with ``(inf, count)``."""
+        seen = 0
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            seen += count
+            yield bound, seen
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} count={self.count} sum={self.sum:.6f} max={self.max:.6f}>"
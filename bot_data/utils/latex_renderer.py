@@ -0,0 +1,214 @@
+import asyncio
+import collections
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from .data.exceptions import DiscordDataException
+from ..const import latex_cache_bytes, latex_dpi, latex_fontsize, latex_max_bytes, latex_timeout, latex_workers
+
+logger = logging.getLogger(__name__)
+
+worker_path = os.path.abspath(os.path.join(__file__, "..", "..", "latex_worker.py"))
+
+
+class LatexRenderError(DiscordDataException):
+    exception_name = "Error Rendering LaTeX"
+
+
+class LatexParseError(LatexRenderError):
+    exception_name = "Error Parsing Text"
+
+    def __init__(self, message: str):
+        super().__init__(message + ". (Hint, you may need to separate backslashes `\\` with braces, such as `${\\beta}...$`.)")
+
+
+class LatexRenderTimeout(LatexRenderError):
+    exception_name = "Render Timed Out"
+
+    def __init__(self, timeout: float):
+        super().__init__(f"The expression took longer than {timeout:g} seconds to render.")
+
+
+class LatexTooLarge(LatexRenderError):
+    exception_name = "Render Too Large"
+
+    def __init__(self, size: int, max_size: int):
+        super().__init__(f"The rendered image is {size} bytes, which is over the limit of {max_size} bytes. Try a smaller expression.")
+
+
+class LatexWorker:
+    """One ``latex_worker.py`` process. It handles a single request at a time."""
+
+    __slots__ = ("process",)
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+
+    @classmethod
+    async def start(cls) -> "LatexWorker":
+        process = await asyncio.create_subprocess_exec(sys.executable, "-I", worker_path, stdin=asyncio.subprocess.PIPE,
+                                                        stdout=asyncio.subprocess.PIPE)
+        worker = cls(process)
+        if not await process.stdout.readline():
+            await process.wait()
+            raise LatexRenderError(f"The renderer exited with code {process.returncode} while starting.")
+        logger.debug("Started LaTeX worker %s", process.pid)
+        return worker
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def request(self, expr: str, fontsize: int, dpi: int, max_bytes: int) -> Tuple[dict, bytes]:
+        request = {"expr": expr, "fontsize": fontsize, "dpi": dpi, "max_bytes": max_bytes}
+        self.process.stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+        await self.process.stdin.drain()
+        header = await self.process.stdout.readline()
+        if not header:
+            self.kill()
+            raise LatexRenderError("The renderer stopped unexpectedly.")
+        response = json.loads(header)
+        png = await self.process.stdout.readexactly(response["size"]) if response["ok"] else b""
+        return response, png
+
+    def kill(self):
+        if self.alive:
+            self.process.kill()
+        asyncio.ensure_future(self.process.wait())
+
+
+class LatexRenderer:
+    """Renders LaTeX in a pool of warm ``latex_worker.py`` processes, so matplotlib never runs on the event loop.
+
+    Renders are cached by a hash of ``(expression, fontsize, dpi)``, evicting the least recently used images once the cache holds more than
+    ``cache_bytes``. Identical requests that arrive while a render is running share its result. A worker that exceeds ``timeout`` is killed and
+    replaced on the next request."""
+
+    def __init__(self, size: int = latex_workers, timeout: float = latex_timeout, max_bytes: int = latex_max_bytes,
+                 cache_bytes: int = latex_cache_bytes):
+        self.size = size
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.cache_bytes = cache_bytes
+        self.cache: Dict[str, bytes] = collections.OrderedDict()
+        self.cached_bytes = 0
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.workers: Set[LatexWorker] = set()
+        self.idle: "asyncio.Queue[LatexWorker]" = asyncio.Queue()
+        self.starting = 0
+        self.stats: Dict[str, float] = collections.Counter()
+
+    @staticmethod
+    def key(expr: str, fontsize: int, dpi: int) -> str:
+        return hashlib.sha256(json.dumps([expr, fontsize, dpi]).encode("utf-8")).hexdigest()
+
+    async def start(self):
+        """Start every worker now instead of on first use."""
+        while len(self.workers) + self.starting < self.size:
+            self.idle.put_nowait(await self.spawn())
+
+    async def spawn(self) -> LatexWorker:
+        self.starting += 1
+        try:
+            worker = await LatexWorker.start()
+        finally:
+            self.starting -= 1
+        self.workers.add(worker)
+        return worker
+
+    async def acquire(self) -> LatexWorker:
+        while True:
+            if self.idle.empty() and len(self.workers) + self.starting < self.size:
+                return await self.spawn()
+            try:
+                # Wake up periodically in case a worker was killed while we were waiting, leaving room to spawn another.
+                worker = await asyncio.wait_for(self.idle.get(), 1)
+            except asyncio.TimeoutError:
+                continue
+            if worker.alive:
+                return worker
+            self.workers.discard(worker)
+
+    def release(self, worker: LatexWorker):
+        if worker.alive:
+            self.idle.put_nowait(worker)
+        else:
+            self.workers.discard(worker)
+
+    async def close(self):
+        for worker in self.workers:
+            worker.kill()
+        self.workers.clear()
+        self.idle = asyncio.Queue()
+
+    def cache_get(self, key: str) -> Optional[bytes]:
+        png = self.cache.get(key)
+        if png is not None:
+            self.cache.move_to_end(key)
+        return png
+
+    def cache_set(self, key: str, png: bytes):
+        self.cache[key] = png
+        self.cached_bytes += len(png)
+        while self.cached_bytes > self.cache_bytes and len(self.cache) > 1:
+            _key, evicted = self.cache.popitem(last=False)
+            self.cached_bytes -= len(evicted)
+
+    async def render(self, expr: str, fontsize: int = latex_fontsize, dpi: int = latex_dpi) -> io.BytesIO:
+        key = self.key(expr, fontsize, dpi)
+        png = self.cache_get(key)
+        if png is not None:
+            self.stats["cache_hits"] += 1
+            return io.BytesIO(png)
+        if key in self.pending:
+            self.stats["coalesced"] += 1
+            return io.BytesIO(await asyncio.shield(self.pending[key]))
+        future = self.pending[key] = asyncio.get_event_loop().create_future()
+        try:
+            png = await self.render_uncached(expr, fontsize, dpi)
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # Nobody else may be waiting, so mark the exception as retrieved.
+            raise
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        else:
+            future.set_result(png)
+            self.cache_set(key, png)
+        finally:
+            del self.pending[key]
+        return io.BytesIO(png)
+
+    async def render_uncached(self, expr: str, fontsize: int, dpi: int) -> bytes:
+        worker = await self.acquire()
+        start = time.perf_counter()
+        try:
+            response, png = await asyncio.wait_for(worker.request(expr, fontsize, dpi, self.max_bytes), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            logger.warning("LaTeX render timed out after %s seconds, killing worker %s", self.timeout, worker.process.pid)
+            worker.kill()
+            raise LatexRenderTimeout(self.timeout) from None
+        except BaseException:  # Includes cancellation
+            worker.kill()  # The pipe may be left in the middle of a response.
+            raise
+        finally:
+            self.release(worker)
+        self.stats["renders"] += 1
+        self.stats["render_time"] += time.perf_counter() - start
+        if response["ok"]:
+            return png
+        self.stats["errors"] += 1
+        if response["error"] == "parse":
+            raise LatexParseError(response["message"])
+        elif response["error"] == "size":
+            raise LatexTooLarge(int(response["message"]), self.max_bytes)
+        else:
+            raise LatexRenderError(response["message"])
@@ -1,11 +1,15 @@
+import collections
+import copy
 import inspect
 import logging
-from typing import Union
+import logging.handlers
+import queue
+from typing import Dict, Optional, Union
 
 import discord.ext.commands
 
 from .data.nyaasi import NyaaTitleParseWarningLevel
-from .get_message import get_context_variables
+from .log_context import get_log_context
 
 logger = logging.getLogger(__name__)
 
@@ -15,14 +19,91 @@ class UserChannelFormatter(logging.Formatter):
         super().__init__("[%(asctime)s] {%(module)s::%(funcName)s} {%(user)s::%(channel)s::%(command)s::%(messageid)s} (%(levelname)s): %(message)s")
 
     def format(self, record: logging.LogRecord) -> str:
-        user, channel, command, message, _ = get_context_variables(break_on_message=False)
-        record.user = user
-        record.channel = channel
-        record.command = command
-        record.messageid = message.id if message else None
+        if not hasattr(record, "user"):  # Already filled in by BoundedQueueHandler
+            context = get_log_context()
+            record.user = context.user
+            record.channel = context.channel
+            record.command = context.command
+            record.messageid = context.message.id if context.message else None
         return super().format(record)
 
 
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to a :class:`logging.handlers.QueueListener` thread so that formatting and disk I/O stay off the event loop.
+
+    Everything that depends on the calling thread (the message arguments, the exception text and the log context) is resolved on a copy of the
+    record before it is queued, since other handlers (such as Sentry's) still read the original. The caller never waits for the queue: when it is
+    full, an incoming DEBUG record is discarded, INFO evicts the oldest queued DEBUG record, and WARNING and above evict the oldest DEBUG or
+    otherwise INFO record. A record that cannot make room is dropped. Dropped records are counted per level in :attr:`dropped`."""
+
+    exception_formatter = logging.Formatter()
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped: Dict[str, int] = collections.Counter()
+
+    @property
+    def dropped_total(self) -> int:
+        return sum(self.dropped.values())
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if not hasattr(record, "user"):
+            context = get_log_context()
+            record.user = context.user
+            record.channel = context.channel
+            record.command = context.command
+            record.messageid = context.message.id if context.message else None
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self.exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def evict_record(self, max_level: int) -> Optional[str]:
+        """Remove the oldest queued record with a level of at most ``max_level``, and return its level name."""
+        log_queue: queue.Queue = self.queue
+        with log_queue.mutex:
+            for item in log_queue.queue:
+                if item is not None and item.levelno <= max_level:  # None is the sentinel that QueueListener.stop() enqueues
+                    log_queue.queue.remove(item)
+                    log_queue.not_full.notify()
+                    return item.levelname
+        return None
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if record.levelno > logging.DEBUG:
+            evicted = self.evict_record(logging.DEBUG)
+            if evicted is None and record.levelno >= logging.WARNING:
+                evicted = self.evict_record(logging.INFO)
+            if evicted is not None:
+                self.dropped[evicted] += 1
+                try:
+                    self.queue.put_nowait(record)
+                    return
+                except queue.Full:  # Filled again by another thread
+                    pass
+        self.dropped[record.levelname] += 1
+
+
+class LoggerNameFilter(logging.Filter):
+    """Only lets records from the given logger through (or, if ``exclude`` is set, everything except them). Used to route records coming out of
+    the shared log queue to the right file."""
+
+    def __init__(self, name: str, exclude: bool = False):
+        super().__init__(name)
+        self.exclude = exclude
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return (record.name == self.name) != self.exclude
+
+
 class CommandFormatter(logging.Formatter):
     def __init__(self):
         super().__init__("[%(asctime)s] {%(user)s::%(url)s} [%(command)s]: %(argument)s")
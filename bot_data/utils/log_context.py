@@ -0,0 +1,52 @@
+import contextvars
+from typing import Any, Optional, Tuple
+
+import discord.ext.commands
+
+
+class LogContext:
+    """The user, channel, command and message that the current task is working on. It is set once when a command is invoked or an event is
+    dispatched, and is inherited by every task created from there, so the log formatter and the error handlers can read it in O(1)."""
+
+    __slots__ = ("user", "channel", "command", "message", "ctx")
+
+    def __init__(self, user=None, channel=None, command: Optional[discord.ext.commands.Command] = None, message: Optional[discord.Message] = None,
+                 ctx: Optional[discord.ext.commands.Context] = None):
+        self.user = user
+        self.channel = channel
+        self.command = command
+        self.message = message
+        self.ctx = ctx
+
+    def as_tuple(self) -> Tuple[Any, Any, Optional[discord.ext.commands.Command], Optional[discord.Message], Optional[discord.ext.commands.Context]]:
+        return self.user, self.channel, self.command, self.message, self.ctx
+
+    @classmethod
+    def from_context(cls, ctx: discord.ext.commands.Context) -> "LogContext":
+        return cls(ctx.author, ctx.channel, ctx.command, ctx.message, ctx)
+
+    @classmethod
+    def from_event_args(cls, args: Tuple[Any, ...]) -> Optional["LogContext"]:
+        for arg in args:
+            if isinstance(arg, discord.ext.commands.Context):
+                return cls.from_context(arg)
+            elif isinstance(arg, discord.Message):
+                return cls(arg.author, arg.channel, message=arg)
+        for arg in args:
+            if isinstance(arg, (discord.Member, discord.User)):
+                return cls(user=arg)
+            elif isinstance(arg, discord.abc.Messageable):
+                return cls(channel=arg)
+        return None
+
+
+empty_log_context = LogContext()
+log_context: "contextvars.ContextVar[LogContext]" = contextvars.ContextVar("log_context", default=empty_log_context)
+
+
+def set_log_context(ctx: discord.ext.commands.Context) -> contextvars.Token:
+    return log_context.set(LogContext.from_context(ctx))
+
+
+def get_log_context() -> LogContext:
+    return log_context.get()
@@ -0,0 +1,104 @@
+import logging
+import os
+import re
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Matches the header that UserChannelFormatter writes at the start of every record. Lines that do not match belong to the record above them
+# (tracebacks and multi-line messages).
+record_header = re.compile(r"^\[(?P<asctime>[^\]]*)\] \{(?P<module>[^:}]*)::(?P<function>[^}]*)\} "
+                           r"\{(?P<user>.*?)::(?P<channel>.*?)::(?P<command>.*?)::(?P<messageid>[0-9]+|None)\} "
+                           r"\((?P<level>DEBUG|INFO|WARNING|ERROR|CRITICAL)\): ")
+
+
+class LogFilter:
+    """Server-side filter for :func:`tail_log`. ``level`` is a minimum level, ``module`` and ``message_id`` must match exactly, and ``user``,
+    ``channel`` and ``command`` are case-insensitive substring matches against what the formatter wrote (e.g. ``Name#1234`` for users)."""
+
+    __slots__ = ("level", "module", "user", "channel", "command", "message_id")
+
+    keys = ("level", "module", "user", "channel", "command", "message_id")
+
+    def __init__(self, level: Optional[str] = None, module: Optional[str] = None, user: Optional[str] = None, channel: Optional[str] = None,
+                 command: Optional[str] = None, message_id: Optional[str] = None):
+        self.level = logging.getLevelName(level.upper()) if level else None
+        if self.level is not None and not isinstance(self.level, int):
+            raise ValueError(f"Invalid log level: {level}")
+        self.module = module
+        self.user = user.lower() if user else None
+        self.channel = channel.lower() if channel else None
+        self.command = command.lower() if command else None
+        self.message_id = message_id
+
+    def __bool__(self):
+        return any(getattr(self, key) is not None for key in self.keys)
+
+    def __str__(self):
+        return ", ".join(f"{key}={getattr(self, key)}" for key in self.keys if getattr(self, key) is not None) or "None"
+
+    def matches(self, match: "re.Match") -> bool:
+        if self.level is not None and logging.getLevelName(match.group("level")) < self.level:
+            return False
+        if self.module is not None and match.group("module") != self.module:
+            return False
+        if self.message_id is not None and match.group("messageid") != self.message_id:
+            return False
+        if self.user is not None and self.user not in match.group("user").lower():
+            return False
+        if self.channel is not None and self.channel not in match.group("channel").lower():
+            return False
+        if self.command is not None and self.command not in match.group("command").lower():
+            return False
+        return True
+
+
+def reverse_lines(path: str, block_size: int = 64 * 1024) -> Iterator[str]:
+    """Yield the lines of a file from last to first, reading it backwards in ``block_size`` chunks. Only the blocks that are actually consumed
+    are read, so taking the last few lines of a large file is cheap. Splitting happens on bytes, so multi-byte characters are never cut."""
+    with open(path, "rb") as file:
+        position = file.seek(0, os.SEEK_END)
+        remainder = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            file.seek(position)
+            lines = (file.read(read_size) + remainder).split(b"\n")
+            remainder = lines[0]  # May be the tail of a line that started in an earlier block
+            for line in reversed(lines[1:]):
+                yield line.decode("utf-8", errors="replace").rstrip("\r")
+        yield remainder.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def log_files(path: str) -> List[str]:
+    """The log file followed by its rotated backups (``bot.log``, ``bot.log.1``, ``bot.log.2``, ...), newest first."""
+    files = [path] if os.path.exists(path) else []
+    number = 1
+    while os.path.exists(f"{path}.{number}"):
+        files.append(f"{path}.{number}")
+        number += 1
+    return files
+
+
+def tail_log(path: str, number: int, log_filter: Optional[LogFilter] = None, block_size: int = 64 * 1024) -> List[str]:
+    """Return the last ``number`` records that match ``log_filter``, oldest first, each as a (possibly multi-line) string. The cost depends on
+    how far back the matching records are, not on the size of the log. This does blocking I/O, so run it in an executor."""
+    records = []
+    for file in log_files(path):
+        continuation = []
+        for line in reverse_lines(file, block_size):
+            match = record_header.match(line)
+            if match is None:
+                if line or continuation:
+                    continuation.append(line)
+                continue
+            if log_filter is None or log_filter.matches(match):
+                continuation.append(line)
+                continuation.reverse()
+                records.append("\n".join(continuation))
+                if len(records) >= number:
+                    records.reverse()
+                    return records
+            continuation = []
+    records.reverse()
+    return records
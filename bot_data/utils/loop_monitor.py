@@ -0,0 +1,133 @@
+import asyncio
+import collections
+import logging
+import sys
+import threading
+import time
+import traceback
+import types
+from typing import Deque, Optional
+
+from .histogram import Histogram
+from .log_context import LogContext, empty_log_context, log_context
+from ..const import loop_monitor_interval, loop_monitor_threshold
+
+logger = logging.getLogger(__name__)
+
+_handle_run = asyncio.events.Handle._run.__code__
+
+
+class Stall:
+    __slots__ = ("started", "duration", "context", "stack")
+
+    def __init__(self, started: float, duration: float, context: str, stack: Optional[str]):
+        self.started = started
+        self.duration = duration
+        self.context = context
+        self.stack = stack
+
+
+class LoopMonitor:
+    """Measures how late the event loop wakes up from a sleep of ``interval`` seconds, which is how long other callbacks kept it busy, and
+    keeps the lag in a :class:`Histogram`.
+
+    A watchdog thread checks when the loop last woke up. Once it has been blocked for ``threshold`` seconds, the watchdog captures the loop
+    thread's stack and the command or event that the blocking callback is running for (its :class:`LogContext`), and logs them while the loop
+    is still blocked. The full duration is filled in and logged once the loop wakes up."""
+
+    def __init__(self, interval: float = loop_monitor_interval, threshold: float = loop_monitor_threshold, stall_history: int = 20):
+        self.interval = interval
+        self.threshold = threshold
+        self.histogram = Histogram()
+        self.stalls: Deque[Stall] = collections.deque(maxlen=stall_history)
+        self.current_stall: Optional[Stall] = None
+        self.heartbeat = time.monotonic()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread_id: Optional[int] = None
+        self.task: Optional[asyncio.Task] = None
+        self.thread: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start(self):
+        """Start sampling. Must be called from the loop's thread."""
+        if self.running:
+            return
+        self.loop = asyncio.get_event_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        # A new event for every watchdog, since the one that a quick stop() and start() replaced might not have woken up to see its own.
+        self.stopping = threading.Event()
+        self.task = asyncio.ensure_future(self.sample())
+        self.thread = threading.Thread(target=self.watch, args=(self.stopping,), name="LoopMonitor", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        self.thread = None
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def sample(self):
+        while True:
+            start = self.loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, self.loop.time() - start - self.interval)
+            self.heartbeat = time.monotonic()
+            self.histogram.observe(lag)
+            stall = self.current_stall
+            if stall is not None:
+                self.current_stall = None
+                stall.duration = max(stall.duration, lag)
+                logger.warning("The event loop was blocked for %.3f seconds by %s", stall.duration, stall.context)
+            elif lag >= self.threshold:  # Ended before the watchdog looked
+                self.stalls.append(Stall(time.time() - lag, lag, "an unknown callback", None))
+                logger.warning("The event loop was blocked for %.3f seconds (too briefly to capture the stack)", lag)
+
+    def watch(self, stopping: threading.Event):
+        while not stopping.wait(self.threshold / 4):
+            blocked = time.monotonic() - self.heartbeat - self.interval
+            if blocked < self.threshold or self.current_stall is not None:
+                continue
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:  # The loop's thread has exited
+                return
+            try:
+                stack = "".join(traceback.format_stack(frame))
+                context = self.describe(frame)
+            finally:
+                del frame
+            self.current_stall = stall = Stall(time.time() - blocked, blocked, context, stack)
+            self.stalls.append(stall)
+            logger.warning("The event loop has been blocked for %.3f seconds by %s, at:\n%s", blocked, context, stack)
+
+    @staticmethod
+    def describe(frame: Optional[types.FrameType]) -> str:
+        """Describe the callback that ``frame`` (a frame of the loop's thread) is running: the coroutine of its task, and the command or event
+        from the log context it was scheduled with."""
+        while frame is not None and frame.f_code is not _handle_run:
+            frame = frame.f_back
+        if frame is None:
+            return "code outside of a callback"
+        handle = frame.f_locals.get("self")
+        callback = getattr(handle, "_callback", None)
+        task = getattr(callback, "__self__", None)
+        if isinstance(task, asyncio.Future) and hasattr(task, "get_coro"):
+            description = f"task {getattr(task.get_coro(), '__qualname__', task)}"
+        else:
+            description = f"callback {getattr(callback, '__qualname__', callback)}"
+        context: LogContext = handle._context.get(log_context, empty_log_context) if hasattr(handle, "_context") else empty_log_context
+        if context.command is not None:
+            description += f" for command {context.command.qualified_name}"
+        elif context.message is not None:
+            description += f" for message {context.message.id}"
+        if context.user is not None:
+            description += f" (user {context.user}"
+            description += f", channel {context.channel})" if context.channel is not None else ")"
+        elif context.channel is not None:
+            description += f" (channel {context.channel})"
+        return description
@@ -0,0 +1,177 @@
+import functools
+import logging
+import math
+import time
+import weakref
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+import aiohttp.web
+import discord.ext.tasks
+
+from .histogram import Histogram
+from ..const import metrics_prefix
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+kinds = {
+    "command": "Time spent running commands, from their checks to the end of the callback.",
+    "event": "Time spent in event listeners, and in each part of the on_message and reaction handlers.",
+    "loop": "Time spent in each iteration of a background loop.",
+    "query": "Time spent running database queries.",
+}
+
+
+class Metric:
+    __slots__ = ("histogram", "errors")
+
+    def __init__(self):
+        self.histogram = Histogram()
+        self.errors = 0
+
+    @property
+    def count(self) -> int:
+        return self.histogram.count
+
+    @property
+    def total(self) -> float:
+        return self.histogram.sum
+
+
+class Timer:
+    """Times the body of a ``with`` block (which may await) and counts it as an error if it raises an :class:`Exception`."""
+
+    __slots__ = ("metrics", "kind", "name", "start")
+
+    def __init__(self, metrics: "Metrics", kind: str, name: str):
+        self.metrics = metrics
+        self.kind = kind
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.metrics.observe(self.kind, self.name, time.perf_counter() - self.start, exc_type is not None and issubclass(exc_type, Exception))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return "+Inf" if value == math.inf else repr(float(value))
+
+
+class Metrics:
+    """Counts calls, errors and durations of every command, event listener, background loop iteration and database query by name.
+
+    The numbers are shown by ``bot_stats perf``, and can be served in the Prometheus text format on a local port with :meth:`serve`, together
+    with other histograms (such as the event loop lag) that are added to :attr:`histograms`."""
+
+    def __init__(self, prefix: str = metrics_prefix):
+        self.prefix = prefix
+        self.stats: Dict[str, Dict[str, Metric]] = {kind: {} for kind in kinds}
+        self.histograms: Dict[str, Tuple[str, Histogram]] = {}
+        self.loops: "weakref.WeakSet[discord.ext.tasks.Loop]" = weakref.WeakSet()
+        self.runner: Optional[aiohttp.web.AppRunner] = None
+
+    def observe(self, kind: str, name: str, duration: float, error: bool = False):
+        metrics = self.stats[kind]
+        if name not in metrics:
+            metrics[name] = Metric()
+        metric = metrics[name]
+        metric.histogram.observe(duration)
+        metric.errors += error
+
+    def reset(self):
+        """Forget the timings of every kind, and the observations of the other histograms."""
+        for metrics in self.stats.values():
+            metrics.clear()
+        for _, histogram in self.histograms.values():
+            histogram.reset()
+
+    def time(self, kind: str, name: str) -> Timer:
+        return Timer(self, kind, name)
+
+    async def timed(self, kind: str, name: str, awaitable: Awaitable[_T]) -> _T:
+        with self.time(kind, name):
+            return await awaitable
+
+    def instrument_loops(self, obj: Any):
+        """Time every iteration of the :class:`discord.ext.tasks.Loop` objects defined on ``obj``'s class, such as a cog."""
+        for cls in type(obj).__mro__:
+            for attr, value in list(vars(cls).items()):
+                if isinstance(value, discord.ext.tasks.Loop):
+                    self.instrument_loop(getattr(obj, attr), f"{type(obj).__name__}.{attr}")
+
+    def instrument_loop(self, loop: discord.ext.tasks.Loop, name: str):
+        if loop in self.loops:
+            return
+        self.loops.add(loop)
+        coro = loop.coro
+
+        @functools.wraps(coro)
+        async def timed(*args, **kwargs):
+            with self.time("loop", name):
+                return await coro(*args, **kwargs)
+
+        loop.coro = timed
+
+    def top(self, kind: str, limit: Optional[int] = None) -> List[Tuple[str, Metric]]:
+        """The metrics of a kind, the ones that took the most time in total first."""
+        return sorted(self.stats[kind].items(), key=lambda item: item[1].total, reverse=True)[:limit]
+
+    def exposition(self) -> str:
+        return "".join(self.exposition_lines())
+
+    def exposition_lines(self) -> Iterator[str]:
+        for kind, description in kinds.items():
+            name = f"{self.prefix}_{kind}_duration_seconds"
+            yield f"# HELP {name} {description}\n# TYPE {name} histogram\n"
+            for label, metric in self.stats[kind].items():
+                yield from self.histogram_lines(name, metric.histogram, f'name="{_escape(label)}"')
+            name = f"{self.prefix}_{kind}_errors_total"
+            yield f"# HELP {name} Number of {kind}s that raised an exception.\n# TYPE {name} counter\n"
+            for label, metric in self.stats[kind].items():
+                yield f'{name}{{name="{_escape(label)}"}} {metric.errors}\n'
+        for suffix, (description, histogram) in self.histograms.items():
+            name = f"{self.prefix}_{suffix}"
+            yield f"# HELP {name} {description}\n# TYPE {name} histogram\n"
+            yield from self.histogram_lines(name, histogram)
+
+    @staticmethod
+    def histogram_lines(name: str, histogram: Histogram, labels: str = "") -> Iterator[str]:
+        separator = "," if labels else ""
+        for bound, count in histogram.cumulative():
+            yield f'{name}_bucket{{{labels}{separator}le="{_number(bound)}"}} {count}\n'
+        labels = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{labels} {_number(histogram.sum)}\n"
+        yield f"{name}_count{labels} {histogram.count}\n"
+
+    async def handle_metrics(self, request: aiohttp.web.Request) -> aiohttp.web.Response:
+        return aiohttp.web.Response(body=self.exposition().encode("utf-8"), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    async def serve(self, host: str, port: int):
+        """Serve the metrics on ``http://host:port/metrics`` until :meth:`stop_serving` is called."""
+        if self.runner is not None:
+            return
+        app = aiohttp.web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        runner = aiohttp.web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await aiohttp.web.TCPSite(runner, host, port).start()
+        except OSError:
+            await runner.cleanup()
+            raise
+        self.runner = runner
+        logger.info("Serving metrics on http://%s:%s/metrics", host, port)
+
+    async def stop_serving(self):
+        if self.runner is not None:
+            runner, self.runner = self.runner, None
+            await runner.cleanup()
@@ -0,0 +1,109 @@
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+
+class Migration:
+    """A numbered schema change. A migration is deferred (and retried on the next :func:`run_migrations` call) until all of the tables it
+    requires exist, since most tables are created lazily by the cog that owns them."""
+
+    __slots__ = ("version", "name", "requires", "statements")
+
+    def __init__(self, version: int, name: str, requires: Tuple[str, ...], *statements: str):
+        self.version = version
+        self.name = name
+        self.requires = requires
+        self.statements = statements
+
+    def __repr__(self):
+        return f"<Migration {self.version}: {self.name}>"
+
+
+migrations: List[Migration] = [
+    Migration(1, "Index STAT by guild and author", ("STAT",),
+              """CREATE INDEX IF NOT EXISTS STAT_GUILD_AUTHOR ON STAT(GUILD_ID, AUTHOR_ID, NUM)"""),
+    Migration(2, "Index MANGADEX by guild and manga", ("MANGADEX",),
+              """CREATE INDEX IF NOT EXISTS MANGADEX_GUILD ON MANGADEX(GUILD_ID)""",
+              """CREATE INDEX IF NOT EXISTS MANGADEX_MANGA ON MANGADEX(MANGA_ID)""",
+              """CREATE INDEX IF NOT EXISTS MANGADEX_COMPLETED ON MANGADEX(COMPLETED, MANGA_ID)"""),
+    Migration(3, "Index RedditMod subscriptions by guild", ("MODQUEUE", "MODLOG", "UNMODERATED"),
+              """CREATE INDEX IF NOT EXISTS MODQUEUE_GUILD ON MODQUEUE(GUILD_ID, SUBREDDIT_NAME)""",
+              """CREATE INDEX IF NOT EXISTS MODLOG_GUILD ON MODLOG(GUILD_ID, SUBREDDIT_NAME)""",
+              """CREATE INDEX IF NOT EXISTS UNMODERATED_GUILD ON UNMODERATED(GUILD_ID, SUBREDDIT_NAME)"""),
+    Migration(4, "Index BULK_JOBS by status", ("BULK_JOBS",),
+              """CREATE INDEX IF NOT EXISTS BULK_JOBS_STATUS ON BULK_JOBS(STATUS)"""),
+]
+
+# Queries that run on every message or every update check. ``%db explain`` shows their plans so that a regression to a full scan is visible.
+hot_queries: Dict[str, Tuple[str, list]] = {
+    "stat_row": ("""SELECT NUM FROM STAT WHERE GUILD_ID==? AND CHANNEL_ID==? AND AUTHOR_ID==?""", [0, 0, 0]),
+    "stat_channel": ("""SELECT SUM(NUM) FROM STAT WHERE GUILD_ID==? AND CHANNEL_ID==?""", [0, 0]),
+    "stat_author": ("""SELECT SUM(NUM) FROM STAT WHERE GUILD_ID==? AND AUTHOR_ID==?""", [0, 0]),
+    "stat_guild_channels": ("""SELECT CHANNEL_ID, SUM(NUM) FROM STAT WHERE GUILD_ID==? GROUP BY CHANNEL_ID""", [0]),
+    "stat_guild_authors": ("""SELECT AUTHOR_ID, SUM(NUM) FROM STAT WHERE GUILD_ID==? GROUP BY AUTHOR_ID""", [0]),
+    "option_upsert": ("""INSERT INTO OPTIONS(GUILD_ID, OPTION_NAME, ENABLED) VALUES (?, ?, ?) ON CONFLICT(GUILD_ID, OPTION_NAME) 
+        DO UPDATE SET ENABLED=excluded.ENABLED""", [0, "", True]),  # PokestarBot.set_option, SQLite reports no plan steps for an INSERT
+    "mangadex_guild": ("""SELECT MANGA_ID, NAME, USER_ID FROM MANGADEX WHERE GUILD_ID==?""", [0]),
+    "mangadex_manga": ("""SELECT USER_ID, GUILD_ID FROM MANGADEX WHERE MANGA_ID==?""", [0]),
+    "mangadex_incomplete": ("""SELECT DISTINCT MANGA_ID, NAME FROM MANGADEX WHERE COMPLETED==?""", [False]),
+    "modqueue_item": ("""SELECT REPORTS FROM MODQUEUE_ITEMS WHERE FULLNAME==? LIMIT 1""", [""]),
+    "unmoderated_item": ("""SELECT * FROM UNMODERATED_ITEMS WHERE FULLNAME==? LIMIT 1""", [""]),
+    "modlog_item": ("""SELECT * FROM MODLOG_ITEMS WHERE ID==? LIMIT 1""", [""]),
+    "modqueue_guild": ("""SELECT DISTINCT SUBREDDIT_NAME FROM MODQUEUE WHERE GUILD_ID==?""", [0]),
+    "unmoderated_guild": ("""SELECT DISTINCT SUBREDDIT_NAME FROM UNMODERATED WHERE GUILD_ID==?""", [0]),
+}
+
+
+async def get_tables(connection: aiosqlite.Connection) -> Set[str]:
+    async with connection.execute("""SELECT NAME FROM SQLITE_MASTER WHERE TYPE=='table'""") as cursor:
+        return {name.upper() async for name, in cursor}
+
+
+async def run_migrations(connection: aiosqlite.Connection, applied: Optional[Set[int]] = None) -> Set[int]:
+    """Apply every pending migration whose tables exist, then run ``ANALYZE`` if anything changed. Returns the set of applied versions.
+
+    Each migration is a transaction on ``connection``, so it should not be shared with other coroutines (their writes would be committed or
+    rolled back with the migration)."""
+    async with connection.execute(
+            """CREATE TABLE IF NOT EXISTS SCHEMA_MIGRATIONS(VERSION INTEGER PRIMARY KEY, NAME TEXT NOT NULL,
+            APPLIED_AT TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"""):
+        pass
+    if applied is None:
+        async with connection.execute("""SELECT VERSION FROM SCHEMA_MIGRATIONS""") as cursor:
+            applied = {version async for version, in cursor}
+    pending = [migration for migration in migrations if migration.version not in applied]
+    if not pending:
+        return applied
+    tables = await get_tables(connection)
+    changed = False
+    for migration in sorted(pending, key=lambda item: item.version):
+        if not tables.issuperset(migration.requires):
+            logger.debug("Deferring %r until %s exist", migration, ", ".join(migration.requires))
+            continue
+        logger.info("Applying %r", migration)
+        try:
+            async with connection.execute("""BEGIN IMMEDIATE"""):
+                pass
+            for statement in migration.statements:
+                async with connection.execute(statement):
+                    pass
+            async with connection.execute("""INSERT INTO SCHEMA_MIGRATIONS(VERSION, NAME) VALUES (?, ?)""", [migration.version, migration.name]):
+                pass
+        except Exception:
+            if connection.in_transaction:
+                async with connection.execute("""ROLLBACK"""):
+                    pass
+            logger.exception("Unable to apply %r", migration)
+            raise
+        else:
+            async with connection.execute("""COMMIT"""):
+                pass
+            applied.add(migration.version)
+            changed = True
+    if changed:
+        async with connection.execute("""ANALYZE"""):
+            pass
+    return applied
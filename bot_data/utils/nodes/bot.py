@@ -60,7 +60,10 @@ class CommandNode(anytree.NodeMixin):
 class GroupNode(CommandNode):
     @property
     def children(self):
-        return self.make_child_nodes()
+        # anytree.RenderTree looks at the children of every node more than once, so they are only built and sorted once.
+        if self._child_nodes is None:
+            self._child_nodes = self.make_child_nodes()
+        return self._child_nodes
 
     @property
     def commands(self) -> Tuple[discord.ext.commands.Command, ...]:
@@ -70,6 +73,7 @@ class GroupNode(CommandNode):
                  commands: Optional[Iterable[discord.ext.commands.Command]] = None):
         super().__init__(command, parent)
         self._commands = tuple(commands or ())
+        self._child_nodes: Optional[List[Union[CommandNode, "GroupNode"]]] = None
 
     def make_child_nodes(self) -> List[Union[CommandNode, "GroupNode"]]:
         return sorted([CommandNode(command, parent=self) if not isinstance(command, discord.ext.commands.Group) else GroupNode(command, parent=self)
@@ -87,7 +91,7 @@ class GroupNode(CommandNode):
     def __repr__(self):
         return super().__repr__() + self.subcommands()
 
-    __slots__ = ("_commands",)
+    __slots__ = ("_commands", "_child_nodes")
 
 
 class CogNode(GroupNode):
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from typing import Dict, NamedTuple, Optional, TYPE_CHECKING, Union
+
+from .data.nyaasi import NyaaCategory, NyaaCategoryTypes, NyaaFilter, NyaaTorrentList, search_string_builder
+
+if TYPE_CHECKING:
+    from ..bot import PokestarBot
+
+logger = logging.getLogger(__name__)
+
+
+class NyaaFeedKey(NamedTuple):
+    query: str
+    user: Optional[str]
+    category: str
+    search_filter: int
+
+    @classmethod
+    def make(cls, query: str, user: Optional[str] = None, category: Union[str, NyaaCategory, NyaaCategoryTypes] = NyaaCategoryTypes.Anime_ENG,
+             search_filter: NyaaFilter = NyaaFilter.NONE) -> "NyaaFeedKey":
+        """Normalize a search, so that searches Nyaa treats the same (differently cased or spaced queries) share a key."""
+        if not isinstance(category, str):
+            category = f"{category.major}_{category.minor}"
+        return cls(" ".join(query.split()).casefold(), user.strip() if user else None, category, int(search_filter))
+
+    @property
+    def url(self) -> str:
+        return search_string_builder(query=self.query, user=self.user, category=self.category, search_filter=NyaaFilter(self.search_filter))
+
+
+class NyaaFeeds:
+    """Fetches Nyaa.si RSS searches, downloading and parsing each unique search at most once per update cycle.
+
+    Subscriptions for the same anime share a :class:`NyaaFeedKey`, so the cost of a cycle depends on the number of unique searches instead of the
+    number of subscriptions. Concurrent requests for a search that is already being fetched wait for that fetch. The feed is parsed in the
+    bot's executor, and the returned list is shared between every caller in the cycle, so callers must filter it into a new list instead of
+    modifying it. :meth:`new_cycle` forgets the previous cycle's feeds.
+
+Commands should fetch with ``cached=False``: the cache only lives as long as a cycle, and while the update loop is stopped nothing would
+expire it."""
+
+    def __init__(self, bot: "PokestarBot"):
+        self.bot = bot
+        self.feeds: Dict[NyaaFeedKey, "asyncio.Future[NyaaTorrentList]"] = {}
+        self.fetches = 0
+        self.requests = 0
+
+    def new_cycle(self):
+        self.feeds.clear()
+
+    async def _fetch(self, key: NyaaFeedKey) -> NyaaTorrentList:
+        await self.bot.load_session()
+        async with self.bot.session.get(key.url) as request:
+            request.raise_for_status()
+            text = await request.text()
+        return await self.bot.execute(NyaaTorrentList.from_rss_feed, text)
+
+    async def fetch(self, key: NyaaFeedKey, cached: bool = True) -> NyaaTorrentList:
+        self.requests += 1
+        if not cached:
+            self.fetches += 1
+            return await self._fetch(key)
+        if key not in self.feeds:
+            self.fetches += 1
+            self.feeds[key] = future = asyncio.ensure_future(self._fetch(key))
+            future.add_done_callback(lambda done: self._discard_failed(key, done))
+        return await asyncio.shield(self.feeds[key])
+
+    def _discard_failed(self, key: NyaaFeedKey, future: "asyncio.Future[NyaaTorrentList]"):
+        # Failed fetches are retried by the next caller instead of failing every subscription in the cycle.
+        if (future.cancelled() or future.exception() is not None) and self.feeds.get(key) is future:
+            del self.feeds[key]
+
+    async def search(self, query: str, user: Optional[str] = None,
+                     category: Union[str, NyaaCategory, NyaaCategoryTypes] = NyaaCategoryTypes.Anime_ENG,
+                     search_filter: NyaaFilter = NyaaFilter.NONE, cached: bool = True) -> NyaaTorrentList:
+        return await self.fetch(NyaaFeedKey.make(query, user=user, category=category, search_filter=search_filter), cached=cached)
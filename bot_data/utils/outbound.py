@@ -0,0 +1,168 @@
+import asyncio
+import collections
+import logging
+import time
+from typing import Deque, Dict, List, Optional, Sequence, TYPE_CHECKING
+
+import discord
+from discord.http import Route
+
+if TYPE_CHECKING:
+    from ..bot import PokestarBot
+
+logger = logging.getLogger(__name__)
+
+
+class OutboundItem:
+    """One embed (and optionally the content above it) waiting to be sent."""
+
+    __slots__ = ("content", "embed", "size", "future", "queued_at", "packable")
+
+    def __init__(self, content: Optional[str], embed: Optional[discord.Embed], future: "asyncio.Future[discord.Message]"):
+        self.content = content
+        self.embed = embed
+        self.size = len(embed) if embed is not None else 0
+        self.future = future
+        self.queued_at = time.perf_counter()
+        self.packable = content is None and embed is not None
+
+
+class OutboundDispatcher:
+    """Sends messages through one queue per channel, so that every cog sending to a channel shares its order and its rate limit.
+
+    Each channel's queue is drained by its own worker, which sends one message at a time, in order, while other channels send concurrently.
+    Consecutive embeds without content are packed into one message, up to :attr:`max_embeds` embeds and :attr:`max_size` characters in total
+    (Discord's limits), so the embeds of one call, or of calls from different cogs that queued up behind a send, take fewer requests. Each
+    caller gets back the messages that hold its embeds.
+
+    Messages with content are sent on their own through ``send()``. If Discord ignores the ``embeds`` of a packed message (it then has nothing
+    to send), packing is turned off. A packed message that is rejected for another reason is sent again one embed per message, so only the
+    caller with the bad embed gets the error."""
+
+    max_embeds = 10
+    max_size = 6000
+
+    def __init__(self, bot: "PokestarBot", pack: bool = True, latency_samples: int = 1000):
+        self.bot = bot
+        self.pack = pack
+        self.queues: Dict[int, Deque[OutboundItem]] = {}
+        self.workers: Dict[int, "asyncio.Task[None]"] = {}
+        self.latencies: Deque[float] = collections.deque(maxlen=latency_samples)
+        self.stats: Dict[str, int] = collections.Counter()
+        self.max_depth = 0
+
+    @staticmethod
+    def of(destination: discord.abc.Messageable) -> Optional["OutboundDispatcher"]:
+        """The dispatcher of the bot behind a :class:`Context`, or None for other destinations."""
+        return getattr(getattr(destination, "bot", None), "outbound", None)
+
+    @property
+    def depth(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    async def send(self, destination: discord.abc.Messageable, content: Optional[str] = None, *,
+                   embeds: Sequence[discord.Embed] = ()) -> List[discord.Message]:
+        """Queue ``content`` followed by ``embeds`` and wait for them to be sent. Returns the created messages, in order (none if there is nothing
+        to send)."""
+        if not embeds and not content:  # Discord rejects an empty message
+            return []
+        channel = await destination._get_channel()
+        loop = asyncio.get_event_loop()
+        queue = self.queues.setdefault(channel.id, collections.deque())
+        items = [OutboundItem(content if num == 0 else None, embed, loop.create_future()) for num, embed in enumerate(embeds)]
+        if not items:
+            items.append(OutboundItem(content, None, loop.create_future()))
+        queue.extend(items)
+        self.max_depth = max(self.max_depth, len(queue))
+        if channel.id not in self.workers:
+            self.workers[channel.id] = asyncio.ensure_future(self.run(channel))
+        results = await asyncio.gather(*(item.future for item in items), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return list(dict.fromkeys(results))
+
+    async def send_all(self, destination: discord.abc.Messageable, embeds: Sequence[discord.Embed]) -> List[discord.Message]:
+        return await self.send(destination, embeds=embeds)
+
+    async def run(self, channel: discord.abc.Messageable):
+        queue = self.queues[channel.id]
+        try:
+            while queue:
+                batch = self.take(queue)
+                if batch:
+                    await self.send_batch(channel, queue, batch)
+        finally:
+            del self.workers[channel.id]
+            del self.queues[channel.id]
+            for item in queue:  # Only left when the worker was cancelled
+                item.future.cancel()
+
+    def take(self, queue: Deque[OutboundItem]) -> List[OutboundItem]:
+        """Take the next message's worth of items: the first item, then the embeds without content that fit after it."""
+        batch = []
+        size = 0
+        while queue:
+            item = queue[0]
+            if item.future.done():  # The caller was cancelled
+                queue.popleft()
+                continue
+            if batch and (not self.pack or not batch[0].packable or not item.packable or len(batch) >= self.max_embeds
+                          or size + item.size > self.max_size):
+                break
+            batch.append(queue.popleft())
+            size += item.size
+        return batch
+
+    async def send_batch(self, channel: discord.abc.Messageable, queue: Deque[OutboundItem], batch: List[OutboundItem]):
+        embeds = [item.embed for item in batch if item.embed is not None]
+        self.stats["requests"] += 1
+        try:
+            if len(embeds) > 1:
+                message = await self.send_packed(channel, embeds)
+            else:
+                message = await channel.send(batch[0].content, embed=embeds[0] if embeds else None)
+        except discord.HTTPException as exc:
+            if len(embeds) > 1 and exc.status == 400:
+                if exc.code == 50006:  # Cannot send an empty message
+                    logger.warning("Discord ignored the embeds of a message, sending one embed per message from now on")
+                    self.pack = False
+                for item in batch:
+                    item.packable = False
+                queue.extendleft(reversed(batch))
+                return
+            self.fail(batch, exc)
+        except asyncio.CancelledError:
+            for item in batch:
+                item.future.cancel()
+            raise
+        except Exception as exc:
+            self.fail(batch, exc)
+        else:
+            now = time.perf_counter()
+            self.stats["messages"] += 1
+            self.stats["embeds"] += len(embeds)
+            for item in batch:
+                self.latencies.append(now - item.queued_at)
+                if not item.future.done():
+                    item.future.set_result(message)
+
+    def fail(self, batch: List[OutboundItem], exc: BaseException):
+        self.stats["errors"] += 1
+        for item in batch:
+            if not item.future.done():
+                item.future.set_exception(exc)
+
+    async def send_packed(self, channel: discord.abc.Messageable, embeds: List[discord.Embed]) -> discord.Message:
+        # discord.py's send() only takes one embed, so the request is made directly.
+        state = channel._state
+        payload = {"embeds": [embed.to_dict() for embed in embeds]}
+        route = Route("POST", "/channels/{channel_id}/messages", channel_id=channel.id)
+        data = await self.bot.send_with_counter(state.http.request, route, json=payload)
+        return state.create_message(channel=channel, data=data)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
@@ -5,6 +5,75 @@ from typing import Callable, List, Optional, Pattern, Tuple, Union
 import discord.ext.commands
 
 from .break_into_groups import break_into_groups
+from .outbound import OutboundDispatcher
+
+
+class EmbedPaginator:
+    """Splits fields over as many embeds as needed to stay under Discord's limits of 6000 characters and 25 fields per embed.
+
+    The size and field count of the current page are kept as running totals, so a field is checked against the limits without copying or
+    measuring the page. The embed passed in is only copied once a field is added to it, and continuation pages copy its private attributes
+    (footer, author, thumbnail and so on)."""
+
+    __slots__ = ("orig_embed", "embed", "embeds", "size", "count", "owned", "timestamp", "title", "color", "description", "do_before_send")
+
+    max_size = 6000
+    max_fields = 25
+    inherited_slots = tuple(slot for slot in discord.Embed.__slots__ if slot.startswith("_") and slot != "_fields")
+
+    def __init__(self, embed: discord.Embed, *, timestamp: Union[datetime.datetime, type(discord.Embed.Empty)] = discord.Embed.Empty,
+                 title: Union[str, type(discord.Embed.Empty)] = discord.Embed.Empty,
+                 color: Union[discord.Color, type(discord.Embed.Empty)] = discord.Embed.Empty,
+                 description: Union[str, type(discord.Embed.Empty)] = discord.Embed.Empty,
+                 do_before_send: Callable[[discord.Embed], discord.Embed] = None):
+        self.orig_embed = self.embed = embed
+        self.embeds: List[discord.Embed] = []
+        self.size = len(embed)
+        self.count = len(getattr(embed, "_fields", ()))
+        self.owned = False
+        self.timestamp = timestamp
+        self.title = title
+        self.color = color
+        self.description = description
+        self.do_before_send = do_before_send
+
+    def new_page(self):
+        """Finish the current page and start a continuation page."""
+        embed = self.do_before_send(self.embed) if self.do_before_send else self.embed
+        self.embeds.append(embed)
+        embed = discord.Embed(timestamp=self.timestamp, title=self.title, color=self.color, description=self.description)
+        for item in self.inherited_slots:
+            if hasattr(self.orig_embed, item):
+                setattr(embed, item, getattr(self.orig_embed, item))
+        self.embed = embed
+        self.size = len(embed)
+        self.count = 0
+        self.owned = True
+
+    def add_field(self, name: str, value: str, inline: bool = True):
+        """Add a field, starting a new page first if it would not fit on the current one."""
+        if self.size + len(name) + len(value) > self.max_size or self.count >= self.max_fields:
+            self.new_page()
+        elif not self.owned:
+            self.embed = copy.deepcopy(self.embed)
+            self.owned = True
+        self.embed.add_field(name=name, value=value, inline=inline)
+        self.size += len(name) + len(value)
+        self.count += 1
+
+    def finish(self) -> List[discord.Embed]:
+        if self.count > 0:
+            self.embeds.append(self.do_before_send(self.embed) if self.do_before_send else self.embed)
+            self.count = 0
+        return self.embeds
+
+
+async def send_all(ctx: discord.abc.Messageable, embeds: List[discord.Embed]) -> List[discord.Message]:
+    """Send the embeds through the bot's :class:`OutboundDispatcher` when ``ctx`` is a Context, otherwise one message per embed."""
+    dispatcher = OutboundDispatcher.of(ctx)
+    if dispatcher is not None:
+        return await dispatcher.send_all(ctx, embeds)
+    return [await ctx.send(embed=embed_to_send) for embed_to_send in embeds]
 
 
 async def generate_embeds(embed: discord.Embed, groups: List[str], *, first_name: str = "\u200b",
@@ -17,22 +86,18 @@ async def generate_embeds(embed: discord.Embed, groups: List[str], *, first_name
     orig_embed = embed
     if not title:
         title = embed.title + " (continued)"
-    first_loop = (6000 - len(embed)) // 1024
-    first_groups = groups[:first_loop]
-    groups = groups[first_loop:]
-    embed.add_field(name=first_name, value=first_groups.pop(0), inline=False)
-    for group in first_groups:
+    first_groups = groups[:(6000 - len(embed)) // 1024]
+    embed.add_field(name=first_name, value=first_groups[0], inline=False)
+    for group in first_groups[1:]:
         embed.add_field(name="\u200b", value=group, inline=False)
     embed = do_before_send(embed) if do_before_send else embed
     embeds.append(embed)
-    while groups:
-        batch = groups[:4]
-        groups = groups[4:]
+    for start in range(len(first_groups), len(groups), 4):
         embed = discord.Embed(timestamp=timestamp, title=title, color=color, description=description)
-        for item in filter(lambda slot: slot.startswith("_") and slot != "_fields", discord.Embed.__slots__):
+        for item in EmbedPaginator.inherited_slots:
             if hasattr(orig_embed, item):
                 setattr(embed, item, getattr(orig_embed, item))
-        for group in batch:
+        for group in groups[start:start + 4]:
             embed.add_field(name="\u200b", value=group, inline=False)
         embed = do_before_send(embed) if do_before_send else embed
         embeds.append(embed)
@@ -46,9 +111,8 @@ async def send_embeds(ctx: discord.abc.Messageable, embed: discord.Embed, groups
                       color: Union[discord.Color, type(discord.Embed.Empty)] = discord.Embed.Empty,
                       description: Union[str, type(discord.Embed.Empty)] = discord.Embed.Empty,
                       do_before_send: Callable[[discord.Embed], discord.Embed] = None):
-    return [await ctx.send(embed=embed_to_send) for embed_to_send in
-            await generate_embeds(embed, groups, first_name=first_name, timestamp=timestamp, title=title, color=color, description=description,
-                                  do_before_send=do_before_send)]
+    return await send_all(ctx, await generate_embeds(embed, groups, first_name=first_name, timestamp=timestamp, title=title, color=color,
+                                                     description=description, do_before_send=do_before_send))
 
 
 async def generate_embeds_fields(embed: discord.Embed, fields: List[Union[Tuple[str, str], str]], *, field_name: str = "\u200b",
@@ -59,63 +123,23 @@ async def generate_embeds_fields(embed: discord.Embed, fields: List[Union[Tuple[
                                  heading: str = "", template: str = "", ending: str = "", line_template: str = "",
                                  do_before_send: Callable[[discord.Embed], discord.Embed] = None, inline_fields: bool = True,
                                  regex: Optional[Pattern[str]] = None):
-    embeds = []
-    orig_embed = embed
-    for num, field in enumerate(fields.copy()):
-        if not isinstance(field, tuple):
-            fields[num] = (field_name, field)
     if not title:
         title = embed.title + " (continued)"
     if not color:
         color = embed.colour
-    while fields:
-        data = fields.pop(0)
-        key, value = data
+    pages = EmbedPaginator(embed, timestamp=timestamp, title=title, color=color, description=description, do_before_send=do_before_send)
+    for field in fields:
+        key, value = field if isinstance(field, tuple) else (field_name, field)
         key = str(key)
-        value = str(value)
-        groups = await break_into_groups(value, heading=heading, template=template, ending=ending, line_template=line_template, regex=regex)
-        inline = inline_fields
-        if len(groups) > 1:
-            inline = False
-        if (len(embed.fields) + len(groups)) <= 25:
-            for num, value in enumerate(groups, start=1):
-                new_embed = copy.deepcopy(embed)
-                new_embed.add_field(name=key if num <= 1 else "\u200b", value=value, inline=inline)
-                if len(new_embed) > 6000:
-                    embed = do_before_send(embed) if do_before_send else embed
-                    embeds.append(embed)
-                    embed = discord.Embed(timestamp=timestamp, title=title, color=color, description=description)
-                    for item in filter(lambda slot: slot.startswith("_") and slot != "_fields", discord.Embed.__slots__):
-                        if hasattr(orig_embed, item):
-                            setattr(embed, item, getattr(orig_embed, item))
-                    embed.add_field(name=key if num <= 1 else "\u200b", value=value, inline=inline)
-                else:
-                    embed = new_embed
-        else:
-            if len(embed.fields) > 0:
-                embed = do_before_send(embed) if do_before_send else embed
-                embeds.append(embed)
-                embed = discord.Embed(timestamp=timestamp, title=title, color=color, description=description)
-                for item in filter(lambda slot: slot.startswith("_") and slot != "_fields", discord.Embed.__slots__):
-                    if hasattr(orig_embed, item):
-                        setattr(embed, item, getattr(orig_embed, item))
-            for num, value in enumerate(groups, start=1):
-                new_embed = copy.deepcopy(embed)
-                new_embed.add_field(name=key if num <= 1 else "\u200b", value=value, inline=inline)
-                if len(new_embed) > 6000 or len(new_embed.fields) > 25:
-                    embed = do_before_send(embed) if do_before_send else embed
-                    embeds.append(embed)
-                    embed = discord.Embed(timestamp=timestamp, title=title, color=color, description=description)
-                    for item in filter(lambda slot: slot.startswith("_") and slot != "_fields", discord.Embed.__slots__):
-                        if hasattr(orig_embed, item):
-                            setattr(embed, item, getattr(orig_embed, item))
-                    embed.add_field(name=key if num <= 1 else "\u200b", value=value, inline=inline)
-                else:
-                    embed = new_embed
-    if len(embed.fields) > 0:
-        embed = do_before_send(embed) if do_before_send else embed
-        embeds.append(embed)
-    return embeds
+        groups = await break_into_groups(str(value), heading=heading, template=template, ending=ending, line_template=line_template,
+                                         regex=regex)
+        inline = inline_fields if len(groups) <= 1 else False
+        if pages.count + len(groups) > pages.max_fields and pages.count > 0:
+            # A field that does not fit on the current page is started on a new one instead of being split over both.
+            pages.new_page()
+        for num, value in enumerate(groups, start=1):
+            pages.add_field(key if num <= 1 else "\u200b", value, inline)
+    return pages.finish()
 
 
 async def send_embeds_fields(ctx: discord.abc.Messageable, embed: discord.Embed, fields: List[Union[Tuple[str, str], str]], *,
@@ -127,7 +151,7 @@ async def send_embeds_fields(ctx: discord.abc.Messageable, embed: discord.Embed,
                              heading: str = "", template: str = "", ending: str = "", line_template: str = "",
                              do_before_send: Callable[[discord.Embed], discord.Embed] = None, inline_fields: bool = True,
                              regex: Optional[Pattern[str]] = None):
-    return [await ctx.send(embed=embed_to_send) for embed_to_send in
-            await generate_embeds_fields(embed, fields, field_name=field_name, timestamp=timestamp, title=title, color=color, description=description,
-                                         heading=heading, template=template, ending=ending, line_template=line_template,
-                                         do_before_send=do_before_send, inline_fields=inline_fields, regex=regex)]
+    return await send_all(ctx, await generate_embeds_fields(embed, fields, field_name=field_name, timestamp=timestamp, title=title, color=color,
+                                                            description=description, heading=heading, template=template, ending=ending,
+                                                            line_template=line_template, do_before_send=do_before_send,
+                                                            inline_fields=inline_fields, regex=regex))
@@ -0,0 +1,197 @@
+import datetime
+import enum
+import gzip
+import importlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from .data import BaseDataClass
+from .data.byte import Byte
+from ..const import snapshot_path
+
+logger = logging.getLogger(__name__)
+
+data_package = __name__.rpartition(".")[0] + ".data"
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _type_name(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _load_type(name: str) -> type:
+    # Only the data classes can be named by a snapshot, so a tampered file cannot import anything else.
+    module, sep, qualname = name.partition(":")
+    if not sep or not (module == data_package or module.startswith(data_package + ".")):
+        raise SnapshotError(f"{name!r} is not a data class")
+    obj = importlib.import_module(module)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    if not isinstance(obj, type):
+        raise SnapshotError(f"{name!r} is not a class")
+    return obj
+
+
+def encode(value: Any) -> Any:
+    """Turn a parsed object into JSON types. Data classes are stored as their :attr:`BaseDataClass.dict`, and lists, enums, datetimes and
+    :class:`Byte` objects are tagged with a ``$`` key so that :func:`decode` can rebuild them."""
+    if value is None or isinstance(value, (str, bool, int, float)) and not isinstance(value, enum.Enum):
+        return value
+    elif isinstance(value, BaseDataClass):
+        return {"$c": _type_name(type(value)), "f": {name: encode(item) for name, item in value.dict.items()}}
+    elif isinstance(value, list) and type(value) is not list:
+        attrs = {name: getattr(value, name, None) for name in getattr(type(value), "__slots__", ()) if not name.startswith("_")}
+        return {"$l": _type_name(type(value)), "i": [encode(item) for item in value],
+                "a": {name: item for name, item in attrs.items() if isinstance(item, (str, bool, int, float))}}
+    elif isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    elif isinstance(value, enum.Enum):
+        return {"$e": _type_name(type(value)), "n": value.name}
+    elif isinstance(value, datetime.datetime):
+        return {"$t": value.isoformat()}
+    elif isinstance(value, Byte):
+        return {"$b": value.value}
+    elif isinstance(value, dict):
+        return {"$d": {str(key): encode(item) for key, item in value.items()}}
+    raise SnapshotError(f"Cannot store a {type(value).__name__!r} in a snapshot")
+
+
+def decode(data: Any) -> Any:
+    if isinstance(data, list):
+        return [decode(item) for item in data]
+    elif not isinstance(data, dict):
+        return data
+    elif "$c" in data:
+        cls = _load_type(data["$c"])
+        if not issubclass(cls, BaseDataClass):
+            raise SnapshotError(f"{data['$c']!r} is not a data class")
+        self = cls.__new__(cls)  # Skips __init__, since some classes (such as NyaaCategory) take positional arguments
+        for name, item in data["f"].items():
+            setattr(self, name, decode(item))
+        return self
+    elif "$l" in data:
+        cls = _load_type(data["$l"])
+        if not issubclass(cls, list):
+            raise SnapshotError(f"{data['$l']!r} is not a list")
+        self = cls(decode(item) for item in data["i"])
+        for name, item in data["a"].items():
+            setattr(self, name, item)
+        return self
+    elif "$e" in data:
+        cls = _load_type(data["$e"])
+        if not issubclass(cls, enum.Enum):
+            raise SnapshotError(f"{data['$e']!r} is not an enum")
+        return cls[data["n"]]
+    elif "$t" in data:
+        return datetime.datetime.fromisoformat(data["$t"])
+    elif "$b" in data:
+        return Byte(data["$b"])
+    elif "$d" in data:
+        return {key: decode(item) for key, item in data["$d"].items()}
+    raise SnapshotError(f"Unknown snapshot value with keys {sorted(data)!r}")
+
+
+class Snapshot(NamedTuple):
+    marker: Optional[str]
+    value: Any
+    timestamp: float
+    data: Any  # The encoded value, which is what gets written
+
+
+class SnapshotStore:
+    """Keeps the last parsed object of every update source, such as a :class:`GuyamoeManga` or a :class:`NyaaTorrentList`, together with a
+    ``marker`` (a hash of the response, or the newest ID in it) so that a poll can tell that nothing changed since the last one. MangaDex values
+    are deltas: only the chapters newer than the previously seen one are built, so the value is the chapters found by the last check that had
+    any, not the manga's full chapter list (and None if there has not been one yet).
+
+    The store is written to ``path`` as gzipped JSON with a :attr:`VERSION`. A file written by a different version, or one that cannot be read,
+    is discarded, so the first poll after a restart falls back to the database like it did before the store existed. Values are encoded when
+    they are :meth:`put`, so :meth:`save` can run in the executor while the update loop keeps changing its objects."""
+
+    VERSION = 1
+
+    def __init__(self, path: str = snapshot_path):
+        self.path = path
+        self.entries: Dict[str, Snapshot] = {}
+        self.loaded = False
+        self.dirty = False
+        self.size = 0
+        self.load_seconds = 0.0
+        self.save_seconds = 0.0
+        self.saved_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        start = time.perf_counter()
+        self.loaded = True
+        try:
+            with open(self.path, "rb") as file:
+                raw = file.read()
+        except FileNotFoundError:
+            return
+        self.size = len(raw)
+        try:
+            contents = json.loads(gzip.decompress(raw))
+            if contents.get("version") != self.VERSION:
+                logger.info("Discarding update snapshots from version %s (expected %s)", contents.get("version"), self.VERSION)
+                return
+            entries = {key: Snapshot(marker, decode(data), timestamp, data) for key, (marker, timestamp, data) in contents["entries"].items()}
+        except Exception:
+            logger.warning("Discarding unreadable update snapshots in %s", self.path, exc_info=True)
+            return
+        self.entries.update({key: value for key, value in entries.items() if key not in self.entries})
+        self.saved_at = contents.get("saved")
+        self.load_seconds = time.perf_counter() - start
+        logger.info("Loaded %s update snapshots (%s bytes) in %.3f seconds", len(entries), self.size, self.load_seconds)
+
+    def get(self, key: str) -> Optional[Snapshot]:
+        return self.entries.get(key)
+
+    def unchanged(self, key: str, marker: str) -> bool:
+        """Whether the source was last seen with the same ``marker``. Counted as a hit or a miss."""
+        snapshot = self.entries.get(key)
+        if snapshot is not None and snapshot.marker == marker:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def put(self, key: str, marker: Optional[str], value: Any):
+        self.entries[key] = Snapshot(marker, value, time.time(), encode(value))
+        self.dirty = True
+
+    def discard(self, key: str):
+        if self.entries.pop(key, None) is not None:
+            self.dirty = True
+
+    def checkpoint(self) -> Dict[str, Snapshot]:
+        """A copy of the entries to :meth:`save` from another thread. Entries put after this mark the store as dirty again."""
+        self.dirty = False
+        return dict(self.entries)
+
+    def save(self, entries: Optional[Dict[str, Snapshot]] = None):
+        start = time.perf_counter()
+        if entries is None:
+            entries = self.checkpoint()
+        saved = time.time()
+        contents = {"version": self.VERSION, "saved": saved,
+                    "entries": {key: [snapshot.marker, snapshot.timestamp, snapshot.data] for key, snapshot in entries.items()}}
+        raw = gzip.compress(json.dumps(contents, separators=(",", ":")).encode("utf-8"))
+        temp_path = self.path + ".part"
+        try:
+            with open(temp_path, "wb") as file:
+                file.write(raw)
+            os.replace(temp_path, self.path)
+        except OSError:
+            self.dirty = True
+            raise
+        self.size = len(raw)
+        self.saved_at = saved
+        self.save_seconds = time.perf_counter() - start
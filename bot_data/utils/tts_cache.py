@@ -0,0 +1,162 @@
+import asyncio
+import collections
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import platform
+import time
+from typing import Dict, Optional
+
+import pyttsx3
+
+from .data.exceptions import DiscordDataException
+from ..const import tts_bitrate, tts_cache_bytes, tts_cache_dir, tts_voice, tts_workers
+
+logger = logging.getLogger(__name__)
+
+# What Discord sends, so that the files can be passed through without being encoded again
+sample_rate = 48000
+channels = 2
+
+
+class TTSError(DiscordDataException):
+    exception_name = "Text-to-Speech Failed"
+
+
+class TTSCache:
+    """Synthesizes text to Ogg Opus files in ``directory``, named by a hash of ``(voice, text)`` so that repeated phrases are only synthesized
+    once. Files are encoded a single time to Opus at the 48 kHz stereo that Discord sends, so they can be played with
+``FFmpegOpusAudio(path, codec="opus", bitrate=tts_bitrate)``, which passes the packets through.
+
+    At most ``workers`` syntheses run at once (pyttsx3 is not thread-safe, so on macOS it always runs on a single warm engine thread). Files are
+    evicted least recently used first once the cache holds more than ``max_bytes``, skipping any that are still playing. Callers must
+    :meth:`release` every path returned by :meth:`acquire` once playback is done."""
+
+    def __init__(self, directory: str = tts_cache_dir, max_bytes: int = tts_cache_bytes, workers: int = tts_workers, voice: str = tts_voice,
+                 bitrate: int = tts_bitrate):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.voice = voice
+        self.bitrate = bitrate
+        self.use_pyttsx3 = platform.system().lower() == "darwin"
+        if self.use_pyttsx3:
+            self.voice = "pyttsx3"
+            self.engine = None
+            self.engine_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyttsx3")
+            self.engine_executor.submit(self.get_engine)
+        self.semaphore = asyncio.Semaphore(workers)
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.in_use: Dict[str, int] = collections.Counter()
+        self.stats: Dict[str, float] = collections.Counter()
+        os.makedirs(directory, exist_ok=True)
+        self.files: Dict[str, int] = collections.OrderedDict()
+        entries = [entry for entry in os.scandir(directory) if entry.is_file()]
+        for entry in sorted(entries, key=lambda item: item.stat().st_mtime):
+            if entry.name.endswith(".opus"):
+                self.files[entry.path] = entry.stat().st_size
+            else:  # Left over from a synthesis that was interrupted
+                os.remove(entry.path)
+        self.total_bytes = sum(self.files.values())
+
+    def path(self, text: str) -> str:
+        # Files in an older format have other names, so they are evicted instead of played
+        key = hashlib.sha256(json.dumps([self.voice, self.bitrate, sample_rate, channels, text]).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + ".opus")
+
+    async def acquire(self, text: str) -> str:
+        path = self.path(text)
+        self.in_use[path] += 1
+        try:
+            if path in self.files:
+                self.stats["hits"] += 1
+                self.files.move_to_end(path)
+                os.utime(path)  # Keeps the LRU order across restarts
+            elif path in self.pending:
+                self.stats["hits"] += 1
+                await asyncio.shield(self.pending[path])
+            else:
+                self.stats["misses"] += 1
+                future = self.pending[path] = asyncio.get_event_loop().create_future()
+                try:
+                    await self.synthesize(text, path)
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as exc:
+                    future.set_exception(exc)
+                    future.exception()
+                    raise
+                else:
+                    future.set_result(None)
+                finally:
+                    del self.pending[path]
+                self.files[path] = os.path.getsize(path)
+                self.total_bytes += self.files[path]
+                self.evict()
+        except BaseException:
+            self.release(path)
+            raise
+        return path
+
+    def release(self, path: str):
+        self.in_use[path] -= 1
+        if self.in_use[path] <= 0:
+            del self.in_use[path]
+            self.evict()
+
+    def evict(self):
+        for path in list(self.files):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if path in self.in_use:
+                continue
+            self.total_bytes -= self.files.pop(path)
+            self.stats["evictions"] += 1
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def get_engine(self) -> pyttsx3.Engine:
+        if self.engine is None:
+            self.engine = pyttsx3.init()
+        return self.engine
+
+    def pyttsx3_to_file(self, text: str, path: str):
+        engine = self.get_engine()
+        engine.save_to_file(text, path)
+        engine.runAndWait()
+
+    async def run(self, *args: str, stdin: Optional[bytes] = None):
+        process = await asyncio.create_subprocess_exec(*args, stdin=asyncio.subprocess.PIPE if stdin is not None else asyncio.subprocess.DEVNULL,
+                                                       stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+        _stdout, stderr = await process.communicate(stdin)
+        if process.returncode != 0:
+            logger.warning("%s exited with code %s: %s", args[0], process.returncode, stderr.decode("utf-8", errors="replace").strip())
+            raise TTSError(f"`{args[0]}` exited with code {process.returncode}.")
+
+    async def synthesize(self, text: str, path: str):
+        source = path + ".source"
+        partial = path + ".part"
+        async with self.semaphore:
+            start = time.perf_counter()
+            try:
+                if self.use_pyttsx3:
+                    await asyncio.get_event_loop().run_in_executor(self.engine_executor, self.pyttsx3_to_file, text, source)
+                else:
+                    # The text is passed on stdin so that it can never be read as an option.
+                    await self.run("espeak-ng", "-v", self.voice, "-w", source, "--stdin", stdin=text.encode("utf-8"))
+                await self.run("ffmpeg", "-y", "-loglevel", "error", "-i", source, "-c:a", "libopus", "-b:a", f"{self.bitrate}k", "-ar", str(sample_rate),
+                               "-ac", str(channels), "-f", "ogg", partial)
+                os.replace(partial, path)
+            finally:
+                for file in (source, partial):
+                    if os.path.exists(file):
+                        os.remove(file)
+            self.stats["synthesis_time"] += time.perf_counter() - start
+
+    def close(self):
+        if self.use_pyttsx3:
+            self.engine_executor.shutdown(wait=False)
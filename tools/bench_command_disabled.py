@@ -0,0 +1,48 @@
+#!/usr/bin/env pipenv run python
+
+import os
+import random
+import string
+import timeit
+import types
+
+os.environ.setdefault("NO_DELETE_LOGFILES", "1")
+
+from bot_data.bot import PokestarBot  # NOQA
+
+
+def legacy_command_disabled(disabled: list, qualified_name: str):
+    for name in disabled:
+        if name.startswith(qualified_name):
+            return True
+    return False
+
+
+def make_command(*names: str):
+    command = None
+    for num in range(len(names)):
+        command = types.SimpleNamespace(qualified_name=" ".join(names[:num + 1]), parent=command)
+    return command
+
+
+def random_name():
+    return "".join(random.choices(string.ascii_lowercase, k=8))
+
+
+def main():
+    random.seed(0)
+    number = 100000
+    print(f"{'Disabled':>8} {'Depth':>5} {'Legacy (us)':>12} {'Current (us)':>13}")
+    for disabled_count in (10, 100, 500, 1000):
+        disabled = [" ".join(random_name() for _ in range(random.randint(1, 3))) for _ in range(disabled_count)]
+        bot = types.SimpleNamespace(disabled_commands={1: set(disabled)})
+        for depth in (1, 3):
+            command = make_command(*(random_name() for _ in range(depth)))
+            ctx = types.SimpleNamespace(guild=types.SimpleNamespace(id=1), command=command)
+            legacy = timeit.timeit(lambda: legacy_command_disabled(disabled, command.qualified_name), number=number)
+            current = timeit.timeit(lambda: PokestarBot.command_disabled(bot, ctx), number=number)
+            print(f"{disabled_count:>8} {depth:>5} {legacy / number * 1e6:>12.3f} {current / number * 1e6:>13.3f}")
+
+
+if __name__ == '__main__':
+    main()
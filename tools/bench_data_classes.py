@@ -0,0 +1,62 @@
+#!/usr/bin/env pipenv run python
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import timeit
+from typing import Dict
+
+os.environ.setdefault("NO_DELETE_LOGFILES", "1")
+
+from bot_data.utils.data.base import compile_classes  # NOQA
+from bot_data.utils.data.mangadex import MangadexChapter  # NOQA
+from bot_data.utils.data.nyaasi import NyaaTorrent  # NOQA
+
+chapter_data = {"id": 1077512, "hash": "0d5a0a2c4b1c1f7c3b0f7e8e3d2c1b0a", "mangaId": 31477, "mangaTitle": "Solo Leveling", "volume": "2",
+                "chapter": "110", "title": "Episode 110", "language": "gb", "groups": [5901], "uploader": 1234, "timestamp": 1600000000,
+                "threadId": 987654, "comments": "15", "views": 25000}
+torrent_data = {"id": "https://nyaa.si/view/1300000", "title": "[SubsPlease] Jujutsu Kaisen - 01 (1080p) [ABCDEF12].mkv", "nyaa_seeders": "512",
+                "nyaa_leechers": "20", "nyaa_downloads": "10000", "nyaa_infohash": "5f4dcc3b5aa765d61d8327deb882cf99", "nyaa_comments": "3",
+                "nyaa_trusted": "Yes", "nyaa_remake": "No", "nyaa_categoryid": "1_2", "nyaa_size": "1.4 GiB",
+                "published_parsed": time.gmtime(1600000000)}
+
+
+def measure(number: int) -> Dict[str, float]:
+    """Objects built per second by each constructor."""
+    results = {}
+    chapter = MangadexChapter.from_api_v2_list(chapter_data)
+    torrent = NyaaTorrent.single_from_rss_feed(torrent_data)
+    other_torrent = NyaaTorrent.single_from_rss_feed(torrent_data)
+    for label, func in (("MangadexChapter.from_api_v2_list", lambda: MangadexChapter.from_api_v2_list(chapter_data)),
+                        ("NyaaTorrent.single_from_rss_feed", lambda: NyaaTorrent.single_from_rss_feed(torrent_data)),
+                        ("MangadexChapter(...)", lambda: MangadexChapter(id=1, title="Title", language="gb", volume=2, num=110)),
+                        ("MangadexChapter.dict", lambda: chapter.dict),
+                        ("NyaaTorrent ==", lambda: torrent == other_torrent)):
+        results[label] = number / min(timeit.repeat(func, number=number, repeat=3))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark building data classes with the generated methods against the generic ones.")
+    parser.add_argument("--number", type=int, default=20000, help="Number of calls per timed run.")
+    parser.add_argument("--json", action="store_true", help="Only print this process's results as JSON.")
+    args = parser.parse_args()
+    if args.json:
+        print(json.dumps(measure(args.number)))
+        return
+    assert compile_classes, "Unset NO_COMPILE_DATA_CLASSES to compare against the generic methods."
+    compiled = measure(args.number)
+    # The methods are generated when the classes are created, so the generic ones are measured in a fresh interpreter.
+    output = subprocess.run([sys.executable, __file__, "--json", "--number", str(args.number)], env={**os.environ, "NO_COMPILE_DATA_CLASSES": "1"},
+                            check=True, stdout=subprocess.PIPE).stdout
+    generic = json.loads(output)
+    print(f"{'Operation':<36} {'Generic (per s)':>16} {'Generated (per s)':>18} {'Speedup':>9}")
+    for label, rate in compiled.items():
+        print(f"{label:<36} {generic[label]:>16,.0f} {rate:>18,.0f} {rate / generic[label]:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
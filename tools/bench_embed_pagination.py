@@ -0,0 +1,218 @@
+#!/usr/bin/env pipenv run python
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import random
+import time
+from typing import List
+
+os.environ.setdefault("NO_DELETE_LOGFILES", "1")
+
+import discord  # NOQA
+
+from bot_data.utils.break_into_groups import break_into_groups  # NOQA
+from bot_data.utils.custom_textwrap import CustomTextWrap  # NOQA
+from bot_data.utils.send_embeds import generate_embeds, generate_embeds_fields  # NOQA
+
+
+async def legacy_break_into_groups(text=None, heading="", template="```python\n", ending="\n```", line_template="", lines=None, regex=None):
+    """break_into_groups before it consumed the lines with an iterator, kept as the reference."""
+    if text is None:
+        text = ""
+    lines = [line.replace("```", "``​`") for line in (text.splitlines(False) if not lines else lines)]
+    return_lines = []
+    msg = "{}{}".format(heading, template)
+    allocation = 1024 - len(template + ending)
+    while lines:
+        line = lines.pop(0)
+        if len(line) > allocation:
+            width = (allocation - len(msg) - len(line_template) - 2)
+            if width < 5:
+                width = 5
+            textwrap = CustomTextWrap(regex=regex, width=width, break_on_hyphens=False, replace_whitespace=False)
+            extra_lines = textwrap.wrap(line)
+            lines = extra_lines + lines
+            continue
+        newmsg = msg + (line if not line_template else line_template.format(line)) + "\n"
+        if len(newmsg.rstrip()) > allocation:
+            return_lines.append(msg.rstrip() + ending)
+            msg = template + (line if not line_template else line_template.format(line)) + "\n"
+        else:
+            msg = newmsg
+    if msg:
+        return_lines.append(msg.rstrip() + ending)
+    return return_lines
+
+
+def legacy_continuation(orig_embed, timestamp, title, color, description):
+    embed = discord.Embed(timestamp=timestamp, title=title, color=color, description=description)
+    for item in filter(lambda slot: slot.startswith("_") and slot != "_fields", discord.Embed.__slots__):
+        if hasattr(orig_embed, item):
+            setattr(embed, item, getattr(orig_embed, item))
+    return embed
+
+
+async def legacy_generate_embeds(embed, groups, *, first_name="\u200b", timestamp=discord.Embed.Empty, title=discord.Embed.Empty,
+                                 color=discord.Embed.Empty, description=discord.Embed.Empty, do_before_send=None):
+    embeds = []
+    orig_embed = embed
+    if not title:
+        title = embed.title + " (continued)"
+    first_loop = (6000 - len(embed)) // 1024
+    first_groups = groups[:first_loop]
+    groups = groups[first_loop:]
+    embed.add_field(name=first_name, value=first_groups.pop(0), inline=False)
+    for group in first_groups:
+        embed.add_field(name="\u200b", value=group, inline=False)
+    embed = do_before_send(embed) if do_before_send else embed
+    embeds.append(embed)
+    while groups:
+        batch = groups[:4]
+        groups = groups[4:]
+        embed = legacy_continuation(orig_embed, timestamp, title, color, description)
+        for group in batch:
+            embed.add_field(name="\u200b", value=group, inline=False)
+        embed = do_before_send(embed) if do_before_send else embed
+        embeds.append(embed)
+    return embeds
+
+
+async def legacy_generate_embeds_fields(embed, fields, *, field_name="\u200b", timestamp=discord.Embed.Empty, title=discord.Embed.Empty,
+                                        color=discord.Embed.Empty, description=discord.Embed.Empty, heading="", template="", ending="",
+                                        line_template="", do_before_send=None, inline_fields=True, regex=None):
+    """generate_embeds_fields before EmbedPaginator, which deep-copied the page for every field, kept as the reference."""
+    embeds = []
+    orig_embed = embed
+    for num, field in enumerate(fields.copy()):
+        if not isinstance(field, tuple):
+            fields[num] = (field_name, field)
+    if not title:
+        title = embed.title + " (continued)"
+    if not color:
+        color = embed.colour
+    while fields:
+        key, value = fields.pop(0)
+        key = str(key)
+        value = str(value)
+        groups = await legacy_break_into_groups(value, heading=heading, template=template, ending=ending, line_template=line_template, regex=regex)
+        inline = inline_fields
+        if len(groups) > 1:
+            inline = False
+        if (len(embed.fields) + len(groups)) <= 25:
+            for num, value in enumerate(groups, start=1):
+                new_embed = copy.deepcopy(embed)
+                new_embed.add_field(name=key if num <= 1 else "\u200b", value=value, inline=inline)
+                if len(new_embed) > 6000:
+                    embed = do_before_send(embed) if do_before_send else embed
+                    embeds.append(embed)
+                    embed = legacy_continuation(orig_embed, timestamp, title, color, description)
+                    embed.add_field(name=key if num <= 1 else "\u200b", value=value, inline=inline)
+                else:
+                    embed = new_embed
+        else:
+            if len(embed.fields) > 0:
+                embed = do_before_send(embed) if do_before_send else embed
+                embeds.append(embed)
+                embed = legacy_continuation(orig_embed, timestamp, title, color, description)
+            for num, value in enumerate(groups, start=1):
+                new_embed = copy.deepcopy(embed)
+                new_embed.add_field(name=key if num <= 1 else "\u200b", value=value, inline=inline)
+                if len(new_embed) > 6000 or len(new_embed.fields) > 25:
+                    embed = do_before_send(embed) if do_before_send else embed
+                    embeds.append(embed)
+                    embed = legacy_continuation(orig_embed, timestamp, title, color, description)
+                    embed.add_field(name=key if num <= 1 else "\u200b", value=value, inline=inline)
+                else:
+                    embed = new_embed
+    if len(embed.fields) > 0:
+        embed = do_before_send(embed) if do_before_send else embed
+        embeds.append(embed)
+    return embeds
+
+
+def make_lines(count: int, seed: int) -> List[str]:
+    """Lines like a stats export: mostly short, some blank, some wider than a field, and some with code fences."""
+    rng = random.Random(seed)
+    words = ["member", "channel", "messages", "reactions", "```", "emoji", "role", "1234567890", "#general", "@everyone"]
+    lines = []
+    for num in range(count):
+        roll = rng.random()
+        if roll < 0.05:
+            lines.append("")
+        elif roll < 0.07:
+            lines.append(" ".join(rng.choice(words) for _ in range(rng.randint(200, 400))))
+        else:
+            lines.append(f"{num}: " + " ".join(rng.choice(words) for _ in range(rng.randint(1, 12))))
+    return lines
+
+
+def base_embed() -> discord.Embed:
+    embed = discord.Embed(title="Statistics", description="Benchmark", color=discord.Color.green())
+    embed.set_footer(text="PokestarBot Version 1")
+    embed.set_author(name="Benchmark", icon_url="https://example.com/icon.png")
+    embed.add_field(name="Existing", value="Field")
+    return embed
+
+
+def dump(embeds: List[discord.Embed]) -> str:
+    return json.dumps([embed.to_dict() for embed in embeds], sort_keys=True)
+
+
+async def check(lines: List[str]):
+    text = "\n".join(lines)
+    for kwargs in ({}, {"template": "```\n", "ending": "\n```"}, {"heading": "Heading\n", "line_template": "- {}"}):
+        assert await legacy_break_into_groups(text, **kwargs) == await break_into_groups(text, **kwargs)
+        assert await legacy_break_into_groups(lines=lines[:500], **kwargs) == await break_into_groups(lines=lines[:500], **kwargs)
+    fields = [(f"Field {num}", "\n".join(lines[num:num + num % 40])) for num in range(0, 3000, 7)] + lines[:300]
+    for kwargs in ({}, {"inline_fields": False, "template": "```\n", "ending": "\n```"}, {"title": "Other", "heading": "Heading\n"}):
+        legacy = await legacy_generate_embeds_fields(base_embed(), list(fields), **kwargs)
+        current = await generate_embeds_fields(base_embed(), list(fields), **kwargs)
+        assert dump(legacy) == dump(current), kwargs
+    groups = await break_into_groups(text)
+    assert dump(await legacy_generate_embeds(base_embed(), groups)) == dump(await generate_embeds(base_embed(), groups))
+    print(f"Identical output for {len(lines)} lines, {len(fields)} fields and {len(groups)} groups.")
+
+
+def row(label: str, legacy: float, current: float):
+    print(f"{label:<40} {legacy * 1e3:>12.1f} {current * 1e3:>13.1f} {legacy / current:>8.1f}x")
+
+
+async def bench(lines: List[str], number: int):
+    text = "\n".join(lines)
+    fields = [(f"Field {num}", "\n".join(lines[num:num + 20])) for num in range(0, len(lines), 20)]
+
+    async def timed(func, *args, **kwargs) -> float:
+        best = float("inf")
+        for _ in range(number):
+            copies = [list(arg) if isinstance(arg, list) else arg for arg in args]
+            start = time.perf_counter()
+            await func(*copies, **kwargs)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    print(f"{'Operation':<40} {'Legacy (ms)':>12} {'Current (ms)':>13} {'Speedup':>9}")
+    row(f"break_into_groups, {len(lines)} lines", await timed(legacy_break_into_groups, text), await timed(break_into_groups, text))
+    row("One field per line", await timed(lambda items: legacy_generate_embeds_fields(base_embed(), items), lines),
+        await timed(lambda items: generate_embeds_fields(base_embed(), items), lines))
+    row(f"{len(fields)} fields of 20 lines", await timed(lambda items: legacy_generate_embeds_fields(base_embed(), items), fields),
+        await timed(lambda items: generate_embeds_fields(base_embed(), items), fields))
+    row("One field of every line", await timed(lambda: legacy_generate_embeds_fields(base_embed(), [("Output", text)])),
+        await timed(lambda: generate_embeds_fields(base_embed(), [("Output", text)])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the embed pagination against the old implementation and benchmark both.")
+    parser.add_argument("--lines", type=int, default=10000, help="Number of lines in the generated input.")
+    parser.add_argument("--number", type=int, default=3, help="Number of timed runs, the fastest is shown.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    lines = make_lines(args.lines, args.seed)
+    asyncio.get_event_loop().run_until_complete(check(lines))
+    asyncio.get_event_loop().run_until_complete(bench(lines, args.number))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env pipenv run python
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("NO_DELETE_LOGFILES", "1")
+
+from bot_data.utils import LatexRenderer  # NOQA
+from bot_data.utils.latex_as_png import latex_as_png  # NOQA
+
+expressions = [r"$\frac{%s}{x^{%s}} + \sqrt{\alpha_{%s}}$" % (num, num % 7, num % 13) for num in range(200)]
+
+
+def bench_inline(count: int) -> float:
+    start = time.perf_counter()
+    for expr in expressions[:count]:
+        latex_as_png(expr)
+    return count / (time.perf_counter() - start)
+
+
+async def bench_pool(count: int, workers: int):
+    renderer = LatexRenderer(size=workers)
+    start = time.perf_counter()
+    await renderer.start()
+    warmup = time.perf_counter() - start
+    start = time.perf_counter()
+    await asyncio.gather(*(renderer.render(expr) for expr in expressions[:count]))
+    cold = count / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(10):
+        await asyncio.gather(*(renderer.render(expr) for expr in expressions[:count]))
+    cached = count * 10 / (time.perf_counter() - start)
+    await renderer.close()
+    return warmup, cold, cached
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure LaTeX renders per second, inline and through LatexRenderer.")
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+    count = min(args.count, len(expressions))
+    print(f"Inline latex_as_png: {bench_inline(count):.2f} renders/s (blocks the event loop for every render)")
+    warmup, cold, cached = asyncio.get_event_loop().run_until_complete(bench_pool(count, args.workers))
+    print(f"LatexRenderer ({args.workers} workers): started in {warmup:.2f}s, {cold:.2f} renders/s uncached, {cached:.0f} renders/s cached")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env pipenv run python
+
+"""Replays synthetic traffic against a PokestarBot that is connected to :class:`tools.fake_discord.FakeDiscord` instead of Discord, and reports
+throughput, handler latency, database time and event loop lag for each profile. Runs fully offline against a temporary database, and the same
+``--seed`` replays the same traffic.
+
+Profiles:
+
+* ``messages``: messages per second spread over the guilds' channels, with some commands and invalid spoilers mixed in.
+* ``reactions``: reactions per second on older messages that are not in the bot's message cache.
+* ``bulk_roles``: every guild's owner runs ``role add`` for all of its members at once."""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+os.environ.setdefault("NO_DELETE_LOGFILES", "1")
+
+import discord.http  # NOQA
+import sentry_sdk  # NOQA
+
+from bot_data.bot import PokestarBot  # NOQA
+from bot_data.creds import bot_support_join_leave_channel_id, bot_support_stats_total_commands_channel_id, \
+    bot_support_stats_total_messages_sent_channel_id  # NOQA
+from bot_data.utils import Database, Histogram  # NOQA
+from tools.fake_discord import FakeDiscord, RateLimit, default_rate_limits, global_rate_limit  # NOQA
+
+profiles = ("messages", "reactions", "bulk_roles")
+emojis = ("👍", "👎", "❤", "😂", "🎉", "✅", "🚫", "➡")
+words = ("the", "anime", "episode", "was", "great", "did", "you", "see", "new", "chapter", "manga", "today", "lol", "what", "time", "is", "it")
+
+
+class World:
+    """The guilds that the bot is in, and the ids that the traffic is generated from."""
+
+    def __init__(self, fake: FakeDiscord, guild_count: int, members: int, channels: int, history: int):
+        self.fake = fake
+        self.guilds: List[Dict[str, Any]] = []
+        self.roles: Dict[int, int] = {}  # Guild ID -> ID of the role that bulk_roles adds
+        for num in range(guild_count):
+            guild = fake.add_guild(f"Guild {num}", members=members, text_channels=[f"channel-{channel}" for channel in range(channels)])
+            self.roles[guild["id"]] = int(fake.add_role(guild, "Bulk Role")["id"])
+            self.guilds.append(guild)
+        # The bot's stats loop and guild join messages use these channels in the support server
+        support = fake.add_guild("Bot Support", text_channels=())
+        fake.add_channel(support, "join-leave", channel_id=bot_support_join_leave_channel_id)
+        fake.add_channel(support, "Total Commands Run: 0", channel_type=2, channel_id=bot_support_stats_total_commands_channel_id)
+        fake.add_channel(support, "Total Messages Sent: 0", channel_type=2, channel_id=bot_support_stats_total_messages_sent_channel_id)
+        self.history: List[Tuple[int, int]] = []  # (channel ID, message ID) of messages sent before the bot started
+        for guild in self.guilds:
+            users = self.users(guild)
+            for channel in guild["channels"].values():
+                for _ in range(history):
+                    message = fake.message_payload(channel, fake.users[fake.random.choice(users)], {"content": self.sentence()})
+                    fake.store_message(channel, message)
+                    self.history.append((int(channel["id"]), int(message["id"])))
+
+    def users(self, guild: Dict[str, Any]) -> List[int]:
+        return [user_id for user_id in guild["members"] if user_id != int(self.fake.bot_user["id"])]
+
+    def sentence(self) -> str:
+        return " ".join(self.fake.random.choice(words) for _ in range(self.fake.random.randint(3, 15)))
+
+
+class Result:
+    def __init__(self, name: str, events: int, seconds: float, handlers: List[Tuple[str, int, int, Histogram]], bot: PokestarBot,
+                 fake: FakeDiscord):
+        queries = bot.metrics.stats["query"].values()
+        self.name = name
+        self.events = events
+        self.seconds = seconds
+        self.handlers = handlers
+        self.queries = sum(metric.count for metric in queries)
+        self.query_seconds = sum(metric.total for metric in queries)
+        self.lag_p99 = bot.loop_monitor.histogram.percentile(99) or 0.0
+        self.lag_max = bot.loop_monitor.histogram.max
+        self.stalls = len(bot.loop_monitor.stalls)
+        self.requests = sum(fake.requests.values())
+        self.rate_limited = sum(fake.rate_limited.values())
+        self.unhandled = dict(fake.unhandled)
+
+    @property
+    def throughput(self) -> float:
+        return self.events / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "profile": self.name, "events": self.events, "seconds": self.seconds, "throughput": self.throughput,
+            "handlers": [{"name": name, "count": count, "errors": errors, "p50": histogram.percentile(50), "p99": histogram.percentile(99),
+                          "max": histogram.max} for name, count, errors, histogram in self.handlers],
+            "queries": self.queries, "query_seconds": self.query_seconds, "loop_lag_p99": self.lag_p99, "loop_lag_max": self.lag_max,
+            "stalls": self.stalls, "requests": self.requests, "rate_limited": self.rate_limited, "unhandled_routes": self.unhandled
+        }
+
+    def report(self):
+        print(f"== {self.name}: {self.events} events in {self.seconds:.2f}s ({self.throughput:.1f}/s)")
+        for name, count, errors, histogram in self.handlers:
+            print(f"   {name:<48} {count:>7} calls {errors:>4} errors  p50 {ms(histogram.percentile(50))}  p99 {ms(histogram.percentile(99))}  "
+                  f"max {ms(histogram.max)}")
+        print(f"   Database: {self.queries} queries, {self.query_seconds:.3f}s")
+        print(f"   Event loop lag: p99 {ms(self.lag_p99)}, max {ms(self.lag_max)}, {self.stalls} stalls")
+        print(f"   Discord: {self.requests} requests, {self.rate_limited} rate limited")
+        if self.unhandled:
+            print(f"   Routes missing from the fake: {self.unhandled}")
+
+
+def ms(seconds: Optional[float]) -> str:
+    return f"{seconds * 1000:8.1f}ms" if seconds is not None else "       -  "
+
+
+def parse_rate_limit(value: str) -> Tuple[str, RateLimit]:
+    """``"POST /channels/{channel_id}/messages=5/5"`` -> ``(route, RateLimit(5, 5.0))``"""
+    route, sep, limit = value.rpartition("=")
+    count, sep2, per = limit.partition("/")
+    if not sep or not sep2:
+        raise argparse.ArgumentTypeError(f"Expected ROUTE=LIMIT/SECONDS, got {value!r}")
+    return route, RateLimit(int(count), float(per))
+
+
+async def inject(fake: FakeDiscord, actions: Iterable[Callable[[], Awaitable[Any]]], rate: float):
+    """Run the actions on the fake's loop at a fixed rate, whether or not the bot keeps up (an open-loop load, like real users)."""
+
+    async def run():
+        start = fake.loop.time()
+        for num, action in enumerate(actions):
+            delay = start + num / rate - fake.loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await action()
+
+    await fake.call(run())
+
+
+def handled(bot: PokestarBot) -> int:
+    return sum(metric.count for kind in ("event", "command") for metric in bot.metrics.stats[kind].values())
+
+
+async def settle(bot: PokestarBot, fake: FakeDiscord, tasks: int, quiet: float, timeout: float) -> float:
+    """Wait until the bot is back to ``tasks`` running tasks (so every handler, including long bulk jobs, has returned) and nothing has finished
+    for ``quiet`` seconds, and return when the last handler finished."""
+    last_count = handled(bot)
+    last_change = time.perf_counter()
+    deadline = last_change + timeout
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+        count = handled(bot)
+        if count != last_count or fake.in_flight:
+            last_count = count
+            last_change = time.perf_counter()
+        elif len(asyncio.all_tasks()) <= tasks and time.perf_counter() - last_change >= quiet:
+            break
+    else:
+        print(f"   Still busy after {timeout:.0f}s, the results are cut off.")
+    return last_change
+
+
+def handler_rows(bot: PokestarBot, keyword: str, limit: int) -> List[Tuple[str, int, int, Histogram]]:
+    """The events with ``keyword`` in their name and, for message profiles, the commands, the ones that took the most time in total first."""
+    rows = [(f"{kind} {name}", metric) for kind in ("event", "command") for name, metric in bot.metrics.top(kind)
+            if keyword in name or (kind == "command" and keyword == "on_message")]
+    rows.sort(key=lambda row: row[1].total, reverse=True)
+    return [(name, metric.count, metric.errors, metric.histogram) for name, metric in rows[:limit]]
+
+
+async def run_profile(name: str, bot: PokestarBot, fake: FakeDiscord, world: World, args: argparse.Namespace) -> Result:
+    bot.metrics.reset()
+    bot.loop_monitor.stalls.clear()
+    fake.requests.clear()
+    fake.rate_limited.clear()
+    fake.unhandled.clear()
+    rng = random.Random(f"{args.seed}-{name}")
+    keyword = "reaction" if name == "reactions" else "on_message"  # Commands are shown for the profiles that send messages
+    actions: List[Callable[[], Awaitable[Any]]] = []
+    rate = args.rate
+    if name == "messages":
+        for _ in range(int(args.rate * args.duration)):
+            guild = rng.choice(world.guilds)
+            channel_id = rng.choice(list(guild["channels"]))
+            user_id = rng.choice(world.users(guild))
+            roll = rng.random()
+            sentence = " ".join(rng.choice(words) for _ in range(rng.randint(3, 15)))
+            if roll < args.command_ratio:
+                content = "%ping"
+            elif roll < args.command_ratio + args.spoiler_ratio:
+                content = f"the ending was ||{sentence}| right?"
+            else:
+                content = sentence
+            actions.append(lambda c=channel_id, u=user_id, t=content: fake.user_message(c, u, t))
+    elif name == "reactions":
+        if not world.history:
+            raise SystemExit("The reactions profile needs --history above 0.")
+        for _ in range(int(args.rate * args.duration)):
+            channel_id, message_id = rng.choice(world.history)
+            user_id = rng.choice(world.users(fake.guilds[int(fake.channels[channel_id]["guild_id"])]))
+            emoji = rng.choice(emojis)
+            actions.append(lambda c=channel_id, m=message_id, u=user_id, e=emoji: fake.user_reaction(c, m, u, e))
+    else:
+        for guild in world.guilds:
+            channel_id = next(iter(guild["channels"]))
+            content = f"%role add {world.roles[guild['id']]} everyone"
+            actions.append(lambda c=channel_id, u=guild["owner_id"], t=content: fake.user_message(c, u, t))
+        rate = len(actions) or 1  # All at once
+    tasks = len(asyncio.all_tasks())
+    start = time.perf_counter()
+    await inject(fake, actions, rate)
+    end = await settle(bot, fake, tasks, args.quiet, args.timeout)
+    return Result(name, len(actions), end - start, handler_rows(bot, keyword, args.handlers), bot, fake)
+
+
+async def bench(args: argparse.Namespace) -> List[Result]:
+    rate_limits = {} if args.no_rate_limits else dict(default_rate_limits)
+    rate_limits.update(args.rate_limit)
+    global_limit = None if args.no_rate_limits else RateLimit(args.global_limit, 1.0)
+    fake = FakeDiscord(latency=args.latency, jitter=args.jitter, rate_limits=rate_limits, global_limit=global_limit, seed=args.seed)
+    world = World(fake, args.guilds, args.members, args.channels, args.history)
+    fake.start()
+    discord.http.Route.BASE = fake.api
+    sentry_sdk.init()  # No DSN, so that errors are not reported
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        bot = PokestarBot()
+        for loop in list(bot.metrics.loops):  # Loops of cogs that poll other sites. update_stats is started later, and only talks to the fake.
+            loop.cancel()
+        bot._connection.guild_ready_timeout = 0.2
+        bot.conn = await Database(os.path.join(directory, "database.db"), metrics=bot.metrics).connect()
+        await bot.load_session()
+        start = time.perf_counter()
+        await bot.login("fake-token")
+        connection = asyncio.ensure_future(bot.connect(reconnect=False))
+        try:
+            await bot.wait_until_ready()
+            while not all(bot.stats_working_on(guild.id).is_set() for guild in bot.guilds):
+                await asyncio.sleep(0.05)
+            print(f"Ready with {len(bot.guilds)} guilds and {len(world.history)} messages of history in {time.perf_counter() - start:.2f}s")
+            if args.message_goals:
+                for guild in world.guilds:
+                    await bot.add_channel_mapping(guild["id"], "message-goals", next(iter(guild["channels"])))
+            for name in args.profiles:
+                results.append(await run_profile(name, bot, fake, world, args))
+                results[-1].report()
+        finally:
+            await bot.close()
+            await asyncio.gather(connection, return_exceptions=True)
+            fake.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PokestarBot's handlers under synthetic load against an offline fake of Discord.")
+    parser.add_argument("--profile", dest="profiles", action="append", choices=profiles, help="Profile to run, can be repeated. All by default.")
+    parser.add_argument("--guilds", type=int, default=10)
+    parser.add_argument("--members", type=int, default=50, help="Members of each guild, besides the bot and the owner.")
+    parser.add_argument("--channels", type=int, default=3, help="Text channels in each guild.")
+    parser.add_argument("--history", type=int, default=20, help="Messages in each channel from before the bot started.")
+    parser.add_argument("--rate", type=float, default=50.0, help="Messages or reactions per second.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of messages or reactions to send.")
+    parser.add_argument("--command-ratio", type=float, default=0.05, help="Share of messages that are commands.")
+    parser.add_argument("--spoiler-ratio", type=float, default=0.01, help="Share of messages with an invalid spoiler.")
+    parser.add_argument("--no-message-goals", dest="message_goals", action="store_false", help="Don't map a message-goals channel.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds that every REST request takes.")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Random extra seconds added to each request, up to this.")
+    parser.add_argument("--rate-limit", type=parse_rate_limit, action="append", default=[], metavar="ROUTE=LIMIT/SECONDS",
+                        help="Override the rate limit of a route, such as 'POST /channels/{channel_id}/messages=5/5'.")
+    parser.add_argument("--global-limit", type=int, default=global_rate_limit.limit, help="Requests per second across all routes.")
+    parser.add_argument("--no-rate-limits", action="store_true")
+    parser.add_argument("--handlers", type=int, default=10, help="Number of handlers to show for each profile, the slowest in total first.")
+    parser.add_argument("--quiet", type=float, default=0.5, help="Seconds without any handler finishing after which a profile is finished.")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait for a profile to finish.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="Also write the results to a JSON file.")
+    args = parser.parse_args()
+    args.profiles = args.profiles or list(profiles)
+    results = asyncio.get_event_loop().run_until_complete(bench(args))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump([result.as_dict() for result in results], file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env pipenv run python
+
+import inspect
+import logging
+import os
+import timeit
+
+os.environ.setdefault("NO_DELETE_LOGFILES", "1")
+
+import discord.ext.commands  # NOQA
+
+from bot_data.utils import LogContext, UserChannelFormatter, log_context  # NOQA
+
+STACK_DEPTH = 30
+
+
+def legacy_get_context_variables(break_on_message: bool = True):
+    frame = inspect.currentframe()
+    user = channel = command = msg = ctx = None
+    while frame.f_back is not None:
+        for key, value in frame.f_locals.copy().items():
+            if isinstance(value, discord.ext.commands.Context):
+                user = value.author
+                channel = value.channel
+                command = value.command
+                msg = value.message
+                ctx = value
+                break
+            elif isinstance(value, discord.Message):
+                if break_on_message:
+                    user = value.author
+                    channel = value.channel
+                    msg = value
+                    break
+                else:
+                    msg = value
+        frame = frame.f_back
+    if msg and not command:
+        user = msg.author
+        channel = msg.channel
+    return user, channel, command, msg, ctx
+
+
+class LegacyUserChannelFormatter(UserChannelFormatter):
+    def format(self, record: logging.LogRecord) -> str:
+        user, channel, command, message, _ = legacy_get_context_variables(break_on_message=False)
+        record.user = user
+        record.channel = channel
+        record.command = command
+        record.messageid = message.id if message else None
+        return logging.Formatter.format(self, record)
+
+
+def at_depth(depth: int, func, *args):
+    local_a, local_b, local_c = depth, str(depth), [depth]  # Locals the legacy walk has to copy and check
+    if depth <= 0:
+        return func(*args)
+    return at_depth(depth - 1, func, *args)
+
+
+def main():
+    number = 20000
+    record = logging.LogRecord("bot_data.bench", logging.DEBUG, __file__, 1, "Benchmark message %s", ("arg",), None, func="main")
+    log_context.set(LogContext(user="user#0001", channel="#channel", command="command"))
+    for name, formatter in (("Legacy", LegacyUserChannelFormatter()), ("Current", UserChannelFormatter())):
+        duration = timeit.timeit(lambda: at_depth(STACK_DEPTH, formatter.format, record), number=number)
+        print(f"{name:>8}: {duration / number * 1e6:.2f}us per record at stack depth {STACK_DEPTH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env pipenv run python
+
+import argparse
+import os
+import random
+import timeit
+
+os.environ.setdefault("NO_DELETE_LOGFILES", "1")
+
+from bot_data.utils.data.mangadex import MangadexChapterList  # NOQA
+
+
+def make_fixture(count: int, seed: int) -> dict:
+    """A v2 ``/manga/<id>/chapters`` response with ``count`` chapters, newest first, in several languages and with some chapters uploaded by
+    more than one group."""
+    rng = random.Random(seed)
+    groups = [{"id": num, "name": f"Group {num}"} for num in range(1, 21)]
+    chapters = []
+    chapter_id = 100000
+    timestamp = 1500000000
+    num = 1
+    while len(chapters) < count:
+        for _ in range(rng.choice((1, 1, 1, 2, 3))):  # Re-uploads and other groups' releases of the same chapter
+            chapter_id += rng.randint(1, 50)
+            timestamp += rng.randint(3600, 86400)
+            chapters.append({"id": chapter_id, "hash": f"{chapter_id:032x}", "mangaId": 1, "mangaTitle": "Fixture", "volume": str(num // 10 + 1),
+                             "chapter": str(num) if rng.random() > 0.05 else f"{num}.5", "title": f"Chapter {num}",
+                             "language": rng.choice(("gb", "gb", "gb", "es", "fr", "ru")), "groups": [rng.choice(groups)["id"]],
+                             "uploader": rng.randint(1, 1000), "timestamp": timestamp, "threadId": None, "comments": rng.randint(0, 50),
+                             "views": rng.randint(0, 100000)})
+        num += 1
+    chapters = chapters[:count]
+    chapters.reverse()
+    return {"code": 200, "status": "OK", "data": {"chapters": chapters, "groups": groups}}
+
+
+def legacy_filter_duplicates(chapters: MangadexChapterList) -> MangadexChapterList:
+    """filter_duplicates before it used a set, kept as the reference."""
+    seen = []
+    final = []
+    for item in chapters:
+        identifier = item.num if item.num else item.title
+        if identifier not in seen:
+            seen.append(identifier)
+            final.append(item)
+    return MangadexChapterList(final)
+
+
+def legacy_latest(chapters: MangadexChapterList):
+    return sorted(chapters)[-1] if chapters else None
+
+
+def row(label: str, legacy: float, current: float):
+    print(f"{label:<44} {legacy * 1e3:>12.3f} {current * 1e3:>13.3f} {legacy / current:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark building, deduplicating and finding the latest chapter of a MangaDex chapter list.")
+    parser.add_argument("--chapters", type=int, default=2000, help="Number of chapters in the generated fixture.")
+    parser.add_argument("--new", type=int, default=5, help="Number of chapters uploaded since the last check.")
+    parser.add_argument("--number", type=int, default=20, help="Number of timed runs to average.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    fixture = make_fixture(args.chapters, args.seed)
+    chapters = MangadexChapterList.from_chapter_list_v2(fixture).filter_lang()
+    assert list(legacy_filter_duplicates(chapters)) == list(chapters.filter_duplicates())
+    assert legacy_latest(chapters) is chapters.latest
+    last_seen = int(fixture["data"]["chapters"][args.new]["id"])
+    assert len(MangadexChapterList.from_chapter_list_v2(fixture, newer_than=last_seen)) == args.new
+    print(f"{len(fixture['data']['chapters'])} chapters, {len(chapters)} in English, {len(chapters.filter_duplicates())} after removing duplicates.")
+    print(f"{'Operation':<44} {'Legacy (ms)':>12} {'Current (ms)':>13} {'Speedup':>9}")
+
+    def time(func) -> float:
+        return timeit.timeit(func, number=args.number) / args.number
+
+    row("filter_duplicates", time(lambda: legacy_filter_duplicates(chapters)), time(chapters.filter_duplicates))
+    deduplicated = chapters.filter_duplicates()
+    deduplicated.latest  # NOQA  # Found once, then kept up to date
+    row("latest (x100, as in repr and info embeds)", time(lambda: [legacy_latest(deduplicated) for _ in range(100)]),
+        time(lambda: [deduplicated.latest for _ in range(100)]))
+    legacy_check = time(lambda: legacy_filter_duplicates(MangadexChapterList.from_chapter_list_v2(fixture).filter_lang()))
+    current_check = time(lambda: MangadexChapterList.from_chapter_list_v2(fixture, newer_than=last_seen).filter_lang().filter_duplicates())
+    row(f"Update check, {args.new} new chapters", legacy_check, current_check)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env pipenv run python
+
+import argparse
+import os
+import re
+import timeit
+from typing import List, Optional
+
+os.environ.setdefault("NO_DELETE_LOGFILES", "1")
+
+from bot_data.utils.data.nyaasi import BaseTitleParser, NO_MATCH, TitleParserRegistry, author_parser_mapping  # NOQA
+from bot_data.utils.data.nyaasi.title_parsers.exceptions import TitleDoesNotMatchException  # NOQA
+
+fixture_path = os.path.abspath(os.path.join(__file__, "..", "fixtures", "nyaa_titles.txt"))
+bracket_pattern = re.compile(r"([\[\(\{])([^\(\)\[\]\{\}]*)([\)\}\]])")
+
+
+def legacy_get_brackets(cls, string: str):
+    """The uncached bracket extraction that every parser ran for itself before the registry."""
+    matches = []
+    for match in bracket_pattern.finditer(string):
+        start, end = match.group(1, 3)
+        text = match.group(2)
+        if (start, end) in [tuple("[]"), tuple("()"), tuple("{}")] and start not in text and end not in text:
+            matches.append(text)
+    return matches
+
+
+def legacy_parse_title(title: str):
+    """The loop that NyaaTorrent.parse_title used, which tries every parser in order. Kept as the reference for the equivalence check."""
+    exceptions = []
+    for user, parser in author_parser_mapping.items():
+        try:
+            return user, parser.parse(title)
+        except TitleDoesNotMatchException as exc:
+            if not (exc.specific and "was not found in the bracket data" in exc.specific):
+                exceptions.append((user, exc))
+    return exceptions or None
+
+
+def summarize(result):
+    if result is None or result is NO_MATCH:
+        return None
+    elif isinstance(result, tuple):
+        user, parsed = result
+        return user, type(parsed).__name__, parsed.dict
+    return [(user, str(exc)) for user, exc in result]
+
+
+def load_titles() -> List[str]:
+    with open(fixture_path, encoding="utf-8") as file:
+        return [line.rstrip("\n") for line in file if line.strip()]
+
+
+def check_equivalence(titles: List[str]):
+    registry = TitleParserRegistry(author_parser_mapping)
+    for title in titles:
+        expected = summarize(legacy_parse_title(title))
+        actual = summarize(registry.parse(title))
+        assert expected == actual, f"Mismatch for {title!r}: {expected!r} != {actual!r}"
+    parsed = sum(1 for title in titles if isinstance(registry.parse(title), tuple))
+    print(f"{len(titles)} fixture titles gave identical results ({parsed} parsed).")
+
+
+def bench(label: str, func, titles: List[str], number: int, baseline: Optional[float] = None) -> float:
+    seconds = timeit.timeit(lambda: [func(title) for title in titles], number=number) / number
+    rate = len(titles) / seconds
+    speedup = f"{baseline / seconds:>8.1f}x" if baseline else f"{'':>9}"
+    print(f"{label:<36} {rate:>16,.0f} {seconds * 1e3:>11.2f} {speedup}")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the title parser registry against the old parser loop and benchmark both over the fixture "
+                                                 "corpus in tools/fixtures/nyaa_titles.txt.")
+    parser.add_argument("--polls", type=int, default=12, help="Number of times the corpus is parsed, like an hour of 5-minute RSS fetches.")
+    parser.add_argument("--number", type=int, default=5, help="Number of timed runs to average.")
+    args = parser.parse_args()
+    titles = load_titles()
+    check_equivalence(titles)
+    corpus = titles * args.polls
+    print(f"{'Method':<36} {'Titles per second':>16} {'Time (ms)':>11} {'Speedup':>9}")
+    current_get_brackets = BaseTitleParser.__dict__["_get_brackets"]
+    BaseTitleParser._get_brackets = classmethod(legacy_get_brackets)
+    try:
+        baseline = bench("Every parser, in order (old)", legacy_parse_title, corpus, args.number)
+    finally:
+        BaseTitleParser._get_brackets = current_get_brackets
+    bench("Registry dispatch, no memo", TitleParserRegistry(author_parser_mapping, memo_size=0).parse, corpus, args.number, baseline)
+    registry = TitleParserRegistry(author_parser_mapping)
+    bench("Registry dispatch with memo", registry.parse, corpus, args.number, baseline)
+    print(f"Memo: {registry.hits} hits, {registry.misses} misses, {len(registry.memo)} titles kept.")
+
+
+if __name__ == '__main__':
+    main()
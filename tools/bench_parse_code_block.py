@@ -0,0 +1,114 @@
+#!/usr/bin/env pipenv run python
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import re
+import timeit
+from typing import Collection, List
+
+os.environ.setdefault("NO_DELETE_LOGFILES", "1")
+
+from bot_data.utils.parse_code_block import parse_discord_code_block  # NOQA
+
+single_line_code_block = re.compile(r"^(?!`{3})([^\n]+)`{3}")
+
+
+async def legacy_parse_discord_code_block(string: str, language_check: bool = True, languages: Collection[str] = ("python", "py")) -> List[str]:
+    """The character-by-character implementation that parse_discord_code_block replaced, kept as the reference for the equivalence check."""
+    items = []
+    code = ""
+    encountered_backtick = False
+    while string:
+        string: str
+        if string[:3] == "```":
+            if not encountered_backtick:
+                encountered_backtick = True
+                string = string[3:]
+                if match := single_line_code_block.match(string):
+                    code_string = match.group(0)
+                    temp_code = ""
+                    while code_string[:3] != "```":
+                        temp_code += code_string[0]
+                        code_string = code_string[1:]
+                    code += temp_code
+                    string = string[len(temp_code) + 3:]
+                    encountered_backtick = False
+                    items.append(code.strip())
+                    code = ""
+                else:
+                    language, sep, string = string.partition("\n")
+                    if " " in language:
+                        code += language + sep
+                        continue
+                    language = language.lower()
+                    if language not in languages and language and language_check:
+                        raise ValueError("Language has to be Python.")
+            else:
+                encountered_backtick = False
+                string = string[3:]
+                items.append(code.strip())
+                code = ""
+        elif encountered_backtick:
+            code += string[0]
+            string = string[1:]
+        elif not encountered_backtick:
+            string = string[1:]
+    return [item for item in items if bool(item.strip())]
+
+
+fragments = ["`", "``", "```", "```", "\n", " ", "  ", "x", "print(1)", "py", "PY", "python", "bash", "a b", "\t", "é"]
+
+
+async def run(function, string: str, language_check: bool):
+    try:
+        return await function(string, language_check=language_check)
+    except ValueError as exc:
+        return exc.args
+
+
+async def check_equivalence(count: int, seed: int):
+    rng = random.Random(seed)
+    logging.getLogger("bot_data.utils.parse_code_block").setLevel(logging.ERROR)  # Half of the inputs have the wrong language
+    for num in range(count):
+        string = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 40)))
+        language_check = rng.random() < 0.5
+        expected = await run(legacy_parse_discord_code_block, string, language_check)
+        actual = await run(parse_discord_code_block, string, language_check)
+        assert expected == actual, f"Mismatch for {string!r} (language_check={language_check}): {expected!r} != {actual!r}"
+    print(f"{count} random inputs gave identical results.")
+
+
+def make_message(length: int, block_size: int) -> str:
+    block = "```py\n" + "\n".join(f"print({num} ** 2)" for num in range(block_size)) + "\n```\n"
+    text = "Run these:\n"
+    while len(text) + len(block) <= length:
+        text += block
+    return text + "x" * (length - len(text))
+
+
+def bench(loop: asyncio.AbstractEventLoop, label: str, string: str, number: int):
+    legacy = timeit.timeit(lambda: loop.run_until_complete(legacy_parse_discord_code_block(string)), number=number) / number
+    current = timeit.timeit(lambda: loop.run_until_complete(parse_discord_code_block(string)), number=number) / number
+    blocks = len(loop.run_until_complete(parse_discord_code_block(string)))
+    print(f"{label:<32} {len(string):>8} {blocks:>6} {legacy * 1e3:>12.3f} {current * 1e3:>13.3f} {legacy / current:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check parse_discord_code_block against the old implementation and benchmark both.")
+    parser.add_argument("--fuzz", type=int, default=100000, help="Number of random inputs to compare.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(check_equivalence(args.fuzz, args.seed))
+    print(f"{'Input':<32} {'Length':>8} {'Blocks':>6} {'Legacy (ms)':>12} {'Current (ms)':>13} {'Speedup':>9}")
+    bench(loop, "Message, one large block", make_message(4000, 250), 20)
+    bench(loop, "Message, many small blocks", make_message(4000, 2), 20)
+    bench(loop, "Uploaded file, 100 KB", make_message(100000, 5), 2)
+    bench(loop, "Uploaded file, 500 KB", make_message(500000, 5), 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,612 @@
+"""An offline stand-in for the parts of Discord's REST API (v7) and gateway (v6) that discord.py 1.7 and the bot use.
+
+:class:`FakeDiscord` serves both on localhost from its own thread and event loop, so its work does not show up in the bot's loop lag or handler
+timings. Point discord.py at it by setting ``discord.http.Route.BASE`` to :attr:`FakeDiscord.api`; the gateway URL is returned by
+``GET /gateway``. Every REST request waits for the configured latency, and is counted against a Discord-style rate limit bucket (per route and
+major parameter) and a global bucket, answering with the same ``X-RateLimit-*`` headers and 429 responses that discord.py handles.
+
+Guilds, channels, members and messages live in memory. Traffic is injected with :meth:`FakeDiscord.user_message` and
+:meth:`FakeDiscord.user_reaction`, which dispatch gateway events as if a user had sent them."""
+
+import asyncio
+import collections
+import datetime
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple, TypeVar
+
+import aiohttp
+import aiohttp.web
+
+_T = TypeVar("_T")
+
+DISCORD_EPOCH = 1420070400000
+TEXT_CHANNEL = 0
+DM_CHANNEL = 1
+VOICE_CHANNEL = 2
+ADMINISTRATOR = 8
+
+
+class RateLimit(NamedTuple):
+    limit: int
+    per: float  # Seconds
+
+
+# Close to what Discord gives a bot. Routes that are not listed only count against the global limit.
+default_rate_limits = {
+    "POST /channels/{channel_id}/messages": RateLimit(5, 5.0),
+    "PATCH /channels/{channel_id}/messages/{message_id}": RateLimit(5, 5.0),
+    "DELETE /channels/{channel_id}/messages/{message_id}": RateLimit(5, 1.0),
+    "PUT /channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me": RateLimit(1, 0.25),
+    "PATCH /channels/{channel_id}": RateLimit(2, 600.0),
+    "PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}": RateLimit(10, 10.0),
+    "DELETE /guilds/{guild_id}/members/{user_id}/roles/{role_id}": RateLimit(10, 10.0),
+}
+global_rate_limit = RateLimit(50, 1.0)
+major_parameters = ("channel_id", "guild_id", "webhook_id")
+
+
+def json_response(data: Any, *, status: int = 200, headers: Optional[Dict[str, str]] = None) -> aiohttp.web.Response:
+    # discord.py only parses the body when the content type is exactly application/json, without a charset.
+    return aiohttp.web.Response(body=json.dumps(data).encode("utf-8"), status=status, headers={**(headers or {}), "Content-Type": "application/json"})
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status: int, code: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+class Bucket:
+    """A fixed window of ``limit`` requests that starts with the first request after the previous window reset."""
+
+    __slots__ = ("name", "limit", "per", "remaining", "reset_at")
+
+    def __init__(self, name: str, rate_limit: RateLimit):
+        self.name = name
+        self.limit, self.per = rate_limit
+        self.remaining = self.limit
+        self.reset_at = 0.0
+
+    def take(self, now: float) -> Optional[float]:
+        """Use up one request. Returns None if it was allowed, or the seconds until the bucket resets."""
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.per
+        if self.remaining <= 0:
+            return self.reset_at - now
+        self.remaining -= 1
+        return None
+
+    def headers(self, now: float) -> Dict[str, str]:
+        return {"X-RateLimit-Limit": str(self.limit), "X-RateLimit-Remaining": str(self.remaining),
+                "X-RateLimit-Reset": f"{time.time() + self.reset_at - now:.3f}", "X-RateLimit-Reset-After": f"{self.reset_at - now:.3f}",
+                "X-RateLimit-Bucket": self.name}
+
+
+class GatewaySession:
+    __slots__ = ("ws", "session_id", "sequence", "lock")
+
+    def __init__(self, ws: aiohttp.web.WebSocketResponse, session_id: str):
+        self.ws = ws
+        self.session_id = session_id
+        self.sequence = 0
+        self.lock = asyncio.Lock()
+
+    async def send(self, payload: Dict[str, Any]):
+        async with self.lock:
+            if payload.get("op") == 0:
+                self.sequence += 1
+                payload["s"] = self.sequence
+            await self.ws.send_str(json.dumps(payload, separators=(",", ":")))
+
+
+class FakeDiscord:
+    def __init__(self, *, latency: float = 0.0, jitter: float = 0.0, rate_limits: Optional[Dict[str, RateLimit]] = None,
+                 global_limit: Optional[RateLimit] = global_rate_limit, host: str = "127.0.0.1", seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limits = default_rate_limits if rate_limits is None else rate_limits
+        self.global_bucket = Bucket("global", global_limit) if global_limit is not None else None
+        self.buckets: Dict[Tuple[str, Optional[str]], Bucket] = {}
+        self.host = host
+        self.port: Optional[int] = None
+        self.random = random.Random(seed)
+        self.sequence = itertools.count()
+        self.users: Dict[int, Dict[str, Any]] = {}
+        self.guilds: Dict[int, Dict[str, Any]] = {}
+        self.channels: Dict[int, Dict[str, Any]] = {}
+        self.messages: Dict[int, Dict[int, Dict[str, Any]]] = collections.defaultdict(dict)
+        self.dm_channels: Dict[int, int] = {}
+        self.sessions: Set[GatewaySession] = set()
+        self.bot_user = self.add_user("PokestarBot", bot=True)
+        self.owner_user = self.add_user("Bot Owner")
+        self.requests: Dict[str, int] = collections.Counter()
+        self.rate_limited: Dict[str, int] = collections.Counter()
+        self.unhandled: Dict[str, int] = collections.Counter()
+        self.in_flight = 0
+        self.identified = threading.Event()
+        self.routes: List[Tuple[str, "re.Pattern[str]", str, Callable[..., Awaitable[Any]]]] = []
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self.runner: Optional[aiohttp.web.AppRunner] = None
+        self.started = threading.Event()
+        for method, template, handler in (
+                ("GET", "/gateway", self.get_gateway),
+                ("GET", "/gateway/bot", self.get_gateway),
+                ("GET", "/users/@me", self.get_me),
+                ("GET", "/oauth2/applications/@me", self.get_application),
+                ("GET", "/users/{user_id}", self.get_user),
+                ("POST", "/users/@me/channels", self.create_dm),
+                ("GET", "/channels/{channel_id}", self.get_channel),
+                ("PATCH", "/channels/{channel_id}", self.edit_channel),
+                ("POST", "/channels/{channel_id}/typing", self.no_content),
+                ("GET", "/channels/{channel_id}/messages", self.get_messages),
+                ("POST", "/channels/{channel_id}/messages", self.create_message),
+                ("POST", "/channels/{channel_id}/messages/bulk-delete", self.bulk_delete_messages),
+                ("GET", "/channels/{channel_id}/messages/{message_id}", self.get_message),
+                ("PATCH", "/channels/{channel_id}/messages/{message_id}", self.edit_message),
+                ("DELETE", "/channels/{channel_id}/messages/{message_id}", self.delete_message),
+                ("PUT", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me", self.add_own_reaction),
+                ("DELETE", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me", self.no_content),
+                ("DELETE", "/channels/{channel_id}/messages/{message_id}/reactions", self.no_content),
+                ("GET", "/guilds/{guild_id}/members/{user_id}", self.get_member),
+                ("PATCH", "/guilds/{guild_id}/members/{user_id}", self.edit_member),
+                ("PUT", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}", self.add_member_role),
+                ("DELETE", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}", self.remove_member_role),
+                ("POST", "/guilds/{guild_id}/roles", self.create_role),
+                ("PATCH", "/guilds/{guild_id}/roles/{role_id}", self.edit_role),
+        ):
+            pattern = re.compile("^" + re.sub(r"{(\w+)}", r"(?P<\1>[^/]+)", re.escape(template).replace(r"\{", "{").replace(r"\}", "}")) + "$")
+            self.routes.append((method, pattern, template, handler))
+
+    # World
+
+    def snowflake(self) -> int:
+        return ((int(time.time() * 1000) - DISCORD_EPOCH) << 22) | (next(self.sequence) & 0x3FFFFF)
+
+    @staticmethod
+    def timestamp() -> str:
+        return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    def add_user(self, name: str, *, bot: bool = False, user_id: Optional[int] = None) -> Dict[str, Any]:
+        user_id = user_id or self.snowflake()
+        user = {"id": str(user_id), "username": name, "discriminator": f"{user_id % 10000:04}", "avatar": None, "bot": bot,
+                "public_flags": 0}
+        self.users[user_id] = user
+        return user
+
+    def add_guild(self, name: str, *, members: int = 0, text_channels: Sequence[str] = ("general",), voice_channels: Sequence[str] = (),
+                  guild_id: Optional[int] = None) -> Dict[str, Any]:
+        """Add a Guild with the bot (as an administrator), an owner and ``members`` other members, and the given channels."""
+        guild_id = guild_id or self.snowflake()
+        guild = {"id": guild_id, "name": name, "roles": {}, "channels": {}, "members": {}, "owner_id": None}
+        self.guilds[guild_id] = guild
+        self.add_role(guild, "@everyone", role_id=guild_id, permissions=0x7FFFFFF ^ ADMINISTRATOR)
+        bot_role = self.add_role(guild, "Bot", permissions=ADMINISTRATOR)
+        self.add_member(guild, self.bot_user, [int(bot_role["id"])])
+        guild["owner_id"] = int(self.add_member(guild, self.add_user(f"{name} Owner"))["user"]["id"])
+        for num in range(members):
+            self.add_member(guild, self.add_user(f"User {num}"))
+        for channel_name in text_channels:
+            self.add_channel(guild, channel_name)
+        for channel_name in voice_channels:
+            self.add_channel(guild, channel_name, channel_type=VOICE_CHANNEL)
+        return guild
+
+    def add_role(self, guild: Dict[str, Any], name: str, *, permissions: int = 0, role_id: Optional[int] = None) -> Dict[str, Any]:
+        role_id = role_id or self.snowflake()
+        role = {"id": str(role_id), "name": name, "color": 0, "hoist": False, "position": len(guild["roles"]), "permissions": str(permissions),
+                "permissions_new": str(permissions), "managed": False, "mentionable": True}
+        guild["roles"][role_id] = role
+        return role
+
+    def add_member(self, guild: Dict[str, Any], user: Dict[str, Any], roles: Sequence[int] = ()) -> Dict[str, Any]:
+        member = {"user": user, "roles": [str(role_id) for role_id in roles], "joined_at": self.timestamp(), "nick": None, "deaf": False,
+                  "mute": False, "premium_since": None, "pending": False}
+        guild["members"][int(user["id"])] = member
+        return member
+
+    def add_channel(self, guild: Dict[str, Any], name: str, *, channel_type: int = TEXT_CHANNEL, channel_id: Optional[int] = None) -> Dict[str, Any]:
+        channel_id = channel_id or self.snowflake()
+        channel = {"id": str(channel_id), "type": channel_type, "guild_id": str(guild["id"]), "name": name, "position": len(guild["channels"]),
+                   "permission_overwrites": [], "parent_id": None, "nsfw": False, "topic": None, "rate_limit_per_user": 0, "last_message_id": None}
+        if channel_type == VOICE_CHANNEL:
+            channel.update(bitrate=64000, user_limit=0)
+        guild["channels"][channel_id] = channel
+        self.channels[channel_id] = channel
+        return channel
+
+    def guild_payload(self, guild: Dict[str, Any]) -> Dict[str, Any]:
+        return {"id": str(guild["id"]), "name": guild["name"], "icon": None, "splash": None, "owner_id": str(guild["owner_id"]), "region": "us-east",
+                "afk_channel_id": None, "afk_timeout": 300, "verification_level": 0, "default_message_notifications": 0,
+                "explicit_content_filter": 0, "roles": list(guild["roles"].values()), "emojis": [], "features": [], "mfa_level": 0,
+                "system_channel_id": None, "large": False, "unavailable": False, "member_count": len(guild["members"]),
+                "voice_states": [], "members": list(guild["members"].values()), "channels": list(guild["channels"].values()),
+                "presences": [], "joined_at": self.timestamp()}
+
+    def message_payload(self, channel: Dict[str, Any], author: Dict[str, Any], body: Dict[str, Any]) -> Dict[str, Any]:
+        message = {"id": str(self.snowflake()), "channel_id": channel["id"], "author": author, "content": body.get("content") or "",
+                   "timestamp": self.timestamp(), "edited_timestamp": None, "tts": bool(body.get("tts")), "mention_everyone": False,
+                   "mentions": [], "mention_roles": [], "attachments": body.get("attachments", []), "pinned": False, "type": 0,
+                   "embeds": body.get("embeds") or ([body["embed"]] if body.get("embed") else []), "nonce": body.get("nonce")}
+        if "guild_id" in channel:
+            guild = self.guilds[int(channel["guild_id"])]
+            message["guild_id"] = channel["guild_id"]
+            member = guild["members"].get(int(author["id"]))
+            if member is not None:
+                message["member"] = {key: value for key, value in member.items() if key != "user"}
+        return message
+
+    # Injected traffic
+
+    async def user_message(self, channel_id: int, author_id: int, content: str) -> Dict[str, Any]:
+        channel = self.channels[channel_id]
+        message = self.message_payload(channel, self.users[author_id], {"content": content})
+        self.store_message(channel, message)
+        await self.dispatch("MESSAGE_CREATE", message)
+        return message
+
+    async def user_reaction(self, channel_id: int, message_id: int, user_id: int, emoji: str):
+        channel = self.channels[channel_id]
+        data = {"user_id": str(user_id), "channel_id": str(channel_id), "message_id": str(message_id), "emoji": {"id": None, "name": emoji}}
+        if "guild_id" in channel:
+            data["guild_id"] = channel["guild_id"]
+            data["member"] = self.guilds[int(channel["guild_id"])]["members"][user_id]
+        await self.dispatch("MESSAGE_REACTION_ADD", data)
+
+    def store_message(self, channel: Dict[str, Any], message: Dict[str, Any]):
+        self.messages[int(channel["id"])][int(message["id"])] = message
+        channel["last_message_id"] = message["id"]
+
+    async def dispatch(self, event: str, data: Dict[str, Any]):
+        for session in list(self.sessions):
+            try:
+                await session.send({"op": 0, "t": event, "d": data})
+            except ConnectionError:
+                self.sessions.discard(session)
+
+    # Thread
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def api(self) -> str:
+        return self.url + "/api/v7"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="FakeDiscord", daemon=True)
+        self.thread.start()
+        self.started.wait()
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.serve())
+        self.started.set()
+        self.loop.run_forever()
+
+    async def serve(self):
+        app = aiohttp.web.Application(client_max_size=64 * (1024 ** 2))
+        app.router.add_get("/gateway", self.gateway)
+        app.router.add_route("*", "/api/v7/{path:.*}", self.handle)
+        self.runner = aiohttp.web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = aiohttp.web.TCPSite(self.runner, self.host, 0)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+
+    def call(self, coro: Awaitable[_T]) -> "asyncio.Future[_T]":
+        """Run a coroutine on the fake's loop, and return a future for it on the calling loop."""
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def stop(self):
+        if self.loop is None:
+            return
+        for session in list(self.sessions):
+            asyncio.run_coroutine_threadsafe(session.ws.close(), self.loop).result()
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.loop = None
+
+    # Gateway
+
+    async def gateway(self, request: aiohttp.web.Request) -> aiohttp.web.WebSocketResponse:
+        ws = aiohttp.web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        session = GatewaySession(ws, f"{self.random.getrandbits(128):032x}")
+        await session.send({"op": 10, "d": {"heartbeat_interval": 41250, "_trace": ["fake-discord"]}})
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                payload = json.loads(msg.data)
+                op, data = payload.get("op"), payload.get("d")
+                if op == 1:  # Heartbeat
+                    await session.send({"op": 11})
+                elif op == 2:  # Identify
+                    await self.identify(session)
+                elif op == 6:  # Resume, the fake does not keep missed events
+                    await session.send({"op": 9, "d": False})
+                elif op == 8:  # Request guild members
+                    await self.request_members(session, data)
+        finally:
+            self.sessions.discard(session)
+        return ws
+
+    async def identify(self, session: GatewaySession):
+        await session.send({"op": 0, "t": "READY", "d": {
+            "v": 6, "user": self.bot_user, "session_id": session.session_id, "private_channels": [], "relationships": [], "_trace": ["fake-discord"],
+            "guilds": [{"id": str(guild_id), "unavailable": True} for guild_id in self.guilds]}})
+        for guild in self.guilds.values():
+            await session.send({"op": 0, "t": "GUILD_CREATE", "d": self.guild_payload(guild)})
+        self.sessions.add(session)
+        self.identified.set()
+
+    async def request_members(self, session: GatewaySession, data: Dict[str, Any]):
+        guild = self.guilds[int(data["guild_id"])]
+        members = list(guild["members"].values())
+        if data.get("user_ids"):
+            user_ids = {int(user_id) for user_id in data["user_ids"]}
+            members = [member for member in members if int(member["user"]["id"]) in user_ids]
+        elif data.get("query"):
+            query = data["query"].lower()
+            members = [member for member in members if member["user"]["username"].lower().startswith(query)]
+        if data.get("limit"):
+            members = members[:data["limit"]]
+        await session.send({"op": 0, "t": "GUILD_MEMBERS_CHUNK", "d": {"guild_id": str(guild["id"]), "members": members, "chunk_index": 0,
+                                                                        "chunk_count": 1, "nonce": data.get("nonce")}})
+
+    # REST
+
+    async def handle(self, request: aiohttp.web.Request) -> aiohttp.web.Response:
+        self.in_flight += 1
+        try:
+            if self.latency or self.jitter:
+                await asyncio.sleep(self.latency + self.random.uniform(0, self.jitter))
+            path = "/" + request.match_info["path"]
+            for method, pattern, template, handler in self.routes:
+                if method == request.method and (match := pattern.match(path)):
+                    break
+            else:
+                self.unhandled[f"{request.method} {path}"] += 1
+                return json_response({"message": "404: Not Found", "code": 0}, status=404)
+            route = f"{method} {template}"
+            self.requests[route] += 1
+            params = match.groupdict()
+            headers, retry_after, is_global = self.check_rate_limit(route, params)
+            if retry_after is not None:
+                self.rate_limited[route] += 1
+                headers.update({"Retry-After": str(max(1, round(retry_after))), "Via": "1.1 fake-discord"})
+                if is_global:
+                    headers["X-RateLimit-Global"] = "true"
+                return json_response({"message": "You are being rate limited.", "retry_after": retry_after * 1000, "global": is_global},
+                                                 status=429, headers=headers)
+            try:
+                data = await handler(params, await self.read_body(request), request.query)
+            except FakeHTTPError as exc:
+                return json_response({"message": exc.message, "code": exc.code}, status=exc.status, headers=headers)
+            if data is None:
+                return aiohttp.web.Response(status=204, headers=headers)
+            return json_response(data, headers=headers)
+        finally:
+            self.in_flight -= 1
+
+    def check_rate_limit(self, route: str, params: Dict[str, str]) -> Tuple[Dict[str, str], Optional[float], bool]:
+        now = time.monotonic()
+        if self.global_bucket is not None and (retry_after := self.global_bucket.take(now)) is not None:
+            return {}, retry_after, True
+        rate_limit = self.rate_limits.get(route)
+        if rate_limit is None:
+            return {}, None, False
+        major = next((params[name] for name in major_parameters if name in params), None)
+        bucket = self.buckets.get((route, major))
+        if bucket is None:
+            bucket = self.buckets[(route, major)] = Bucket(f"{abs(hash(route)):x}", rate_limit)
+        retry_after = bucket.take(now)
+        return bucket.headers(now), retry_after, False
+
+    @staticmethod
+    async def read_body(request: aiohttp.web.Request) -> Dict[str, Any]:
+        if not request.body_exists:
+            return {}
+        if request.content_type.startswith("multipart/"):
+            form = await request.post()
+            body = json.loads(form.get("payload_json", "{}"))
+            body["attachments"] = [{"id": str(num), "filename": field.filename, "size": len(field.file.read()),
+                                    "url": f"https://cdn.discordapp.com/attachments/{field.filename}", "proxy_url": "", "content_type": None}
+                                   for num, field in enumerate(value for value in form.values() if hasattr(value, "filename"))]
+            return body
+        text = await request.text()
+        return json.loads(text) if text else {}
+
+    def get_channel_or_404(self, channel_id: str) -> Dict[str, Any]:
+        channel = self.channels.get(int(channel_id))
+        if channel is None:
+            raise FakeHTTPError(404, 10003, "Unknown Channel")
+        return channel
+
+    def get_message_or_404(self, channel_id: str, message_id: str) -> Dict[str, Any]:
+        message = self.messages[int(channel_id)].get(int(message_id))
+        if message is None:
+            raise FakeHTTPError(404, 10008, "Unknown Message")
+        return message
+
+    def get_member_or_404(self, guild_id: str, user_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        guild = self.guilds.get(int(guild_id))
+        if guild is None:
+            raise FakeHTTPError(404, 10004, "Unknown Guild")
+        member = guild["members"].get(int(user_id))
+        if member is None:
+            raise FakeHTTPError(404, 10007, "Unknown Member")
+        return guild, member
+
+    async def no_content(self, params, body, query):
+        return None
+
+    async def get_gateway(self, params, body, query):
+        return {"url": f"ws://{self.host}:{self.port}/gateway", "shards": 1}
+
+    async def get_me(self, params, body, query):
+        return self.bot_user
+
+    async def get_application(self, params, body, query):
+        return {"id": self.bot_user["id"], "name": self.bot_user["username"], "icon": None, "description": "", "rpc_origins": [],
+                "bot_public": True, "bot_require_code_grant": False, "owner": self.owner_user, "summary": "", "verify_key": "", "flags": 0}
+
+    async def get_user(self, params, body, query):
+        user = self.users.get(int(params["user_id"]))
+        if user is None:
+            raise FakeHTTPError(404, 10013, "Unknown User")
+        return user
+
+    async def create_dm(self, params, body, query):
+        recipient_id = int(body["recipient_id"])
+        if recipient_id not in self.dm_channels:
+            channel_id = self.snowflake()
+            self.channels[channel_id] = {"id": str(channel_id), "type": DM_CHANNEL, "recipients": [self.users[recipient_id]],
+                                         "last_message_id": None}
+            self.dm_channels[recipient_id] = channel_id
+        return self.channels[self.dm_channels[recipient_id]]
+
+    async def get_channel(self, params, body, query):
+        return self.get_channel_or_404(params["channel_id"])
+
+    async def edit_channel(self, params, body, query):
+        channel = self.get_channel_or_404(params["channel_id"])
+        channel.update({key: value for key, value in body.items() if key in ("name", "topic", "position", "nsfw", "rate_limit_per_user")})
+        await self.dispatch("CHANNEL_UPDATE", channel)
+        return channel
+
+    async def get_messages(self, params, body, query):
+        self.get_channel_or_404(params["channel_id"])
+        ids = sorted(self.messages[int(params["channel_id"])])
+        limit = min(int(query.get("limit", 50)), 100)
+        if "after" in query:
+            after = int(query["after"])
+            ids = [message_id for message_id in ids if message_id > after][:limit]
+        elif "before" in query:
+            before = int(query["before"])
+            ids = [message_id for message_id in ids if message_id < before][-limit:]
+        elif "around" in query:
+            around = int(query["around"])
+            older = [message_id for message_id in ids if message_id <= around]
+            newer = [message_id for message_id in ids if message_id > around]
+            ids = older[-((limit + 1) // 2):] + newer[:limit // 2]
+        else:
+            ids = ids[-limit:]
+        messages = self.messages[int(params["channel_id"])]
+        return [messages[message_id] for message_id in reversed(ids)]
+
+    async def create_message(self, params, body, query):
+        channel = self.get_channel_or_404(params["channel_id"])
+        if not (body.get("content") or body.get("embed") or body.get("embeds") or body.get("attachments")):
+            raise FakeHTTPError(400, 50006, "Cannot send an empty message")
+        message = self.message_payload(channel, self.bot_user, body)
+        self.store_message(channel, message)
+        await self.dispatch("MESSAGE_CREATE", message)
+        return message
+
+    async def bulk_delete_messages(self, params, body, query):
+        channel = self.get_channel_or_404(params["channel_id"])
+        for message_id in body.get("messages", []):
+            self.messages[int(channel["id"])].pop(int(message_id), None)
+        data = {"ids": body.get("messages", []), "channel_id": channel["id"]}
+        if "guild_id" in channel:
+            data["guild_id"] = channel["guild_id"]
+        await self.dispatch("MESSAGE_DELETE_BULK", data)
+        return None
+
+    async def get_message(self, params, body, query):
+        return self.get_message_or_404(params["channel_id"], params["message_id"])
+
+    async def edit_message(self, params, body, query):
+        message = self.get_message_or_404(params["channel_id"], params["message_id"])
+        if "content" in body:
+            message["content"] = body["content"] or ""
+        if "embed" in body:
+            message["embeds"] = [body["embed"]] if body["embed"] else []
+        if "embeds" in body:
+            message["embeds"] = body["embeds"] or []
+        message["edited_timestamp"] = self.timestamp()
+        await self.dispatch("MESSAGE_UPDATE", message)
+        return message
+
+    async def delete_message(self, params, body, query):
+        message = self.get_message_or_404(params["channel_id"], params["message_id"])
+        del self.messages[int(params["channel_id"])][int(message["id"])]
+        data = {"id": message["id"], "channel_id": message["channel_id"]}
+        if "guild_id" in message:
+            data["guild_id"] = message["guild_id"]
+        await self.dispatch("MESSAGE_DELETE", data)
+        return None
+
+    async def add_own_reaction(self, params, body, query):
+        message = self.get_message_or_404(params["channel_id"], params["message_id"])
+        data = {"user_id": self.bot_user["id"], "channel_id": message["channel_id"], "message_id": message["id"],
+                "emoji": {"id": None, "name": params["emoji"]}}
+        if "guild_id" in message:
+            data["guild_id"] = message["guild_id"]
+        await self.dispatch("MESSAGE_REACTION_ADD", data)
+        return None
+
+    async def get_member(self, params, body, query):
+        return self.get_member_or_404(params["guild_id"], params["user_id"])[1]
+
+    async def member_updated(self, guild: Dict[str, Any], member: Dict[str, Any]):
+        await self.dispatch("GUILD_MEMBER_UPDATE", {"guild_id": str(guild["id"]), **member})
+
+    async def edit_member(self, params, body, query):
+        guild, member = self.get_member_or_404(params["guild_id"], params["user_id"])
+        if "roles" in body:
+            member["roles"] = [str(role_id) for role_id in body["roles"]]
+        if "nick" in body:
+            member["nick"] = body["nick"]
+        await self.member_updated(guild, member)
+        return member
+
+    async def add_member_role(self, params, body, query):
+        guild, member = self.get_member_or_404(params["guild_id"], params["user_id"])
+        if int(params["role_id"]) not in guild["roles"]:
+            raise FakeHTTPError(404, 10011, "Unknown Role")
+        if params["role_id"] not in member["roles"]:
+            member["roles"].append(params["role_id"])
+            await self.member_updated(guild, member)
+        return None
+
+    async def remove_member_role(self, params, body, query):
+        guild, member = self.get_member_or_404(params["guild_id"], params["user_id"])
+        if params["role_id"] in member["roles"]:
+            member["roles"].remove(params["role_id"])
+            await self.member_updated(guild, member)
+        return None
+
+    async def create_role(self, params, body, query):
+        guild = self.guilds.get(int(params["guild_id"]))
+        if guild is None:
+            raise FakeHTTPError(404, 10004, "Unknown Guild")
+        role = self.add_role(guild, body.get("name", "new role"), permissions=int(body.get("permissions", 0)))
+        role["color"] = body.get("color", 0)
+        await self.dispatch("GUILD_ROLE_CREATE", {"guild_id": str(guild["id"]), "role": role})
+        return role
+
+    async def edit_role(self, params, body, query):
+        guild = self.guilds.get(int(params["guild_id"]))
+        role = guild["roles"].get(int(params["role_id"])) if guild is not None else None
+        if role is None:
+            raise FakeHTTPError(404, 10011, "Unknown Role")
+        role.update({key: value for key, value in body.items() if key in ("name", "color", "hoist", "mentionable")})
+        if "permissions" in body:
+            role["permissions"] = role["permissions_new"] = str(body["permissions"])
+        await self.dispatch("GUILD_ROLE_UPDATE", {"guild_id": str(guild["id"]), "role": role})
+        return role